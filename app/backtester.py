@@ -1,19 +1,27 @@
 # app/backtester.py
 
+import numpy as np
 import pandas as pd
+from app import compact
+from app.engine import run_backtest
 
 def backtest_strategy(df: pd.DataFrame, initial_cash: float = 10_000):
-    df = df.copy()
+    df = compact.frame(df, columns=("Date", "Close", "Signal"))
 
     # Forward fill 1/-1 signals, treat 0 as no new signal
-    df["Position"] = df["Signal"].replace(0, pd.NA).ffill()
-    df["Position"] = df["Position"].fillna(0)
+    result = run_backtest(df["Close"].to_numpy(dtype=float), df["Signal"].to_numpy(dtype=float),
+                          initial_cash=initial_cash, hold_on_zero=True)
 
-    # Calculate daily return and strategy return
-    df["Market Return"] = df["Close"].pct_change()
-    df["Strategy Return"] = df["Market Return"] * df["Position"].shift(1)
+    # The first bar has no prior close, so its returns and value stay undefined
+    market_return = df["Close"].pct_change()
+    strategy_return = result.strategy_returns.copy()
+    portfolio_value = result.equity.copy()
+    strategy_return[:1] = np.nan
+    portfolio_value[:1] = np.nan
 
-    # Portfolio value over time
-    df["Portfolio Value"] = (1 + df["Strategy Return"]).cumprod() * initial_cash
+    df["Position"] = result.targets
+    df["Market Return"] = compact.column(market_return)
+    df["Strategy Return"] = compact.column(strategy_return)
+    df["Portfolio Value"] = portfolio_value
 
     return df
@@ -0,0 +1,60 @@
+# app/compact.py
+
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import numpy as np
+import pandas as pd
+
+COMPACT_MEMORY = os.getenv("QTRADER_COMPACT_MEMORY", "0") == "1"
+
+# All a built-in strategy reads from a price frame
+FRAME_COLUMNS = ("Date", "Close")
+INDICATOR_DTYPE = np.float32
+SIGNAL_DTYPE = np.int8
+
+_enabled = ContextVar("compact_memory", default=COMPACT_MEMORY)
+
+
+@contextmanager
+def compact_mode(enabled: bool = True):
+    """
+    Run the block in compact memory mode (or explicitly not, with ``enabled=False``).
+
+    Strategies then work on a frame trimmed to ``FRAME_COLUMNS`` instead of
+    a copy of the whole OHLCV frame, store indicator columns as float32 and
+    signals as int8, and the engine keeps targets and positions in float32.
+    Signals are still computed from float64 indicators, so built-in
+    strategies produce the same trades and equity either way. Off by default;
+    ``QTRADER_COMPACT_MEMORY=1`` turns it on process-wide.
+    """
+    token = _enabled.set(enabled)
+    try:
+        yield
+    finally:
+        _enabled.reset(token)
+
+
+def enabled() -> bool:
+    return _enabled.get()
+
+
+def frame(data: pd.DataFrame, columns=FRAME_COLUMNS, copy: bool = True) -> pd.DataFrame:
+    """
+    The frame a strategy builds on: just ``columns`` (those present) in compact
+    mode, otherwise all of ``data``, copied unless ``copy`` is False.
+    """
+    if not _enabled.get():
+        return data.copy() if copy else data
+    return data[[column for column in columns if column in data.columns]].copy()
+
+
+def column(values):
+    """An intermediate column (indicator, return) as it should be stored."""
+    return np.asarray(values, dtype=INDICATOR_DTYPE) if _enabled.get() else values
+
+
+def signal(values):
+    """A signal column as it should be stored; int8 in compact mode, so only for whole-number signals."""
+    return np.asarray(values, dtype=SIGNAL_DTYPE) if _enabled.get() else values
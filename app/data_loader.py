@@ -1,18 +1,133 @@
 # app/data_loader.py
 
-import yfinance as yf
+import threading
+
 import pandas as pd
-import os
+from app.price_store import PriceStore
+from app.providers import PriceProvider, provider_from_env
+from app.telemetry import stage, record_cache
+
+_store = None
+_provider = None
+
+
+def get_store() -> PriceStore:
+    global _store
+    if _store is None:
+        _store = PriceStore()
+    return _store
+
+
+def get_provider() -> PriceProvider:
+    global _provider
+    if _provider is None:
+        _provider = provider_from_env()
+    return _provider
+
+
+def set_provider(provider: PriceProvider):
+    """Swap the upstream data source, e.g. a ``CSVProvider`` in tests."""
+    global _provider
+    _provider = provider
+
+
+def _slice(data: pd.DataFrame, start: str, end: str) -> pd.DataFrame:
+    return data.loc[(data.index >= pd.Timestamp(start)) & (data.index < pd.Timestamp(end))].copy()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
 
-def fetch_price_data(ticker: str, start: str = "2015-01-01", end: str = "2024-12-31") -> pd.DataFrame:
-    os.makedirs("app/data_cache", exist_ok=True)
-    cache_path = f"app/data_cache/{ticker}_{start}_{end}.csv"
 
-    try:
-        return pd.read_csv(cache_path, index_col="Date", parse_dates=True)
-    except Exception as e:
-        print(f"[WARN] Cache load failed — redownloading. Reason: {e}")
-        data = yf.download(ticker, start=start, end=end, auto_adjust=False)
-        data.to_csv(cache_path, index_label="Date")
-        return data
+_inflight = {}
+_inflight_lock = threading.Lock()
 
+
+def _fetch_into_store(symbols: list, start: str, end: str) -> dict:
+    store = get_store()
+
+    # Widen each download to the union with what's already stored so a symbol
+    # keeps one contiguous history, then batch symbols sharing the same window
+    batches = {}
+    for symbol in symbols:
+        fetch_start, fetch_end = start, end
+        stored = store.coverage(symbol)
+        if stored is not None:
+            fetch_start = min(pd.Timestamp(start), pd.Timestamp(stored[0])).strftime("%Y-%m-%d")
+            fetch_end = max(pd.Timestamp(end), pd.Timestamp(stored[1])).strftime("%Y-%m-%d")
+        batches.setdefault((fetch_start, fetch_end), []).append(symbol)
+
+    results = {}
+    for (fetch_start, fetch_end), batch in batches.items():
+        with stage("provider_fetch"):
+            fetched = get_provider().fetch(batch, fetch_start, fetch_end)
+        for symbol in batch:
+            data = fetched.get(symbol, pd.DataFrame())
+            if not data.empty:
+                store.put(symbol, fetch_start, fetch_end, data)
+                data = _slice(data, start, end)
+            results[symbol] = data
+    return results
+
+
+def fetch_many(symbols: list, start: str = "2015-01-01", end: str = "2024-12-31") -> dict:
+    """
+    Load several symbols at once, keyed by upper-cased symbol (tickers are
+    case-insensitive and providers like yfinance only answer in upper case).
+
+    Store hits are sliced straight from disk, the remaining symbols are
+    fetched from the provider in one batched call, and a symbol/range that
+    another thread is already fetching is waited on rather than fetched again.
+    """
+    store = get_store()
+    results = {}
+    missing = []
+    for symbol in dict.fromkeys(symbol.upper() for symbol in symbols):
+        cached = store.get(symbol, start, end)
+        if cached is not None:
+            results[symbol] = cached
+        else:
+            missing.append(symbol)
+    record_cache("store", hits=len(results), misses=len(missing))
+
+    leading, following = [], []
+    with _inflight_lock:
+        for symbol in missing:
+            key = (symbol, start, end)
+            flight = _inflight.get(key)
+            if flight is None:
+                flight = _inflight[key] = _Flight()
+                leading.append((symbol, flight))
+            else:
+                following.append((symbol, flight))
+
+    if leading:
+        try:
+            fetched = _fetch_into_store([symbol for symbol, _ in leading], start, end)
+            for symbol, flight in leading:
+                flight.result = fetched[symbol]
+                results[symbol] = flight.result.copy()
+        except Exception as e:
+            for _, flight in leading:
+                flight.error = e
+            raise
+        finally:
+            with _inflight_lock:
+                for symbol, flight in leading:
+                    _inflight.pop((symbol, start, end), None)
+                    flight.done.set()
+
+    for symbol, flight in following:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        results[symbol] = flight.result.copy()
+
+    return results
+
+
+def fetch_price_data(ticker: str, start: str = "2015-01-01", end: str = "2024-12-31") -> pd.DataFrame:
+    return fetch_many([ticker], start=start, end=end)[ticker.upper()]
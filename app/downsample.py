@@ -0,0 +1,87 @@
+# app/downsample.py
+
+import numpy as np
+
+
+def lttb_indices(y, n_out: int, x=None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets selection of ``n_out`` point indices.
+
+    The interior points are split into ``n_out - 2`` equal buckets and each
+    bucket keeps the point forming the largest triangle with the neighbouring
+    buckets. The neighbours are taken at their bucket means rather than at
+    the previously selected point, which makes every bucket independent and
+    lets the whole selection run as a few array operations instead of a
+    Python loop. The first and last points are always kept.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # NaN gaps (e.g. a benchmark missing a day) shouldn't win or poison the triangle areas
+    if np.isnan(y).any():
+        y = np.where(np.isnan(y), np.nanmean(y), y)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    counts = np.diff(edges)
+    width = counts.max()
+    members = edges[:-1, None] + np.arange(width)[None, :]
+    valid = members < edges[1:, None]
+    members = np.minimum(members, n - 1)
+
+    bx, by = x[members], y[members]
+    mean_x = np.where(valid, bx, 0.0).sum(axis=1) / np.maximum(counts, 1)
+    mean_y = np.where(valid, by, 0.0).sum(axis=1) / np.maximum(counts, 1)
+
+    ax = np.concatenate(([x[0]], mean_x[:-1]))[:, None]
+    ay = np.concatenate(([y[0]], mean_y[:-1]))[:, None]
+    cx = np.concatenate((mean_x[1:], [x[-1]]))[:, None]
+    cy = np.concatenate((mean_y[1:], [y[-1]]))[:, None]
+
+    area = np.abs((ax - cx) * (by - ay) - (ax - bx) * (cy - ay))
+    area[~valid] = -1.0
+    picks = members[np.arange(len(members)), area.argmax(axis=1)]
+
+    return np.concatenate(([0], picks, [n - 1]))
+
+
+def drawdown_extremes(equity) -> np.ndarray:
+    """Indices of the peak and trough bounding the maximum drawdown."""
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) == 0 or np.isnan(equity).all():
+        return np.array([], dtype=int)
+    filled = np.where(np.isnan(equity), -np.inf, equity)
+    running_max = np.maximum.accumulate(filled)
+    trough = int(np.nanargmax(running_max - equity))
+    peak = int(np.argmax(filled[: trough + 1]))
+    return np.array([peak, trough])
+
+
+def downsample_indices(series: list, max_points: int, keep=()) -> np.ndarray:
+    """
+    Sorted indices (at most ``max_points``) to plot several aligned curves.
+
+    The first and last bar and each curve's max-drawdown peak and trough
+    always survive (even past ``max_points``, which only happens with a tiny
+    bound and many curves). Every index in ``keep`` (e.g. trade bars) survives
+    too when they all fit, otherwise none of them do; callers should report
+    that. The remaining budget is split between the curves' LTTB selections
+    so all of them keep their shape at the same dates.
+    """
+    n = len(series[0])
+    if n <= max_points:
+        return np.arange(n)
+
+    forced = np.unique(np.concatenate([drawdown_extremes(y) for y in series] + [np.array([0, n - 1])]))
+    with_keep = np.union1d(forced, np.asarray(keep, dtype=int))
+    if len(with_keep) <= max_points:
+        forced = with_keep
+
+    # LTTB always picks the first and last bar, already forced, so each curve adds at most budget - 2
+    extra = (max_points - len(forced)) // len(series)
+    if extra < 1:
+        return forced
+    chosen = [forced] + [lttb_indices(y, extra + 2) for y in series]
+    return np.unique(np.concatenate(chosen))
@@ -0,0 +1,90 @@
+# app/engine.py
+
+from typing import NamedTuple
+
+import numpy as np
+from app import compact
+from app.telemetry import timed
+
+
+class BacktestResult(NamedTuple):
+    equity: np.ndarray            # portfolio value per bar
+    targets: np.ndarray           # signal after NaN / hold handling, before the lag
+    positions: np.ndarray         # position held over each bar
+    strategy_returns: np.ndarray  # per-bar strategy return (0 on the first bar)
+    trades: object                # bar indices where the target position changes
+    trade_sides: object           # size of each change, e.g. +1 for 0 -> 1, -2 for 1 -> -1
+
+
+def _forward_fill_nonzero(signals: np.ndarray) -> np.ndarray:
+    # Carry the last non-zero signal forward; 0 and NaN mean "no new signal"
+    active = (signals != 0) & ~np.isnan(signals)
+    idx = np.where(active, np.arange(signals.shape[1]), 0)
+    idx = np.maximum.accumulate(idx, axis=1)  # not out=idx: NumPy 2.3.1 leaks the out array
+    filled = np.take_along_axis(signals, idx, axis=1)
+    filled[~np.take_along_axis(active, idx, axis=1)] = 0.0
+    return filled
+
+
+def market_returns(close: np.ndarray) -> np.ndarray:
+    """
+    Simple returns along the last axis with the first bar (and any gaps) set
+    to 0, like ``pct_change().fillna(0)``.
+    """
+    close = np.ascontiguousarray(close, dtype=float)
+    returns = np.zeros_like(close)
+    np.divide(close[..., 1:], close[..., :-1], out=returns[..., 1:])
+    returns[..., 1:] -= 1.0
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0, copy=False)
+
+
+@timed("backtest")
+def run_backtest_batch(close, signals, initial_cash: float = 100_000, lag: int = 1, hold_on_zero: bool = False) -> BacktestResult:
+    """
+    Backtest many signal rows against one price series in a single pass.
+
+    ``signals`` is a (strategies x time) matrix of target positions; ``close``
+    is one series shared by every row or a matching (rows x time) matrix,
+    e.g. one strategy over a universe of aligned symbols. Each row
+    is held ``lag`` bars after it is emitted (1 = trade on the next bar, 0 =
+    the row already is the held position). With ``hold_on_zero`` a 0 or NaN
+    keeps the previous non-zero position instead of going flat; otherwise
+    NaN is treated as flat. Every field of the result has one row per signal
+    row; ``trades`` and ``trade_sides`` are lists of per-row arrays. In
+    compact mode targets and positions are float32.
+    """
+    returns = market_returns(close)
+    targets = np.array(signals, dtype=np.float32 if compact.enabled() else float, ndmin=2, order="C")
+    if targets.shape[1] != returns.shape[-1]:
+        raise ValueError("Signal length does not match price length.")
+
+    if hold_on_zero:
+        targets = _forward_fill_nonzero(targets)
+    else:
+        np.nan_to_num(targets, nan=0.0, copy=False)
+
+    positions = np.zeros_like(targets)
+    if lag == 0:
+        positions[:] = targets
+    elif lag < targets.shape[1]:
+        positions[:, lag:] = targets[:, :-lag]
+
+    strategy_returns = positions * returns
+    del returns
+    equity = np.cumprod(np.add(strategy_returns, 1.0), axis=1)
+    equity *= initial_cash
+
+    changes = np.diff(targets, axis=1)
+    trades, trade_sides = [], []
+    for row in changes:
+        idx = np.flatnonzero(row)
+        trades.append(idx + 1)
+        trade_sides.append(row[idx])
+
+    return BacktestResult(equity, targets, positions, strategy_returns, trades, trade_sides)
+
+
+def run_backtest(close, signal, initial_cash: float = 100_000, lag: int = 1, hold_on_zero: bool = False) -> BacktestResult:
+    """Single-strategy form of ``run_backtest_batch`` returning 1-D arrays."""
+    result = run_backtest_batch(close, signal, initial_cash=initial_cash, lag=lag, hold_on_zero=hold_on_zero)
+    return BacktestResult(*(field[0] for field in result))
@@ -0,0 +1,129 @@
+# app/indicators.py
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import pandas as pd
+from app import kernels
+from app.telemetry import record_cache
+
+SHARE_ACROSS_REQUESTS = os.getenv("QTRADER_SHARED_INDICATORS", "0") == "1"
+
+
+def fingerprint(series: pd.Series) -> str:
+    """Content hash of a series' values and index, so equal data from different copies shares entries."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(series.to_numpy().tobytes())
+    digest.update(series.index.to_numpy().tobytes() if not isinstance(series.index, pd.RangeIndex)
+                  else repr(series.index).encode())
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """LRU of computed indicator series keyed by ``(data fingerprint, indicator, params)``."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            hit = key in self._entries
+            if hit:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                value = self._entries[key]
+        if hit:
+            record_cache("indicators", hits=1)
+            return value
+
+        value = compute()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        record_cache("indicators", misses=1)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+shared_cache = IndicatorCache()
+_active_cache = ContextVar("indicator_cache", default=None)
+
+
+@contextmanager
+def indicator_scope(shared: bool = SHARE_ACROSS_REQUESTS):
+    """
+    Memoize indicators requested inside the block.
+
+    Each scope gets its own cache unless ``shared`` is set, in which case the
+    process-wide ``shared_cache`` is used so repeated requests on the same
+    data reuse earlier results too. Outside a scope indicators are computed
+    directly.
+    """
+    cache = shared_cache if shared else IndicatorCache()
+    token = _active_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _active_cache.reset(token)
+
+
+def activate_worker_cache():
+    """Give the current (worker) process a memo that lives as long as the process does."""
+    _active_cache.set(IndicatorCache())
+
+
+def _memo(name: str, series: pd.Series, params: tuple, compute):
+    cache = _active_cache.get()
+    if cache is None:
+        return compute()
+    return cache.get_or_compute((fingerprint(series), name, params), compute)
+
+
+# ---------- indicators ----------
+# Thin Series wrappers over ``app.kernels``. Results may be shared between
+# strategies, so callers must not modify them in place.
+
+def _series(values, like: pd.Series) -> pd.Series:
+    return pd.Series(values, index=like.index, name=like.name)
+
+
+def _values(close: pd.Series):
+    return close.to_numpy(dtype=float)
+
+
+def sma(close: pd.Series, window: int) -> pd.Series:
+    return _memo("sma", close, (window,), lambda: _series(kernels.sma(_values(close), window), close))
+
+
+def ema(close: pd.Series, span: int) -> pd.Series:
+    return _memo("ema", close, (span,), lambda: _series(kernels.ema(_values(close), span), close))
+
+
+def rolling_std(close: pd.Series, window: int) -> pd.Series:
+    return _memo("rolling_std", close, (window,), lambda: _series(kernels.rolling_std(_values(close), window), close))
+
+
+def roc(close: pd.Series, period: int) -> pd.Series:
+    return _memo("roc", close, (period,), lambda: _series(kernels.roc(_values(close), period), close))
+
+
+def rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    """Wilder's RSI (see ``kernels.rsi``)."""
+    return _memo("rsi", close, (period,), lambda: _series(kernels.rsi(_values(close), period), close))
+
+
+def macd(close: pd.Series, short: int = 12, long: int = 26) -> pd.Series:
+    return _memo("macd", close, (short, long), lambda: ema(close, short) - ema(close, long))
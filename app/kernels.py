@@ -0,0 +1,382 @@
+# app/kernels.py
+"""
+NumPy kernels for the rolling indicators behind ``app.indicators``.
+
+Every kernel works along the last axis, so ``x`` can be one series or a
+(symbols x time) array handled in a single call, and writes into ``out``
+(a C-contiguous float64 array of the input's shape) when one is given.
+Bars before an indicator is defined are NaN. A row's leading NaNs (a
+symbol that starts trading later in an aligned universe) just delay its
+warm-up; in window kernels any other NaN makes the windows containing it
+NaN. ``ema`` holds its value over a gap and then weighs the next close as
+pandas' ``ewm`` does; RSI and ATR treat a missing close as unchanged.
+
+Values agree with pandas and ``app.streaming`` to rounding, not bit for
+bit, since sums run in a different order. Strategies compare indicators
+through ``above`` / ``below`` so exact ties (flat or tick-rounded prices)
+resolve the same way on every path.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Bars of output per block of the windowed kernels (at least 4 windows). Sums
+# are taken about a value local to each block, so rounding doesn't grow with
+# series length.
+ROLLING_BLOCK = 256
+# Cap on bars per pass of the smoothing kernels; also bounded so b^-k stays finite
+SMOOTHING_BLOCK = 4096
+# Indicator values this close (relative to their scale) count as equal in strategy
+# comparisons; far above rounding (~1e-15), far below a tick over a window
+TIE_TOLERANCE = 1e-9
+
+
+def _prepare(x, out):
+    x = np.asarray(x, dtype=float)
+    if x.ndim == 0:
+        raise ValueError("Expected a series or a (symbols x time) array, got a scalar.")
+    if out is None:
+        out = np.empty(x.shape)
+    elif out.shape != x.shape or out.dtype != np.float64 or not out.flags.c_contiguous:
+        raise ValueError(f"'out' must be a C-contiguous float64 array of shape {x.shape}.")
+    shape = (int(np.prod(x.shape[:-1])), x.shape[-1])
+    return x.reshape(shape), out, out.reshape(shape)
+
+
+def _fill(x2, leading: bool = True):
+    # Carry values over NaNs (and back-fill leading ones); also each row's first valid bar (n if none)
+    valid = ~np.isnan(x2)
+    n = x2.shape[-1]
+    if n == 0:
+        return x2, np.zeros(x2.shape[0], dtype=np.int64)
+    first = np.where(valid.any(axis=-1), valid.argmax(axis=-1), n)
+    if valid.all():
+        return x2, first
+    idx = np.where(valid, np.arange(n), 0)
+    # Accumulations here never pass out=: NumPy 2.3.1 leaks a reference to the out array
+    idx = np.maximum.accumulate(idx, axis=-1)
+    if leading:
+        np.maximum(idx, np.minimum(first, n - 1)[:, None], out=idx)
+    return np.take_along_axis(x2, idx, axis=-1), first
+
+
+def ffill(x, out=None) -> np.ndarray:
+    """Carry the last valid value forward over NaNs along the last axis; leading NaNs stay."""
+    x2, out, out2 = _prepare(x, out)
+    out2[:] = _fill(x2, leading=False)[0]
+    return out
+
+
+def above(a, b, scale):
+    """
+    ``a > b`` by more than ``TIE_TOLERANCE * |scale|`` (arrays or floats;
+    False where anything is NaN). ``scale`` is the magnitude the values come
+    from, e.g. the close for price-level indicators or 100 for RSI.
+    """
+    return a - b > TIE_TOLERANCE * abs(scale)
+
+
+def below(a, b, scale):
+    """``a < b`` by more than ``TIE_TOLERANCE * |scale|``; see ``above``."""
+    return b - a > TIE_TOLERANCE * abs(scale)
+
+
+def _mask_before(out2, start):
+    if (start > 0).any():
+        out2[np.arange(out2.shape[-1]) < start[:, None]] = np.nan
+
+
+# ---------- smoothing ----------
+
+def _smooth(x2, alpha, out2):
+    """
+    ``y[0] = x[0]``, ``y[t] = (1 - alpha) * y[t-1] + alpha * x[t]`` per row,
+    in place when ``out2 is x2``. ``alpha`` is a scalar or one per row.
+
+    With ``b = 1 - alpha`` the recurrence unrolls over a block of ``k`` bars to
+    ``y[s+k] = b^k * (y[s] + alpha * sum_j b^-j * x[s+j])``, a scaled
+    cumulative sum, so the Python loop runs once per block instead of
+    once per bar.
+    """
+    rows, n = x2.shape
+    if n == 0:
+        return out2
+    alpha = np.asarray(alpha, dtype=float)
+    alpha = alpha.reshape(1, 1) if alpha.ndim == 0 else alpha.reshape(rows, 1)
+    b = 1.0 - alpha
+    out2[:, 0] = x2[:, 0]
+    if n == 1:
+        return out2
+    if (b == 0).all():
+        out2[:, 1:] = x2[:, 1:]
+        return out2
+
+    # Largest block with b^-block <= 1e100 for every row
+    rate = -np.log(b[b > 0].min())
+    block = int(max(1, min(SMOOTHING_BLOCK, 100 * np.log(10) / rate)))
+    steps = np.arange(1, block + 1)
+    with np.errstate(divide="ignore", over="ignore"):
+        weight = np.where(b > 0, alpha * b ** -steps, 0.0)
+    decay = b ** steps
+
+    for s in range(1, n, block):
+        k = min(block, n - s)
+        seg = out2[:, s:s + k]
+        np.multiply(x2[:, s:s + k], weight[:, :k], out=seg)
+        seg[:] = np.cumsum(seg, axis=-1)
+        seg += out2[:, s - 1:s]
+        seg *= decay[:, :k]
+    if (b == 0).any():
+        # Rows with alpha == 1 just follow their input
+        zero = np.broadcast_to(b[:, 0] == 0, (rows,))
+        out2[zero] = x2[zero]
+    return out2
+
+
+def _smooth_gaps(x, alpha: float, start: int, out):
+    """
+    ``ewm(adjust=False)`` of one row with NaN gaps after ``start``, into ``out``.
+
+    Like pandas, the value is held over a gap and the next valid ``x`` after
+    ``g`` bars enters as ``y = (b^g * y + alpha * x) / (b^g + alpha)``. That is
+    a recurrence ``y[i] = c[i] * y[i-1] + d[i] * x[i]`` over the valid bars,
+    solved per block as a cumulative sum scaled by the running product of
+    ``c``, cut where that product would fall below e^-20 so the scaled sum
+    keeps its precision.
+    """
+    tail = x[start:]
+    present = ~np.isnan(tail)
+    valid = np.flatnonzero(present)
+    xv = tail[valid]
+    with np.errstate(under="ignore"):
+        held = (1.0 - alpha) ** np.diff(valid)
+    c = held / (held + alpha)
+    d = alpha / (held + alpha)
+    with np.errstate(divide="ignore"):
+        log_c = np.log(c)
+
+    yv = np.empty(len(xv))
+    yv[0] = xv[0]
+    s = 1
+    while s < len(yv):
+        if c[s - 1] == 0:
+            yv[s] = xv[s]
+            s += 1
+            continue
+        cum = np.cumsum(log_c[s - 1:s - 1 + SMOOTHING_BLOCK])
+        k = max(1, int(np.searchsorted(-cum, 20.0, side="right")))
+        scale = np.exp(cum[:k])
+        yv[s:s + k] = scale * (yv[s - 1] + np.cumsum(d[s - 1:s - 1 + k] * xv[s:s + k] / scale))
+        s += k
+    out[start:] = yv[np.cumsum(present) - 1]
+    return out
+
+
+def ema(x, span, out=None) -> np.ndarray:
+    """``Series.ewm(span=span, adjust=False).mean()``; ``span`` may also be one value per row."""
+    x2, out, out2 = _prepare(x, out)
+    filled, first = _fill(x2)
+    alpha = np.broadcast_to(2.0 / (np.asarray(span, dtype=float).reshape(-1) + 1.0), (len(x2),))
+    _smooth(filled, alpha, out2)
+    if filled is not x2:
+        # Rows with gaps after their first close follow pandas' gap weighting instead of the filled values
+        gaps = (np.isnan(x2) & (np.arange(x2.shape[-1]) >= first[:, None])).any(axis=-1)
+        for row in np.flatnonzero(gaps):
+            _smooth_gaps(x2[row], alpha[row], first[row], out2[row])
+    _mask_before(out2, first)
+    return out
+
+
+def _wilder(values, period: int, start, out2):
+    # Wilder smoothing of ``values`` (consumed as scratch): the first average is the plain mean
+    # of bars start+1..start+period, placed at start+period, then alpha = 1/period from there
+    rows, n = values.shape
+    if n == 0:
+        return out2
+    seed_at = start + period
+    ok = seed_at < n
+    window = np.minimum(start[:, None] + np.arange(1, period + 1), n - 1)
+    seed = np.take_along_axis(values, window, axis=-1).mean(axis=-1)
+    np.copyto(values, seed[:, None], where=np.arange(n) <= np.minimum(seed_at, n - 1)[:, None])
+    _smooth(values, 1.0 / period, out2)
+    _mask_before(out2, np.where(ok, seed_at, n))
+    return out2
+
+
+def rsi(x, period: int = 14, out=None) -> np.ndarray:
+    """
+    Wilder's RSI: average gain and loss smoothed with ``alpha = 1/period``,
+    seeded with the simple mean of the first ``period`` changes. The first
+    value is on bar ``period``. 100 when there were no losses, NaN on a flat
+    series.
+    """
+    if period < 1:
+        raise ValueError("RSI period must be at least 1.")
+    x2, out, out2 = _prepare(x, out)
+    filled, first = _fill(x2)
+
+    gain = np.zeros_like(filled)
+    np.subtract(filled[:, 1:], filled[:, :-1], out=gain[:, 1:])
+    loss = np.negative(gain)
+    np.maximum(gain, 0.0, out=gain)
+    np.maximum(loss, 0.0, out=loss)
+
+    _wilder(gain, period, first, out2)
+    avg_loss = _wilder(loss, period, first, loss)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out2 /= avg_loss
+        out2 += 1.0
+        np.divide(100.0, out2, out=out2)
+        np.subtract(100.0, out2, out=out2)
+    return out
+
+
+def macd(x, short: int = 12, long: int = 26, signal: int = 9, out=None):
+    """
+    ``(macd, signal_line)``: ``ema(short) - ema(long)`` and its ``ema(signal)``.
+    ``out`` is an optional pair of buffers; the long EMA is computed in the
+    second one, so nothing else is allocated.
+    """
+    line_out, signal_out = out if out is not None else (None, None)
+    line = ema(x, short, out=line_out)
+    signal_line = ema(x, long, out=signal_out)
+    np.subtract(line, signal_line, out=line)
+    ema(line, signal, out=signal_line)
+    return line, signal_line
+
+
+# ---------- windows ----------
+
+def _block_moments(seg, window: int, mean, var=None, ddof: int = 1):
+    # seg: (rows, blocks, block + window - 1) with each block's window - 1 bars of history;
+    # mean / var: (rows, blocks, block) output views
+    ref = seg[..., window - 1:window]
+    centered = seg - ref
+    csum = np.empty(centered.shape[:-1] + (centered.shape[-1] + 1,))
+    csum[..., 0] = 0.0
+    csum[..., 1:] = np.cumsum(centered, axis=-1)
+    sums = np.subtract(csum[..., window:], csum[..., :-window], out=mean)
+
+    if var is not None:
+        # sum((x - mean)^2) = sum((x - ref)^2) - sum(x - ref)^2 / window
+        np.multiply(sums, sums, out=var)
+        var /= -window
+        np.square(centered, out=centered)
+        csum[..., 1:] = np.cumsum(centered, axis=-1)
+        var += csum[..., window:]
+        var -= csum[..., :-window]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var /= window - ddof
+        np.maximum(var, 0.0, out=var)
+
+    mean /= window
+    mean += ref
+
+
+def _rolling_moments(x2, window: int, mean2, var2=None, ddof: int = 1):
+    # Rolling mean (and variance) from prefix sums restarted every block about a value
+    # local to that block, which keeps the sums small and the variance free of the
+    # cancellation a plain sum-of-squares formula suffers on price levels. Whole blocks
+    # are handled at once through a strided view, each with its window - 1 bars of
+    # history, and written straight into the output; the ragged tail goes separately.
+    if window < 1:
+        raise ValueError("Window must be at least 1.")
+    rows, n = x2.shape
+    head = min(window - 1, n)
+    mean2[:, :head] = np.nan
+    if var2 is not None:
+        var2[:, :head] = np.nan
+    if n < window:
+        return
+
+    missing = np.isnan(x2)
+    gaps = missing.any()
+    values = np.where(missing, 0.0, x2) if gaps else x2
+    n_out = n - window + 1
+    block = max(ROLLING_BLOCK, 4 * window)
+    full = n_out // block
+
+    def out_view(a, start, stop, blocks):
+        return a[:, start:stop].reshape(rows, blocks, -1) if a is not None else None
+
+    stop = window - 1 + full * block
+    if full:
+        seg = sliding_window_view(values[:, :stop], block + window - 1, axis=-1)[:, ::block]
+        _block_moments(seg, window, out_view(mean2, window - 1, stop, full), out_view(var2, window - 1, stop, full), ddof)
+    if stop < n:
+        seg = values[:, stop - window + 1:][:, None, :]
+        _block_moments(seg, window, out_view(mean2, stop, n, 1), out_view(var2, stop, n, 1), ddof)
+
+    if gaps:
+        counts = np.zeros((rows, n + 1), dtype=np.int64)
+        counts[:, 1:] = np.cumsum(missing, axis=-1)
+        holes = counts[:, window:] > counts[:, :-window]
+        mean2[:, window - 1:][holes] = np.nan
+        if var2 is not None:
+            var2[:, window - 1:][holes] = np.nan
+
+
+def sma(x, window: int, out=None) -> np.ndarray:
+    """``Series.rolling(window).mean()``."""
+    x2, out, out2 = _prepare(x, out)
+    _rolling_moments(x2, window, out2)
+    return out
+
+
+def rolling_std(x, window: int, ddof: int = 1, out=None) -> np.ndarray:
+    """``Series.rolling(window).std(ddof)``."""
+    x2, out, out2 = _prepare(x, out)
+    _rolling_moments(x2, window, np.empty_like(out2), out2, ddof)
+    np.sqrt(out2, out=out2)
+    return out
+
+
+def bollinger(x, window: int = 20, num_std: float = 2, out=None):
+    """``(mid, upper, lower)`` bands: the SMA plus and minus ``num_std`` rolling standard deviations."""
+    mid_out, upper_out, lower_out = out if out is not None else (None, None, None)
+    x2, mid, mid2 = _prepare(x, mid_out)
+    _, upper, upper2 = _prepare(x, upper_out)
+    _, lower, lower2 = _prepare(x, lower_out)
+    _rolling_moments(x2, window, mid2, lower2)
+    np.sqrt(lower2, out=lower2)
+    lower2 *= num_std
+    np.add(mid2, lower2, out=upper2)
+    np.subtract(mid2, lower2, out=lower2)
+    return mid, upper, lower
+
+
+def roc(x, period: int, out=None) -> np.ndarray:
+    """``Series.pct_change(periods=period) * 100``, missing closes padded with the last one like pandas."""
+    if period < 1:
+        raise ValueError("ROC period must be at least 1.")
+    x2, out, out2 = _prepare(x, out)
+    x2, _ = _fill(x2, leading=False)
+    head = min(period, x2.shape[-1])
+    out2[:, :head] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(x2[:, period:], x2[:, :-period], out=out2[:, head:])
+    out2[:, head:] -= 1.0
+    out2[:, head:] *= 100.0
+    return out
+
+
+def atr(high, low, close, period: int = 14, out=None) -> np.ndarray:
+    """
+    Wilder's average true range. The true range of a bar is the largest of
+    ``high - low`` and the distances from the previous close to ``high`` and
+    ``low``; it is seeded and smoothed like ``rsi``, so the first value is on
+    bar ``period``.
+    """
+    if period < 1:
+        raise ValueError("ATR period must be at least 1.")
+    close2, out, out2 = _prepare(close, out)
+    high2 = np.asarray(high, dtype=float).reshape(close2.shape)
+    low2 = np.asarray(low, dtype=float).reshape(close2.shape)
+
+    true_range = high2 - low2
+    prev = close2[:, :-1]
+    np.maximum(true_range[:, 1:], np.abs(high2[:, 1:] - prev), out=true_range[:, 1:])
+    np.maximum(true_range[:, 1:], np.abs(low2[:, 1:] - prev), out=true_range[:, 1:])
+    true_range, first = _fill(true_range)
+    _wilder(true_range, period, first, out2)
+    return out
@@ -0,0 +1,64 @@
+# app/lazy_routes.py
+
+import asyncio
+import importlib
+
+from app.telemetry import stage
+
+# Paths that render the whole API, so every router has to be loaded first
+DOCS_PATHS = ("/openapi.json", "/docs", "/redoc")
+
+
+def include_all(app, routes: dict):
+    """Eagerly import every module in ``routes`` and include its ``router``."""
+    for module in routes:
+        app.include_router(importlib.import_module(module).router)
+
+
+class LazyRouters:
+    """
+    ASGI middleware that imports a route module and includes its ``router``
+    the first time a request hits one of its paths, so a cold start only pays
+    for FastAPI itself. ``routes`` maps module names to the paths they serve;
+    a path also covers everything below it (``/strategies`` -> ``/strategies/{id}``).
+    The import runs off the event loop; other requests keep being served.
+    """
+
+    def __init__(self, app, routes: dict):
+        self.app = app
+        self.routes = routes
+        self._by_path = {path: module for module, paths in routes.items() for path in paths}
+        self._loaded = set()
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            if scope["path"] in DOCS_PATHS:
+                modules = list(self.routes)
+            else:
+                module = self._module_for(scope["path"])
+                modules = [module] if module else []
+            if any(module not in self._loaded for module in modules):
+                await self._load(scope["app"], modules)
+        await self.app(scope, receive, send)
+
+    def _module_for(self, path: str):
+        while path:
+            module = self._by_path.get(path)
+            if module is not None:
+                return module
+            path = path.rpartition("/")[0]
+        return None
+
+    async def _load(self, app, modules: list):
+        async with self._lock:
+            pending = [module for module in modules if module not in self._loaded]
+            if not pending:
+                return
+            with stage("router_import"):
+                routers = await asyncio.to_thread(lambda: [importlib.import_module(m).router for m in pending])
+            for module, router in zip(pending, routers):
+                app.include_router(router)
+                self._loaded.add(module)
+            # Regenerate the schema with the new routes on the next /openapi.json
+            app.openapi_schema = None
@@ -0,0 +1,193 @@
+# app/llm.py
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from types import SimpleNamespace
+
+from app.parallel import run_io
+from app.telemetry import record_cache, stage
+
+MODEL = os.getenv("QTRADER_LLM_MODEL", "gpt-4o")
+TEMPERATURE = float(os.getenv("QTRADER_LLM_TEMPERATURE", 0.7))
+# Deterministic requests use temperature 0 and a fixed seed, so a cached answer is also the reproducible one
+DETERMINISTIC = os.getenv("QTRADER_LLM_DETERMINISTIC", "0") == "1"
+SEED = int(os.getenv("QTRADER_LLM_SEED", 7))
+DEFAULT_CACHE_DIR = os.getenv("QTRADER_LLM_CACHE_DIR", "app/data_cache/llm")
+
+
+# ---------- clients ----------
+
+STUB_STRATEGY = """import pandas as pd
+
+def strategy(df):
+    short = df['Close'].rolling(20).mean()
+    long = df['Close'].rolling(50).mean()
+    signal = (short > long).astype(int) - (short < long).astype(int)
+    return signal.rename('signal')
+"""
+
+
+class StubClient:
+    """
+    Offline stand-in for ``AsyncOpenAI``: every chat completion answers with
+    ``code`` after ``delay`` seconds, and the call arguments are kept in
+    ``calls`` so tests can count upstream requests.
+    """
+
+    def __init__(self, code: str = STUB_STRATEGY, delay: float = 0.0):
+        self.code = code
+        self.delay = delay
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.code))])
+
+
+def client_from_env():
+    # QTRADER_LLM_CLIENT=stub answers locally without an API key (tests, offline demos)
+    if os.getenv("QTRADER_LLM_CLIENT", "openai") == "stub":
+        return StubClient()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("❌ OPENAI_API_KEY not found.")
+    from openai import AsyncOpenAI  # the SDK alone takes ~0.4s to import
+    return AsyncOpenAI(api_key=api_key)
+
+
+_client = None
+
+
+def get_client():
+    """The chat client, created on first use; the app still starts (and other routes work) without a key."""
+    global _client
+    if _client is None:
+        _client = client_from_env()
+    return _client
+
+
+def set_client(client):
+    global _client
+    _client = client
+
+
+# ---------- validation ----------
+
+def validate_strategy(text: str) -> dict:
+    """Register generated code so it's compiled and checked once; ``id`` lets a hit be run right away."""
+    from app.sandbox import SandboxError
+    from app.strategy_registry import get_registry
+
+    try:
+        strategy, _ = get_registry().register(text)
+    except SandboxError as e:
+        return {"valid": False, "error": f"{e.stage}: {e}", "id": None}
+    return {"valid": True, "error": None, "id": strategy.id}
+
+
+# ---------- cache ----------
+
+def normalize_objective(objective: str) -> str:
+    """Case- and whitespace-insensitive form of an objective, used for the cache key."""
+    return " ".join(objective.split()).lower()
+
+
+def completion_key(objective: str, template: str, params: dict) -> str:
+    payload = {"objective": normalize_objective(objective), "template": template, **params}
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True).encode(), digest_size=20).hexdigest()
+
+
+class LLMCache:
+    """Generated strategies on disk, one ``<key>.json`` per normalized objective and model parameters."""
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key + ".json")
+
+    def get(self, key: str):
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, entry: dict):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+_cache = None
+_inflight = {}
+
+
+def get_llm_cache() -> LLMCache:
+    global _cache
+    if _cache is None:
+        _cache = LLMCache()
+    return _cache
+
+
+def completion_params(deterministic: bool = DETERMINISTIC) -> dict:
+    if deterministic:
+        return {"model": MODEL, "temperature": 0.0, "seed": SEED}
+    return {"model": MODEL, "temperature": TEMPERATURE}
+
+
+async def _generate(key: str, objective: str, template: str, params: dict) -> dict:
+    prompt = template.format(objective=" ".join(objective.split()))
+    with stage("llm"):
+        response = await get_client().chat.completions.create(
+            messages=[{"role": "user", "content": prompt}], **params
+        )
+    code = response.choices[0].message.content.strip()
+    with stage("validate"):
+        strategy = await run_io(validate_strategy, code)
+
+    entry = {"objective": normalize_objective(objective), **params, "code": code, "strategy": strategy}
+    await run_io(get_llm_cache().put, key, entry)
+    return entry
+
+
+async def generate_strategy_code(objective: str, template: str, deterministic: bool = DETERMINISTIC, refresh: bool = False):
+    """
+    Strategy code for ``objective`` as ``(entry, cached)``.
+
+    ``template`` is the prompt with an ``{objective}`` placeholder. Answers
+    are cached on disk under the normalized objective, template and model
+    parameters; ``refresh`` skips the lookup and replaces the stored entry.
+    Concurrent identical requests share one upstream call.
+    """
+    params = completion_params(deterministic)
+    key = completion_key(objective, template, params)
+
+    if not refresh:
+        entry = await run_io(get_llm_cache().get, key)
+        if entry is not None:
+            record_cache("llm", hits=1)
+            return entry, True
+
+    flight = _inflight.get(key)
+    if flight is not None:
+        record_cache("llm", hits=1)
+        return await asyncio.shield(flight), True
+
+    record_cache("llm", misses=1)
+    flight = _inflight[key] = asyncio.ensure_future(_generate(key, objective, template, params))
+    try:
+        # Shielded so a client disconnecting doesn't cancel the call others are waiting on
+        return await asyncio.shield(flight), False
+    finally:
+        if _inflight.get(key) is flight:
+            del _inflight[key]
@@ -0,0 +1,143 @@
+# app/market_data.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+from app.data_loader import fetch_many
+from app.parallel import run_io
+from app.telemetry import stage, record_cache
+
+DEFAULT_TTL_SECONDS = float(os.getenv("QTRADER_MEMORY_TTL", 15 * 60))
+DEFAULT_MAX_ENTRIES = int(os.getenv("QTRADER_MEMORY_MAX_ENTRIES", 64))
+
+
+def normalize_prices(data: pd.DataFrame, adjust: bool = True) -> pd.DataFrame:
+    """
+    Flatten yfinance columns, optionally apply the split/dividend adjustment
+    ``yf.download(auto_adjust=True)`` does, and move the index into a ``Date`` column.
+    """
+    df = data.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    df.columns.name = None
+
+    if adjust and "Adj Close" in df.columns:
+        ratio = df["Adj Close"] / df["Close"]
+        for column in ("Open", "High", "Low"):
+            if column in df.columns:
+                df[column] = df[column] * ratio
+        df["Close"] = df["Adj Close"]
+        df = df.drop(columns="Adj Close")
+
+    df.index.name = "Date"
+    return df.reset_index()
+
+
+class MarketDataService:
+    """
+    Process-wide in-memory cache of normalized price frames.
+
+    Entries expire after ``ttl`` seconds and the least recently used one is
+    dropped once more than ``max_entries`` are held. Misses fall through to
+    ``fetch_price_data`` and its on-disk store.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return None
+            stored_at, frame = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._frames[key]
+                return None
+            self._frames.move_to_end(key)
+            return frame
+
+    def _insert(self, key, frame: pd.DataFrame):
+        with self._lock:
+            self._frames[key] = (time.monotonic(), frame)
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.max_entries:
+                self._frames.popitem(last=False)
+
+    def get_prices(self, symbol: str, start: str, end: str, adjust: bool = True) -> pd.DataFrame:
+        """Return a private copy of the normalized frame for ``symbol`` over ``[start, end)``."""
+        return self.get_many([symbol], start, end, adjust=adjust)[symbol]
+
+    def get_many(self, symbols: list, start: str, end: str, adjust: bool = True) -> dict:
+        """Like ``get_prices`` for several symbols; misses are loaded in one batched ``fetch_many``."""
+        frames = {}
+        missing = []
+        for symbol in dict.fromkeys(symbols):
+            frame = self._lookup((symbol.upper(), start, end, adjust))
+            if frame is not None:
+                self.hits += 1
+                frames[symbol] = frame.copy()
+            else:
+                missing.append(symbol)
+
+        record_cache("memory", hits=len(frames), misses=len(missing))
+        if missing:
+            self.misses += len(missing)
+            with stage("data_fetch"):
+                fetched = fetch_many(missing, start=start, end=end)
+            for symbol in missing:
+                frame = normalize_prices(fetched[symbol.upper()], adjust=adjust)
+                if not frame.empty:
+                    self._insert((symbol.upper(), start, end, adjust), frame)
+                frames[symbol] = frame.copy()
+
+        return frames
+
+    async def aget_many(self, symbols: list, start: str, end: str, adjust: bool = True) -> dict:
+        """
+        Async ``get_many``: frames already in memory are returned without leaving
+        the event loop; only misses wait on a fetch in the I/O pool.
+        """
+        frames = {}
+        for symbol in dict.fromkeys(symbols):
+            frame = self._lookup((symbol.upper(), start, end, adjust))
+            if frame is None:
+                break
+            frames[symbol] = frame.copy()
+        else:
+            self.hits += len(frames)
+            record_cache("memory", hits=len(frames))
+            return frames
+
+        return await run_io(self.get_many, symbols, start, end, adjust)
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+
+market_data = MarketDataService()
+
+
+def get_prices(symbol: str, start: str, end: str, adjust: bool = True) -> pd.DataFrame:
+    return market_data.get_prices(symbol, start, end, adjust=adjust)
+
+
+def get_many(symbols: list, start: str, end: str, adjust: bool = True) -> dict:
+    return market_data.get_many(symbols, start, end, adjust=adjust)
+
+
+async def aget_prices(symbol: str, start: str, end: str, adjust: bool = True) -> pd.DataFrame:
+    return (await market_data.aget_many([symbol], start, end, adjust=adjust))[symbol]
+
+
+async def aget_many(symbols: list, start: str, end: str, adjust: bool = True) -> dict:
+    return await market_data.aget_many(symbols, start, end, adjust=adjust)
@@ -0,0 +1,123 @@
+# app/monte_carlo.py
+
+import os
+
+import numpy as np
+
+from app.performance_metrics import return_metrics
+
+METHODS = ("block", "shuffle")
+
+# Upper bound on the working set of one chunk of paths
+CHUNK_BYTES = int(os.getenv("QTRADER_MONTE_CARLO_CHUNK_BYTES", 64 * 1024 * 1024))
+
+# 8-byte values alive per path and bar at a chunk's high-water mark. Scoring holds the gathered
+# paths, 1 + paths and its cumprod while filling the equity curve, then the paths, the equity curve,
+# its running peak and equity / peak (4); sharpe_ratio's std temporaries stay below that. Block
+# resampling holds starts, starts + offsets, idx and the gathered paths (at most 4, with
+# block_size=1). The per-bar shuffle peaks while generating: sort keys, order, segment starts,
+# lengths and output offsets, shift, tiled positions and idx (7). tests/test_monte_carlo.py checks
+# these with tracemalloc.
+PATH_ARRAYS = {"block": 4, "shuffle": 7}
+
+
+def block_bootstrap_paths(returns: np.ndarray, n_paths: int, block_size: int, rng) -> np.ndarray:
+    """
+    ``n_paths`` circular block-bootstrap resamples of ``returns`` as a
+    (paths x time) array: random blocks of ``block_size`` consecutive bars,
+    wrapping at the end, so short-range autocorrelation is kept.
+    """
+    n = len(returns)
+    block_size = max(1, min(block_size, n))
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_size)) % n
+    return returns[idx.reshape(n_paths, -1)[:, :n]]
+
+
+def trade_segments(n: int, trades=None):
+    """Start offsets and lengths of the holding periods split at ``trades`` (every bar if None)."""
+    if trades is None:
+        starts = np.arange(n)
+    else:
+        starts = np.unique(np.concatenate(([0], np.asarray(trades, dtype=int))))
+        starts = starts[(starts >= 0) & (starts < n)]
+    return starts, np.diff(np.append(starts, n))
+
+
+def shuffled_trade_paths(returns: np.ndarray, n_paths: int, rng, trades=None) -> np.ndarray:
+    """
+    ``n_paths`` reorderings of whole holding periods (or single bars when
+    ``trades`` is None). Each trade keeps its own bar sequence; only the
+    order in which trades happen changes, which moves drawdowns but not the
+    total return.
+    """
+    n = len(returns)
+    starts, lengths = trade_segments(n, trades)
+    order = np.argsort(rng.random((n_paths, len(starts))), axis=1)
+
+    seg_starts, seg_lengths = starts[order], lengths[order]
+    out_starts = np.cumsum(seg_lengths, axis=1) - seg_lengths
+    # Output bar j of a segment placed at out_start reads returns[start + (j - out_start)]
+    shift = np.repeat((seg_starts - out_starts).ravel(), seg_lengths.ravel())
+    idx = shift + np.tile(np.arange(n), n_paths)
+    return returns[idx.reshape(n_paths, n)]
+
+
+def path_metrics(paths: np.ndarray, periods_per_year: int = 252) -> dict:
+    """Sharpe, total return (%) and max drawdown (%) of every row of a (paths x time) return array."""
+    return return_metrics(paths, periods_per_year)
+
+
+def monte_carlo(returns, n_paths: int = 5000, method: str = "block", block_size: int = 20, trades=None,
+                seed: int = None, periods_per_year: int = 252) -> dict:
+    """
+    Distributions of Sharpe, total return and max drawdown over resampled paths.
+
+    Paths are generated and scored chunk by chunk so the working set stays
+    under ``CHUNK_BYTES`` however many paths are requested; each chunk is one
+    2-D array processed with whole-array operations. Returns the per-path
+    metric arrays alongside the original path's point estimates.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'. Choose from {', '.join(METHODS)}.")
+    returns = np.nan_to_num(np.asarray(returns, dtype=float))
+    if len(returns) < 2:
+        raise ValueError("At least two returns are needed.")
+
+    rng = np.random.default_rng(seed)
+    n = len(returns)
+    chunk = max(1, CHUNK_BYTES // ((n + 1) * 8 * PATH_ARRAYS[method]))
+
+    collected = {"sharpe_ratio": [], "total_return": [], "max_drawdown": []}
+    for done in range(0, n_paths, chunk):
+        size = min(chunk, n_paths - done)
+        if method == "block":
+            paths = block_bootstrap_paths(returns, size, block_size, rng)
+        else:
+            paths = shuffled_trade_paths(returns, size, rng, trades)
+        for name, values in path_metrics(paths, periods_per_year).items():
+            collected[name].append(values)
+        del paths
+
+    observed = {name: float(values[0]) for name, values in path_metrics(returns[None, :], periods_per_year).items()}
+    return {
+        "observed": observed,
+        "paths": {name: np.concatenate(parts) for name, parts in collected.items()},
+    }
+
+
+def summarize(result: dict, percentiles=(5, 25, 50, 75, 95)) -> dict:
+    """Mean, std and percentiles of each metric distribution, plus where the observed value ranks."""
+    out = {}
+    for name, values in result["paths"].items():
+        observed = result["observed"][name]
+        out[name] = {
+            "observed": round(observed, 4),
+            "mean": round(float(values.mean()), 4),
+            "std": round(float(values.std()), 4),
+            "percentiles": {str(p): round(float(v), 4) for p, v in zip(percentiles, np.percentile(values, percentiles))},
+            "observed_percentile": round(float((values < observed).mean() * 100), 2),
+        }
+    out["probability_of_loss"] = round(float((result["paths"]["total_return"] < 0).mean()), 4)
+    return out
@@ -0,0 +1,93 @@
+# app/parallel.py
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+BACKENDS = ("serial", "threads", "processes")
+DEFAULT_BACKEND = os.getenv("QTRADER_EXECUTION_BACKEND", "serial")
+
+CPU_WORKERS = int(os.getenv("QTRADER_CPU_WORKERS", os.cpu_count() or 1))
+IO_WORKERS = int(os.getenv("QTRADER_IO_WORKERS", 16))
+
+# Separate pools so slow downloads or sandbox waits never hold the slots backtests run in
+cpu_executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="qtrader-cpu")
+io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="qtrader-io")
+
+
+async def _run_in(executor, fn, *args, **kwargs):
+    # Carry the caller's context (e.g. an indicator_scope) into the worker thread
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """Await ``fn(*args, **kwargs)`` on the bounded CPU pool used for backtests and metrics."""
+    return await _run_in(cpu_executor, fn, *args, **kwargs)
+
+
+async def run_io(fn, *args, **kwargs):
+    """Await a blocking I/O call (downloads, sandbox jobs) on the I/O pool."""
+    return await _run_in(io_executor, fn, *args, **kwargs)
+
+_worker_shared = None
+
+
+def mp_context():
+    # forkserver children start from a clean, preloaded server process, which is
+    # both fast and safe to use from a threaded web server
+    methods = multiprocessing.get_all_start_methods()
+    if "forkserver" in methods:
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(["numpy", "pandas", "app.strategy_core", "app.sandbox"])
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+def _init_worker(shared, setup):
+    global _worker_shared
+    _worker_shared = shared
+    if setup is not None:
+        setup()
+
+
+def _call_in_worker(fn, task):
+    return fn(_worker_shared, task)
+
+
+def map_shared(fn, tasks, shared, backend: str = DEFAULT_BACKEND, max_workers: int = None, worker_setup=None) -> list:
+    """
+    Run ``fn(shared, task)`` for every task and return results in task order.
+
+    ``shared`` is the bulky read-only input (price arrays, frames). With the
+    ``processes`` backend it is sent to each worker once through the pool
+    initializer, so tasks only carry their own small arguments; ``fn`` and
+    ``worker_setup`` must then be module-level functions. ``worker_setup``
+    runs once per worker process, e.g. to open a long-lived memo.
+    The ``threads`` backend runs each task in a copy of the caller's context
+    so context-local state such as an ``indicator_scope`` is still shared.
+    """
+    tasks = list(tasks)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown execution backend '{backend}'. Choose from {', '.join(BACKENDS)}.")
+
+    if backend == "serial" or len(tasks) <= 1:
+        return [fn(shared, task) for task in tasks]
+
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+
+    if backend == "threads":
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(context.copy().run, fn, shared, task) for task in tasks]
+            return [future.result() for future in futures]
+
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=mp_context(), initializer=_init_worker, initargs=(shared, worker_setup)
+    ) as pool:
+        futures = [pool.submit(_call_in_worker, fn, task) for task in tasks]
+        return [future.result() for future in futures]
@@ -1,37 +1,166 @@
 import pandas as pd
 import numpy as np
+from app.telemetry import timed
+
+METRIC_NAMES = (
+    "total_return", "annual_return", "sharpe_ratio", "sortino_ratio", "max_drawdown",
+    "max_drawdown_duration", "win_rate", "exposure", "turnover",
+)
+RETURN_METRIC_NAMES = ("sharpe_ratio", "total_return", "max_drawdown")
+
+
+def _annualized(excess, scale, periods_per_year: int):
+    # Mean excess return over its scale, per year; 0 where the returns don't vary
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(scale > 0, excess / scale * np.sqrt(periods_per_year), 0.0)
+
+
+def sharpe_ratio(returns, periods_per_year: int = 252, risk_free_rate: float = 0.0):
+    """Annualized Sharpe ratio of per-bar ``returns`` along the last axis."""
+    returns = np.asarray(returns, dtype=float)
+    excess = returns.mean(axis=-1) - risk_free_rate / periods_per_year
+    return _annualized(excess, returns.std(axis=-1, ddof=1), periods_per_year)
+
+
+def moment_sharpe_ratio(total, total_sq, count: int, periods_per_year: int = 252, risk_free_rate: float = 0.0):
+    """
+    ``sharpe_ratio`` from the sum and sum of squares of ``count`` returns,
+    for callers that never hold the returns themselves (``sweep``).
+    """
+    mean = total / count
+    with np.errstate(divide="ignore", invalid="ignore"):
+        std = np.sqrt(np.maximum(total_sq - count * mean ** 2, 0.0) / (count - 1))
+    return _annualized(mean - risk_free_rate / periods_per_year, std, periods_per_year)
+
+
+def max_drawdown(equity, peak=None):
+    """Largest peak-to-trough fall (%) of ``equity`` along the last axis (``peak``: its running maximum, if known)."""
+    equity = np.asarray(equity, dtype=float)
+    if peak is None:
+        peak = np.maximum.accumulate(equity, axis=-1)
+    return (1.0 - (equity / peak).min(axis=-1)) * 100
+
+
+def return_metrics(returns, periods_per_year: int = 252, risk_free_rate: float = 0.0, names=RETURN_METRIC_NAMES) -> dict:
+    """
+    ``names`` (from ``RETURN_METRIC_NAMES``) for every row of a (curves x
+    time) array of per-bar returns, equal to what ``batch_metrics`` reports
+    for the equity curves they compound to from 1.
+    """
+    returns = np.atleast_2d(np.asarray(returns, dtype=float))  # no copy: Monte Carlo chunks are sized around this
+    metrics = {}
+    if "sharpe_ratio" in names:
+        metrics["sharpe_ratio"] = sharpe_ratio(returns, periods_per_year, risk_free_rate)
+    if "total_return" in names or "max_drawdown" in names:
+        equity = np.empty((len(returns), returns.shape[1] + 1))
+        equity[:, 0] = 1.0
+        # Not cumprod(out=...): NumPy 2.3.1's accumulate keeps a reference to ``out``, leaking the curve
+        equity[:, 1:] = np.cumprod(1.0 + returns, axis=1)
+        if "total_return" in names:
+            metrics["total_return"] = (equity[:, -1] - 1.0) * 100
+        if "max_drawdown" in names:
+            metrics["max_drawdown"] = max_drawdown(equity)
+    return {name: metrics[name] for name in names}
+
+
+@timed("metrics")
+def batch_metrics(equity, positions=None, periods_per_year: int = 252, years=None, risk_free_rate: float = 0.0) -> dict:
+    """
+    Performance metrics for every row of a (curves x time) equity array.
+
+    Works on NaN-free equity curves in plain NumPy: per-bar returns and the
+    running peak are each computed once and every metric is reduced from
+    them along the time axis. ``positions`` (same shape, the position held
+    over each bar as in ``engine.BacktestResult``) adds turnover and
+    measures exposure and win rate over bars in the market; without it any
+    bar with a non-zero return counts as active. ``years`` defaults to
+    the bar count over ``periods_per_year``.
+
+    Returns one array per name in ``METRIC_NAMES`` (turnover only with
+    ``positions``). Returns, drawdown, win rate and exposure are
+    percentages, the drawdown duration is in bars and turnover is position
+    change per year.
+    """
+    equity = np.array(equity, dtype=float, ndmin=2)
+    k, n = equity.shape
+    if n < 2:
+        names = METRIC_NAMES if positions is not None else METRIC_NAMES[:-1]
+        return {name: np.full(k, np.nan) for name in names}
+
+    returns = equity[:, 1:] / equity[:, :-1]
+    returns -= 1.0
+    if years is None:
+        years = (n - 1) / periods_per_year
+
+    growth = equity[:, -1] / equity[:, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annual_return = growth ** (1.0 / years) - 1.0 if years > 0 else np.full(k, np.nan)
+
+    sharpe = sharpe_ratio(returns, periods_per_year, risk_free_rate)
+    excess = returns.mean(axis=1) - risk_free_rate / periods_per_year
+    downside = np.sqrt(np.mean(np.square(np.minimum(returns, 0.0)), axis=1))
+    sortino = _annualized(excess, downside, periods_per_year)
+
+    peak = np.maximum.accumulate(equity, axis=1)
+    # Bars since the last new high; its maximum is the longest time under water
+    bars = np.arange(n)
+    last_peak = np.maximum.accumulate(np.where(equity >= peak, bars, 0), axis=1)
+    drawdown_duration = (bars - last_peak).max(axis=1)
+
+    turnover = None
+    if positions is None:
+        active = returns != 0
+    else:
+        positions = np.array(positions, dtype=float, ndmin=2)
+        active = positions[:, 1:] != 0
+        changes = np.abs(np.diff(positions, axis=1, prepend=0.0)).sum(axis=1)
+        turnover = changes / years if years > 0 else np.full(k, np.nan)
+
+    exposure = active.mean(axis=1)
+    active_bars = active.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.where(active_bars > 0, ((returns > 0) & active).sum(axis=1) / active_bars, 0.0)
+
+    metrics = {
+        "total_return": (growth - 1.0) * 100,
+        "annual_return": annual_return * 100,
+        "sharpe_ratio": sharpe,
+        "sortino_ratio": sortino,
+        "max_drawdown": max_drawdown(equity, peak),
+        "max_drawdown_duration": drawdown_duration,
+        "win_rate": win_rate * 100,
+        "exposure": exposure * 100,
+    }
+    if turnover is not None:
+        metrics["turnover"] = turnover
+    return metrics
+
+
+def equity_metrics(equity, positions=None, periods_per_year: int = 252, years=None, risk_free_rate: float = 0.0) -> dict:
+    """Single-curve form of ``batch_metrics`` returning plain floats."""
+    result = batch_metrics(equity, None if positions is None else [positions], periods_per_year, years, risk_free_rate)
+    return {name: float(values[0]) for name, values in result.items()}
+
+
+def rounded(metrics: dict, digits: int) -> dict:
+    return {name: round(value, digits) for name, value in metrics.items()}
+
 
 def compute_sharpe(portfolio_value, risk_free_rate=0.0):
-    returns = portfolio_value.pct_change().dropna()
-    excess_returns = returns - risk_free_rate / 252
-    if excess_returns.std() == 0:
-        return float("nan")
-    return np.sqrt(252) * excess_returns.mean() / excess_returns.std()
+    return equity_metrics(portfolio_value.dropna().to_numpy(), risk_free_rate=risk_free_rate)["sharpe_ratio"]
+
 
 def compute_max_drawdown(portfolio_value):
-    cumulative_max = portfolio_value.cummax()
-    drawdown = (portfolio_value - cumulative_max) / cumulative_max
-    return abs(drawdown.min())
+    return equity_metrics(portfolio_value.dropna().to_numpy())["max_drawdown"] / 100
+
 
 def calculate_metrics(portfolio_value):
     portfolio_value_clean = portfolio_value.dropna()
 
-    total_return = float("nan")
-    annual_return = float("nan")
-
+    years = None
     if len(portfolio_value_clean) >= 2:
-        start_value = portfolio_value_clean.iloc[0]
-        end_value = portfolio_value_clean.iloc[-1]
-        num_years = (portfolio_value_clean.index[-1] - portfolio_value_clean.index[0]).days / 365.25
-        total_return = (end_value / start_value) - 1
-        annual_return = (1 + total_return) ** (1 / num_years) - 1
-
-    sharpe_ratio = compute_sharpe(portfolio_value_clean)
-    max_drawdown = compute_max_drawdown(portfolio_value_clean)
+        years = (portfolio_value_clean.index[-1] - portfolio_value_clean.index[0]).days / 365.25
 
-    return {
-        "total_return": total_return * 100,
-        "annual_return": annual_return * 100,
-        "sharpe_ratio": sharpe_ratio,
-        "max_drawdown": max_drawdown * 100,
-    }
+    metrics = equity_metrics(portfolio_value_clean.to_numpy(dtype=float), years=years)
+    # NaN (too few points) is not valid JSON
+    return {name: None if np.isnan(value) else value for name, value in metrics.items()}
@@ -0,0 +1,212 @@
+# app/portfolio.py
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from app.engine import market_returns
+from app.telemetry import timed
+
+SCHEDULES = ("daily", "weekly", "monthly", "quarterly", "yearly", "never")
+
+# How far ahead to look for a threshold breach at a time, so a long gap between
+# scheduled rebalances doesn't mean computing drift for bars past the next breach
+THRESHOLD_SEARCH_BARS = 63
+
+
+class PortfolioResult(NamedTuple):
+    equity: np.ndarray       # portfolio value per bar, after that bar's rebalance
+    cash: np.ndarray         # uninvested cash per bar
+    holdings: np.ndarray     # (assets x time) value held in each asset after the bar's rebalance
+    weights: np.ndarray      # holdings / equity
+    traded: np.ndarray       # (assets x time) value bought or sold per asset and bar
+    costs: np.ndarray        # (assets x time) transaction cost paid per asset and bar
+    rebalances: np.ndarray   # bar indices where the portfolio was rebalanced
+    pnl: np.ndarray          # (assets x time) profit per asset and bar, before costs
+
+
+# ---------- target weights ----------
+
+def static_weights(allocation: np.ndarray, n_bars: int) -> np.ndarray:
+    """The same target allocation (one weight per asset) on every bar."""
+    return np.repeat(np.asarray(allocation, dtype=float)[:, None], n_bars, axis=1)
+
+
+def equal_weights(close: np.ndarray) -> np.ndarray:
+    """1/N of the portfolio in each asset that has a price on that bar."""
+    available = ~np.isnan(close)
+    counts = available.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(available, 1.0 / counts, 0.0)
+
+
+def signal_weights(signals: np.ndarray, long_only: bool = False) -> np.ndarray:
+    """
+    Weights from a (assets x time) matrix of +1 / 0 / -1 signals: equal
+    weight across the assets with a non-zero signal, so the gross exposure
+    is 1 whenever anything is held. NaN counts as 0.
+    """
+    signals = np.nan_to_num(np.asarray(signals, dtype=float), nan=0.0)
+    if long_only:
+        signals = np.maximum(signals, 0.0)
+    gross = np.abs(signals).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(gross > 0, signals / gross, 0.0)
+
+
+# ---------- rebalancing ----------
+
+def rebalance_schedule(dates: np.ndarray, every) -> np.ndarray:
+    """
+    Boolean mask of scheduled rebalance bars: the first bar of each calendar
+    period for a name in ``SCHEDULES``, or every ``n`` bars for an integer.
+    The first bar is always included (initial allocation).
+    """
+    n = len(dates)
+    mask = np.zeros(n, dtype=bool)
+    if isinstance(every, (int, np.integer)):
+        if every < 1:
+            raise ValueError("Rebalance interval must be at least 1 bar.")
+        mask[::every] = True
+        return mask
+    if every not in SCHEDULES:
+        raise ValueError(f"Unknown rebalance schedule '{every}'. Choose from {', '.join(SCHEDULES)} or a bar count.")
+
+    if every == "daily":
+        mask[:] = True
+    elif every != "never" and n:
+        days = np.asarray(dates, dtype="datetime64[D]")
+        if every == "weekly":
+            # Day 0 (1970-01-01) is a Thursday; shift so weeks start on Monday
+            periods = (days.astype("int64") + 3) // 7
+        elif every == "yearly":
+            periods = days.astype("datetime64[Y]").astype("int64")
+        else:
+            periods = days.astype("datetime64[M]").astype("int64")
+            if every == "quarterly":
+                periods //= 3
+        mask[1:] = periods[1:] != periods[:-1]
+    if n:
+        mask[0] = True
+    return mask
+
+
+def _first_breach(holdings: np.ndarray, cash: float, targets: np.ndarray, threshold: float):
+    # Index of the first bar (after the first) whose weights drifted more than ``threshold`` from target
+    equity = cash + holdings.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drift = np.abs(holdings / equity - targets).max(axis=0)
+    hits = np.flatnonzero(drift[1:] > threshold)
+    return hits[0] + 1 if len(hits) else None
+
+
+@timed("portfolio")
+def backtest_portfolio(close, weights, dates=None, initial_cash: float = 100_000, rebalance="monthly",
+                       threshold: float = None, cost_bps: float = 0.0) -> PortfolioResult:
+    """
+    Simulate a portfolio that trades to target ``weights`` at the close.
+
+    ``close`` and ``weights`` are aligned (assets x time) arrays; weights
+    are fractions of equity (negative = short) and whatever they leave
+    unallocated stays in cash, which earns nothing. The portfolio is
+    rebalanced to the current targets on ``rebalance`` bars (see
+    ``rebalance_schedule``; calendar schedules need ``dates``) and, with
+    ``threshold``, whenever any weight has drifted further than that from
+    its target. Every rebalance pays ``cost_bps`` on the value traded.
+    Between rebalances holdings simply follow their prices. Targets on
+    assets without a price yet are treated as 0.
+
+    Work is vectorized over assets and over each stretch between
+    rebalances, so the loop runs once per rebalance, not once per bar.
+    """
+    close = np.array(close, dtype=float, ndmin=2)
+    targets = np.array(weights, dtype=float, ndmin=2)
+    if targets.shape != close.shape:
+        raise ValueError("Weights must have the same (assets x time) shape as prices.")
+    n_assets, n = close.shape
+    targets = np.where(np.isnan(close), 0.0, np.nan_to_num(targets, nan=0.0))
+
+    if isinstance(rebalance, str) and rebalance not in ("daily", "never") and dates is None:
+        raise ValueError("Calendar rebalance schedules need dates.")
+    scheduled = np.flatnonzero(rebalance_schedule(dates if dates is not None else np.zeros(n), rebalance))
+    cost_rate = cost_bps / 10_000
+
+    # Not cumprod(out=growth): NumPy 2.3.1 leaks a reference to the out array
+    growth = np.cumprod(np.add(market_returns(close), 1.0), axis=1)
+
+    holdings = np.empty((n_assets, n))
+    cash = np.empty(n)
+    traded = np.zeros((n_assets, n))
+    rebalances = []
+
+    values = np.zeros(n_assets)
+    cash_now = float(initial_cash)
+    t = 0
+    while t < n:
+        # Trade to target at this bar's close
+        equity_now = cash_now + values.sum()
+        target = targets[:, t]
+        trade = np.abs(target * equity_now - values)
+        equity_now -= cost_rate * trade.sum()
+        values = target * equity_now
+        cash_now = equity_now - values.sum()
+        traded[:, t] = trade
+        rebalances.append(t)
+
+        # Hold until the next scheduled bar or the first threshold breach
+        following = np.searchsorted(scheduled, t, side="right")
+        end = scheduled[following] if following < len(scheduled) else n
+        if threshold is not None:
+            start = t
+            while start < end - 1:
+                stop = min(end, start + THRESHOLD_SEARCH_BARS)
+                block = values[:, None] * (growth[:, start:stop] / growth[:, t:t + 1])
+                breach = _first_breach(block, cash_now, targets[:, start:stop], threshold)
+                if breach is not None and start + breach < end:
+                    end = start + breach
+                    break
+                start = stop - 1
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            relative = np.nan_to_num(growth[:, t:end] / growth[:, t:t + 1], nan=0.0)
+        holdings[:, t:end] = values[:, None] * relative
+        cash[t:end] = cash_now
+        if end < n:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = values * np.nan_to_num(growth[:, end] / growth[:, t], nan=0.0)
+        t = end
+
+    equity = cash + holdings.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        held_weights = np.where(equity != 0, holdings / equity, 0.0)
+
+    # P&L over bar t comes from what was held after bar t-1's rebalance
+    pnl = np.zeros((n_assets, n))
+    pnl[:, 1:] = holdings[:, :-1] * (growth[:, 1:] / np.where(growth[:, :-1] == 0, 1.0, growth[:, :-1]) - 1.0)
+
+    return PortfolioResult(equity, cash, holdings, held_weights, traded, traded * cost_rate, np.asarray(rebalances), pnl)
+
+
+def attribution(result: PortfolioResult, symbols: list, initial_cash: float = 100_000, periods_per_year: int = 252) -> pd.DataFrame:
+    """
+    Per-asset breakdown: P&L before and after costs, net P&L as a share of
+    the starting capital (the contributions sum to the total return),
+    average and final weight, and annualized turnover (value traded over
+    average equity, per year).
+    """
+    n = result.equity.shape[-1]
+    years = max(n - 1, 1) / periods_per_year
+    pnl = result.pnl.sum(axis=1)
+    costs = result.costs.sum(axis=1)
+    turnover = result.traded.sum(axis=1) / result.equity.mean() / years
+    return pd.DataFrame({
+        "symbol": symbols,
+        "pnl": pnl,
+        "costs": costs,
+        "net_pnl": pnl - costs,
+        "contribution": (pnl - costs) / initial_cash * 100,
+        "avg_weight": result.weights.mean(axis=1) * 100,
+        "final_weight": result.weights[:, -1] * 100,
+        "turnover": turnover,
+    })
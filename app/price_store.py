@@ -0,0 +1,179 @@
+# app/price_store.py
+
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = "app/data_cache"
+DEFAULT_MAX_BYTES = int(os.getenv("QTRADER_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# Read times are kept in memory and folded into the manifest on writes, or at most this often on reads
+ACCESS_FLUSH_SECONDS = float(os.getenv("QTRADER_CACHE_ACCESS_FLUSH", 60))
+
+MANIFEST_NAME = "manifest.json"
+DATE_COLUMN = "Date"
+
+
+def _safe_name(symbol: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._^=-]", "_", symbol.upper())
+
+
+def _column_file(column: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]", "_", column) + ".npy"
+
+
+class PriceStore:
+    """
+    Per-symbol columnar price store.
+
+    Every symbol lives in its own directory with one memory-mapped ``.npy``
+    file per column. ``manifest.json`` records the date range each symbol
+    covers (``start`` inclusive, ``end`` exclusive, like yfinance), its size
+    on disk and when it was last read, so any sub-range can be served by
+    slicing the stored superset and the least recently used symbols can be
+    dropped once the store goes over ``max_bytes``. Ranges reaching past
+    today are recorded as ending today, since later bars don't exist yet.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        os.makedirs(self.root, exist_ok=True)
+        self._manifest = self._load_manifest()
+        self._accessed = {}
+        self._flushed_at = time.monotonic()
+
+    # ---------- manifest ----------
+
+    @property
+    def _manifest_path(self) -> str:
+        return os.path.join(self.root, MANIFEST_NAME)
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self._manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        for key, accessed_at in self._accessed.items():
+            if key in self._manifest:
+                self._manifest[key]["last_access"] = accessed_at
+        self._accessed.clear()
+        self._flushed_at = time.monotonic()
+
+        tmp_path = self._manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self._manifest_path)
+
+    # ---------- queries ----------
+
+    def coverage(self, symbol: str):
+        """Return the stored ``(start, end)`` for ``symbol`` or ``None``."""
+        entry = self._manifest.get(symbol.upper())
+        if entry is None:
+            return None
+        return entry["start"], entry["end"]
+
+    def covers(self, symbol: str, start: str, end: str) -> bool:
+        stored = self.coverage(symbol)
+        if stored is None:
+            return False
+        return pd.Timestamp(stored[0]) <= pd.Timestamp(start) and pd.Timestamp(end) <= pd.Timestamp(stored[1])
+
+    def total_bytes(self) -> int:
+        return sum(entry["bytes"] for entry in self._manifest.values())
+
+    def get(self, symbol: str, start: str, end: str):
+        """Slice ``[start, end)`` out of the stored superset, or ``None`` on a miss."""
+        key = symbol.upper()
+        with self._lock:
+            if not self.covers(key, start, end):
+                return None
+            entry = self._manifest[key]
+            directory = os.path.join(self.root, entry["dir"])
+            try:
+                dates = np.load(os.path.join(directory, _column_file(DATE_COLUMN)), mmap_mode="r")
+                lo, hi = np.searchsorted(dates, [np.datetime64(pd.Timestamp(start)), np.datetime64(pd.Timestamp(end))])
+                columns = {
+                    column: np.load(os.path.join(directory, _column_file(column)), mmap_mode="r")[lo:hi]
+                    for column in entry["columns"]
+                }
+            except (OSError, ValueError):
+                # Files went missing or got truncated — forget the entry and let the caller refetch
+                self._drop(key)
+                self._save_manifest()
+                return None
+
+            self._accessed[key] = time.time()
+            if time.monotonic() - self._flushed_at > ACCESS_FLUSH_SECONDS:
+                self._save_manifest()
+
+        index = pd.DatetimeIndex(np.asarray(dates[lo:hi]), name=DATE_COLUMN)
+        return pd.DataFrame(columns, index=index)
+
+    # ---------- writes ----------
+
+    def put(self, symbol: str, start: str, end: str, data: pd.DataFrame):
+        """Store ``data`` as the full history of ``symbol`` over ``[start, end)``."""
+        key = symbol.upper()
+        end = min(pd.Timestamp(end), pd.Timestamp.today().normalize())
+        directory_name = _safe_name(key)
+        directory = os.path.join(self.root, directory_name)
+        tmp_directory = directory + ".tmp"
+
+        data = data.sort_index()
+        dates = pd.DatetimeIndex(data.index).tz_localize(None).values.astype("datetime64[ns]")
+
+        with self._lock:
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+            os.makedirs(tmp_directory)
+            np.save(os.path.join(tmp_directory, _column_file(DATE_COLUMN)), dates)
+            for column in data.columns:
+                np.save(os.path.join(tmp_directory, _column_file(column)), data[column].to_numpy(dtype="float64"))
+
+            shutil.rmtree(directory, ignore_errors=True)
+            os.replace(tmp_directory, directory)
+
+            self._manifest[key] = {
+                "dir": directory_name,
+                "start": str(pd.Timestamp(start).date()),
+                "end": str(pd.Timestamp(end).date()),
+                "rows": len(data),
+                "columns": [str(column) for column in data.columns],
+                "bytes": sum(
+                    os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+                ),
+                "last_access": time.time(),
+            }
+            self._evict(keep=key)
+            self._save_manifest()
+
+    def _drop(self, key: str):
+        self._accessed.pop(key, None)
+        entry = self._manifest.pop(key, None)
+        if entry is not None:
+            shutil.rmtree(os.path.join(self.root, entry["dir"]), ignore_errors=True)
+
+    def _evict(self, keep: str = None):
+        # Least recently read symbols go first; the one just written always stays
+        by_age = sorted(self._manifest, key=lambda k: self._accessed.get(k, self._manifest[k]["last_access"]))
+        for key in by_age:
+            if self.total_bytes() <= self.max_bytes:
+                break
+            if key != keep:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._manifest):
+                self._drop(key)
+            self._save_manifest()
@@ -0,0 +1,81 @@
+# app/providers.py
+
+import os
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+PRICE_COLUMNS = ["Adj Close", "Close", "High", "Low", "Open", "Volume"]
+
+
+def _tidy(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.dropna(how="all")
+    frame.columns.name = None
+    frame.index.name = "Date"
+    return frame
+
+
+class PriceProvider(ABC):
+    """
+    Source of raw (unadjusted) daily bars.
+
+    ``fetch`` gets every symbol in one call and returns ``{symbol: frame}``
+    with a ``Date`` index, flat OHLCV + ``Adj Close`` columns and rows in
+    ``[start, end)``. Symbols the provider knows nothing about map to an
+    empty frame.
+    """
+
+    @abstractmethod
+    def fetch(self, symbols: list, start: str, end: str) -> dict:
+        ...
+
+
+class YFinanceProvider(PriceProvider):
+    def fetch(self, symbols: list, start: str, end: str) -> dict:
+        import yfinance as yf
+
+        data = yf.download(
+            symbols, start=start, end=end, auto_adjust=False, group_by="ticker", threads=True, progress=False
+        )
+
+        frames = {}
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                level = next(
+                    (i for i, values in enumerate(data.columns.levels) if symbol in values), None
+                )
+                if level is None:
+                    frames[symbol] = pd.DataFrame(columns=PRICE_COLUMNS)
+                    continue
+                frame = data.xs(symbol, axis=1, level=level).copy()
+            else:
+                frame = data.copy()
+            frames[symbol] = _tidy(frame)
+        return frames
+
+
+class CSVProvider(PriceProvider):
+    """Reads ``<root>/<SYMBOL>.csv`` files laid out like ``DataFrame.to_csv`` of a yfinance download."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def fetch(self, symbols: list, start: str, end: str) -> dict:
+        frames = {}
+        for symbol in symbols:
+            path = os.path.join(self.root, f"{symbol.upper()}.csv")
+            if not os.path.exists(path):
+                frames[symbol] = pd.DataFrame(columns=PRICE_COLUMNS)
+                continue
+            frame = pd.read_csv(path, index_col=0, parse_dates=True)
+            frame = frame.loc[(frame.index >= pd.Timestamp(start)) & (frame.index < pd.Timestamp(end))]
+            frames[symbol] = _tidy(frame)
+        return frames
+
+
+def provider_from_env() -> PriceProvider:
+    # QTRADER_PRICE_PROVIDER=csv:/path/to/dir swaps yfinance for local files
+    spec = os.getenv("QTRADER_PRICE_PROVIDER", "yfinance")
+    if spec.startswith("csv:"):
+        return CSVProvider(spec[len("csv:"):])
+    return YFinanceProvider()
@@ -0,0 +1,226 @@
+# app/result_cache.py
+
+import hashlib
+import importlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+import pandas as pd
+from fastapi import Request, Response
+
+from app.parallel import run_io
+from app.telemetry import record_cache
+
+DEFAULT_CACHE_DIR = os.getenv("QTRADER_RESULT_CACHE_DIR", "app/data_cache/results")
+MEMORY_MAX_BYTES = int(os.getenv("QTRADER_RESULT_CACHE_MEMORY_BYTES", 64 * 1024 * 1024))
+DISK_MAX_BYTES = int(os.getenv("QTRADER_RESULT_CACHE_DISK_BYTES", 512 * 1024 * 1024))
+
+# Everything that shapes a response body; editing any of them invalidates earlier entries
+CODE_MODULES = (
+    "app.strategy_core", "app.indicators", "app.kernels", "app.engine", "app.performance_metrics",
+    "app.downsample", "app.serialization", "app.routes.backtest", "app.routes.compare",
+)
+
+_code_version = None
+
+
+def code_version() -> str:
+    """Hash of the source of ``CODE_MODULES``, computed once per process."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.blake2b(digest_size=16)
+        for name in CODE_MODULES:
+            with open(importlib.import_module(name).__file__, "rb") as f:
+                digest.update(f.read())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for name in df.columns:
+        digest.update(str(name).encode())
+        values = df[name].to_numpy()
+        # Object columns would hash their pointers, not their contents
+        digest.update(values.astype(str).tobytes() if values.dtype == object else values.tobytes())
+    return digest.hexdigest()
+
+
+def result_key(route: str, params: dict, frames: list) -> str:
+    """Content address of a response: route, normalized params, code version and input data."""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(json.dumps([route, params, code_version()], sort_keys=True, default=str).encode())
+    for frame in frames:
+        digest.update(frame_fingerprint(frame).encode())
+    return digest.hexdigest()
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    media_type: str
+    headers: dict
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+
+class ResultCache:
+    """
+    Rendered responses keyed by ``result_key``, in two size-bounded LRU tiers.
+
+    The memory tier holds up to ``memory_bytes`` of bodies. The disk tier
+    keeps one ``<key>.bin`` file per entry (a JSON header line followed by
+    the body) under ``root`` and drops the least recently read files once
+    they exceed ``disk_bytes``; disk hits are promoted back into memory.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, memory_bytes: int = MEMORY_MAX_BYTES, disk_bytes: int = DISK_MAX_BYTES):
+        self.root = root
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key + ".bin")
+
+    # ---------- memory tier ----------
+
+    def get_memory(self, key: str):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            return entry
+
+    def _put_memory(self, key: str, entry: CachedResponse):
+        if entry.size > self.memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_size -= previous.size
+            self._memory[key] = entry
+            self._memory_size += entry.size
+            while self._memory_size > self.memory_bytes:
+                _, dropped = self._memory.popitem(last=False)
+                self._memory_size -= dropped.size
+
+    # ---------- disk tier ----------
+
+    def get_disk(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                body = f.read()
+            os.utime(path)  # mtime doubles as last access for eviction
+        except (OSError, ValueError):
+            return None
+        entry = CachedResponse(body, header["media_type"], header["headers"])
+        self._put_memory(key, entry)
+        return entry
+
+    def _put_disk(self, key: str, entry: CachedResponse):
+        if entry.size > self.disk_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps({"media_type": entry.media_type, "headers": entry.headers}).encode() + b"\n")
+            f.write(entry.body)
+        os.replace(tmp_path, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        with self._disk_lock:
+            files = []
+            for name in os.listdir(self.root):
+                if name.endswith(".bin"):
+                    try:
+                        stat = os.stat(os.path.join(self.root, name))
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, name))
+            total = sum(size for _, size, _ in files)
+            for _, size, name in sorted(files):
+                if total <= self.disk_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except OSError:
+                    pass
+                total -= size
+
+    def put(self, key: str, entry: CachedResponse):
+        self._put_memory(key, entry)
+        self._put_disk(key, entry)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+        for name in os.listdir(self.root):
+            if name.endswith(".bin"):
+                os.remove(os.path.join(self.root, name))
+
+
+_cache = None
+
+
+def get_result_cache() -> ResultCache:
+    global _cache
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    # Weak comparison, as RFC 9110 specifies for If-None-Match
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _response(entry: CachedResponse, etag: str, status: str) -> Response:
+    headers = {**entry.headers, "ETag": etag, "Cache-Control": "no-cache", "X-Result-Cache": status}
+    return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+
+async def cached_response(request: Request, key: str, produce) -> Response:
+    """
+    Serve the response for ``key``: ``304`` when the client already has it
+    (``If-None-Match``), the stored body on a cache hit, or else the result
+    of ``await produce()``. Only ``200`` responses are stored; anything else
+    ``produce`` returns (e.g. an error dict) is passed through untouched.
+    """
+    etag = f'"{key}"'
+    if _etag_matches(request, etag):
+        record_cache("results", hits=1)
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    cache = get_result_cache()
+    entry = cache.get_memory(key) or await run_io(cache.get_disk, key)
+    if entry is not None:
+        record_cache("results", hits=1)
+        return _response(entry, etag, "hit")
+
+    record_cache("results", misses=1)
+    response = await produce()
+    if not isinstance(response, Response) or response.status_code != 200:
+        return response
+
+    headers = {name: value for name, value in response.headers.items()
+               if name.lower() in ("content-encoding", "vary")}
+    entry = CachedResponse(bytes(response.body), response.media_type, headers)
+    await run_io(cache.put, key, entry)
+    return _response(entry, etag, "miss")
@@ -1,100 +1,117 @@
 # ------------- app/routes/backtest.py (UPDATED WITH SPY BENCHMARK) -------------
 
-from fastapi import APIRouter, Query, HTTPException
-from datetime import datetime
-import yfinance as yf
-import plotly.graph_objects as go
+from fastapi import APIRouter, Query, HTTPException, Depends, Request
 import pandas as pd
 import numpy as np
-import traceback
-from app.utils.benchmark import fetch_benchmark
-from app.routes.metrics import compare_strategy_vs_benchmark
+from app import kernels
+from app.market_data import aget_many
+from app.parallel import run_cpu
+from app.engine import run_backtest
+from app.performance_metrics import equity_metrics, rounded
+from app.serialization import Table, ResponseFormat, response_format
+from app.telemetry import stage
+from app.result_cache import result_key, cached_response
+from app.downsample import downsample_indices
 
 router = APIRouter()
 
+def run_moving_average_backtest(df: pd.DataFrame, spy_df: pd.DataFrame, short_window: int, long_window: int, strategy: str, max_points: int = None) -> dict:
+    close = df["Close"].to_numpy(dtype=float)
+
+    # Benchmark SPY (buy and hold)
+    spy_equity = run_backtest(spy_df["Close"].to_numpy(dtype=float), np.ones(len(spy_df)), lag=0).equity
+    benchmark_equity = (
+        pd.Series(spy_equity, index=pd.to_datetime(spy_df["Date"])).reindex(df["Date"]).to_numpy()
+    )
+
+    with stage("signals"):
+        if strategy.lower() == "ema":
+            ma_short = kernels.ema(close, short_window)
+            ma_long = kernels.ema(close, long_window)
+        else:
+            ma_short = kernels.sma(close, short_window)
+            ma_long = kernels.sma(close, long_window)
+
+        signal = np.zeros(len(df))
+        signal[short_window:] = ma_short[short_window:] > ma_long[short_window:]
+
+    result = run_backtest(close, signal, initial_cash=100000)
+    equity = result.equity
+
+    dates = df["Date"].to_numpy()
+    trades = np.asarray(result.trades, dtype=int)
+    sides = np.asarray(result.trade_sides)
+
+    marker_points = Table({
+        "date": dates[trades],
+        "equity": equity[trades],
+        "type": np.where(sides == 1, "Buy", "Sell"),
+    })
+
+    # Trade log
+    logged = np.isin(sides, (1, -1))
+    trade_log = Table({
+        "date": dates[trades[logged]],
+        "action": np.where(sides[logged] == 1, "BUY", "SELL"),
+        "price": close[trades[logged]],
+    }, date_style="timestamp")
+
+    # Metrics
+    final_benchmark = benchmark_equity[-1]
+    alpha = round((equity[-1] - final_benchmark) / final_benchmark * 100, 4)
+    metrics = {**rounded(equity_metrics(equity, result.positions), 4), "alpha_vs_spy": alpha}
+
+    equity_curve = Table({"date": dates, "equity": equity})
+    benchmark_curve = Table({"date": dates, "equity": benchmark_equity})
+
+    dropped_markers = 0
+    if max_points:
+        # Both curves share one selection so they stay aligned; trade bars keep their markers on the line
+        keep = downsample_indices([equity, benchmark_equity], max_points, keep=trades)
+        equity_curve = equity_curve.take(keep)
+        benchmark_curve = benchmark_curve.take(keep)
+        dropped_markers = int(np.setdiff1d(trades, keep).size)
+
+    payload = {
+        "metrics": {k: float(v) for k, v in metrics.items()},
+        "equity_curve": equity_curve,
+        "benchmark_equity_curve": benchmark_curve,
+        "markers": marker_points,
+        "trades": trade_log
+    }
+    if dropped_markers:
+        # More trades than max_points: the curves no longer pass through every marker
+        payload["dropped_markers"] = dropped_markers
+    return payload
+
+
 @router.get("/backtest")
-def backtest(
+async def backtest(
+    request: Request,
     symbol: str,
     start: str,
     end: str,
     short_window: int = Query(...),
     long_window: int = Query(...),
-    strategy: str = Query("sma")
+    strategy: str = Query("sma"),
+    max_points: int = Query(None, ge=10, description="Downsample the equity curves to at most this many points"),
+    fmt: ResponseFormat = Depends(response_format)
 ):
     try:
-        df = yf.download(symbol, start=start, end=end)
-        df.columns = df.columns.get_level_values(0)
-        df = df.reset_index()
-
-        # Benchmark SPY
-        spy_df = yf.download("SPY", start=start, end=end)
-        spy_df.columns = spy_df.columns.get_level_values(0)
-        spy_df = spy_df.reset_index()
-        spy_df["Returns"] = spy_df["Close"].pct_change().fillna(0)
-        spy_df["Equity"] = (1 + spy_df["Returns"]).cumprod() * 100000
-        spy_df = spy_df[["Date", "Equity"]].rename(columns={"Equity": "benchmark_equity"})
-        spy_df["Date"] = pd.to_datetime(spy_df["Date"])
-
-        if strategy.lower() == "ema":
-            df["MA_short"] = df["Close"].ewm(span=short_window, adjust=False).mean()
-            df["MA_long"] = df["Close"].ewm(span=long_window, adjust=False).mean()
-        else:
-            df["MA_short"] = df["Close"].rolling(window=short_window).mean()
-            df["MA_long"] = df["Close"].rolling(window=long_window).mean()
-
-        df["Signal"] = 0
-        df.loc[short_window:, "Signal"] = (
-            df["MA_short"][short_window:] > df["MA_long"][short_window:]
-        ).astype(int)
-        df["Position"] = df["Signal"].shift(1).fillna(0)
-        df["Returns"] = df["Close"].pct_change().fillna(0)
-        df["Strategy"] = df["Returns"] * df["Position"]
-        df["Equity"] = (1 + df["Strategy"]).cumprod() * 100000
-
-        # Merge benchmark
-        merged = pd.merge(df, spy_df, on="Date", how="left")
-
-        df["Trade"] = df["Signal"].diff()
-        markers = df[df["Trade"] != 0][["Date", "Trade", "Equity"]].dropna()
-        markers["type"] = markers["Trade"].apply(lambda x: "Buy" if x == 1 else "Sell")
-        marker_points = markers[["Date", "Equity", "type"]].rename(columns={"Date": "date", "Equity": "equity"})
-
-        # Trade log
-        trade_log = []
-        for i in range(1, len(df)):
-            if df["Trade"].iloc[i] == 1:
-                trade_log.append({"date": str(df["Date"].iloc[i]), "action": "BUY", "price": float(df["Close"].iloc[i])})
-            elif df["Trade"].iloc[i] == -1:
-                trade_log.append({"date": str(df["Date"].iloc[i]), "action": "SELL", "price": float(df["Close"].iloc[i])})
-        trade_log = pd.DataFrame(trade_log)
-
-        # Metrics
-        final_equity = df["Equity"].iloc[-1]
-        final_benchmark = merged["benchmark_equity"].iloc[-1]
-        alpha = round((final_equity - final_benchmark) / final_benchmark * 100, 4)
-
-        metrics = {
-            "total_return": round((final_equity - 100000) / 100000 * 100, 4),
-            "annual_return": round((df["Returns"].mean() * 252) * 100, 4),
-            "sharpe_ratio": round((df["Returns"].mean() / df["Returns"].std()) * (252 ** 0.5), 4),
-            "max_drawdown": round(((df["Equity"].cummax() - df["Equity"]).max()) / df["Equity"].cummax().max() * 100, 4),
-            "alpha_vs_spy": alpha
+        # Symbol and SPY benchmark come from one batched load; cached frames never leave the event loop
+        frames = await aget_many([symbol, "SPY"], start, end)
+        params = {
+            "symbol": symbol.upper(), "start": start, "end": end, "short_window": short_window,
+            "long_window": long_window, "strategy": strategy.lower(), "max_points": max_points, "format": fmt.variant,
         }
+        key = result_key("/backtest", params, [frames[symbol], frames["SPY"]])
 
-        equity_curve = df[["Date", "Equity"]].rename(columns={"Date": "date", "Equity": "equity"})
-        benchmark_curve = merged[["Date", "benchmark_equity"]].rename(columns={"Date": "date", "benchmark_equity": "equity"})
+        async def produce():
+            payload = await run_cpu(run_moving_average_backtest, frames[symbol], frames["SPY"], short_window, long_window, strategy, max_points)
+            return await run_cpu(fmt.render, payload)
 
-        equity_curve["date"] = equity_curve["date"].astype(str)
-        marker_points["date"] = marker_points["date"].astype(str)
-        benchmark_curve["date"] = benchmark_curve["date"].astype(str)
-
-        return {
-            "metrics": {k: float(v) for k, v in metrics.items()},
-            "equity_curve": equity_curve.to_dict(orient="records"),
-            "benchmark_equity_curve": benchmark_curve.to_dict(orient="records"),
-            "markers": marker_points.to_dict(orient="records"),
-            "trades": trade_log.to_dict(orient="records")
-        }
+        # Same params on the same data give the same bytes, so finished responses are reused (and revalidated via ETag)
+        return await cached_response(request, key, produce)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Exception occurred in /backtest route: {str(e)}")
@@ -1,124 +1,144 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Depends, Request
 from typing import List
-import yfinance as yf
+import logging
 import pandas as pd
 import numpy as np
-import traceback
-from app.strategy_core import (
-    sma_crossover_strategy,
-    ema_crossover_strategy, rsi_sma_strategy,
-    macd_strategy,
-    bollinger_strategy,
-    momentum_roc_strategy,
-    dual_sma_strategy,
-    rsi_threshold_strategy
-)
+from app.strategy_core import strategy_map
+from app import compact
+from app.market_data import aget_prices
+from app.engine import run_backtest
+from app.performance_metrics import equity_metrics, rounded
+from app.indicators import indicator_scope, activate_worker_cache
+from app.parallel import map_shared, run_cpu, BACKENDS, DEFAULT_BACKEND
+from app.serialization import Table, ResponseFormat, response_format
+from app.telemetry import stage
+from app.result_cache import result_key, cached_response
+from app.downsample import downsample_indices
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-# ✅ NEW STRATEGY MAP
-strategy_map = {
-    "sma": sma_crossover_strategy,
-    "macd": macd_strategy,
-    "ema": ema_crossover_strategy,
-    "rsi_sma": rsi_sma_strategy,
-    "bollinger": bollinger_strategy,
-    "roc": momentum_roc_strategy,
-    "dual_sma": dual_sma_strategy,
-    "rsi_threshold": rsi_threshold_strategy
-}
 
 def run_strategy(df, strategy, short_window, long_window):
-    print(f"🟠 run_strategy() called with: {strategy}, short={short_window}, long={long_window}")
+    logger.debug("🟠 run_strategy() called with: %s, short=%s, long=%s", strategy, short_window, long_window)
 
     if "Close" not in df.columns:
-        print("❌ 'Close' column missing in DataFrame!")
+        logger.warning("❌ 'Close' column missing in DataFrame!")
         return None, None
 
     try:
         # ✅ If it's in our strategy map, run that function directly
         if strategy in strategy_map:
-            df = strategy_map[strategy](df)
+            with stage("signals"):
+                df = strategy_map[strategy](df)
 
         if "Signal" not in df.columns:
-            print(f"❌ Strategy '{strategy}' did not produce 'Signal'")
+            logger.warning("❌ Strategy '%s' did not produce 'Signal'", strategy)
             return None, None
 
         # ✅ Common logic
-        df["Position"] = df["Signal"].shift(1).fillna(0)
-        df["Returns"] = df["Close"].pct_change().fillna(0)
-        df["Strategy"] = df["Returns"] * df["Position"]
-        df["Equity"] = (1 + df["Strategy"]).cumprod() * 100000
-
-        sharpe = 0
-        if df["Strategy"].std() != 0:
-            sharpe = round((df["Strategy"].mean() / df["Strategy"].std()) * np.sqrt(252), 2)
-
-        metrics = {
-            "total_return": round((df["Equity"].iloc[-1] - 100000) / 100000 * 100, 2),
-            "sharpe_ratio": sharpe,
-            "max_drawdown": round(((df["Equity"].cummax() - df["Equity"]).max()) / df["Equity"].cummax().max() * 100, 2)
-        }
+        result = run_backtest(df["Close"].to_numpy(dtype=float), df["Signal"].to_numpy(dtype=float), initial_cash=100000)
+        equity = result.equity
+
+        metrics = rounded(equity_metrics(equity, result.positions), 2)
 
-        return df[["Date", "Equity"]], metrics
+        return (df["Date"], equity, result.trades), metrics
 
     except Exception as e:
-        print("🔥 Exception in run_strategy:", e)
-        traceback.print_exc()
+        logger.exception("🔥 Exception in run_strategy: %s", e)
         return None, None
 
 
+def _strategy_task(df_raw, task):
+    strat, short_window, long_window, compact_memory = task
+    with compact.compact_mode(compact_memory):
+        # Compact strategies copy only the columns they use, so the shared frame needn't be copied
+        return run_strategy(df_raw if compact_memory else df_raw.copy(), strat, short_window, long_window)
+
+
+def run_comparison(df_raw, strategies, short_window, long_window, backend=DEFAULT_BACKEND, max_workers=None, max_points=None) -> dict:
+    result = {}
+    metrics_all = {}
+    dropped_markers = {}
+
+    # Strategies request shared indicators (SMA, EMA, RSI, ...) from one memo per request,
+    # or one per worker process; the price frame is shipped to each worker once (only the
+    # columns strategies read, in compact mode)
+    compact_memory = compact.enabled()
+    df_raw = compact.frame(df_raw, copy=False)
+    with indicator_scope():
+        outcomes = map_shared(
+            _strategy_task,
+            [(strat, short_window, long_window, compact_memory) for strat in strategies],
+            df_raw,
+            backend=backend,
+            max_workers=max_workers,
+            worker_setup=activate_worker_cache,
+        )
+
+    for strat, (curve, metrics) in zip(strategies, outcomes):
+        if curve is None or metrics is None:
+            logger.info("❌ Skipping invalid strategy: %s", strat)
+            continue
+
+        dates, equity, trades = curve
+        table = Table({"date": dates.to_numpy(), "equity": equity}, date_style="timestamp")
+        if max_points:
+            keep = downsample_indices([equity], max_points, keep=trades)
+            table = table.take(keep)
+            dropped = int(np.setdiff1d(trades, keep).size)
+            if dropped:
+                dropped_markers[strat] = dropped
+        result[strat] = table
+        metrics_all[strat] = {k: float(v) for k, v in metrics.items()}
+
+    if not metrics_all:
+        return {"error": "No valid strategies were processed."}
+
+    best_strategy = max(metrics_all.items(), key=lambda x: x[1]["total_return"])[0]
+
+    payload = {"equities": result, "metrics": metrics_all, "best": best_strategy}
+    if dropped_markers:
+        # Strategies with more trades than max_points, and how many trade bars their curves skip
+        payload["dropped_markers"] = dropped_markers
+    return payload
+
+
 @router.get("/compare-strategies")
-def compare_strategies(
+async def compare_strategies(
+    request: Request,
     symbol: str,
     start: str,
     end: str,
     strategies: List[str] = Query(...),
     short_window: int = 20,
-    long_window: int = 50
+    long_window: int = 50,
+    backend: str = Query(DEFAULT_BACKEND),
+    max_workers: int = Query(None, ge=1),
+    max_points: int = Query(None, ge=10, description="Downsample each equity curve to at most this many points"),
+    fmt: ResponseFormat = Depends(response_format)
 ):
-    try:
-        print("📥 compare_strategies called with:", symbol, start, end, strategies)
-        df_raw = yf.download(symbol, start=start, end=end)
-        df_raw = df_raw.reset_index()
-
-        if isinstance(df_raw.columns, pd.MultiIndex):
-            df_raw.columns = [col[0] for col in df_raw.columns]
-        else:
-            df_raw.columns = df_raw.columns.tolist()
-
-        result = {}
-        metrics_all = {}
+    if backend not in BACKENDS:
+        return {"error": f"Unknown backend '{backend}'. Choose from {', '.join(BACKENDS)}."}
 
-        for strat in strategies:
-            print(f"🚀 Running strategy: {strat}")
-            df_copy = df_raw.copy()
-            equity_df, metrics = run_strategy(df_copy, strat, short_window, long_window)
-
-            if equity_df is None or metrics is None:
-                print(f"❌ Skipping invalid strategy: {strat}")
-                continue
-
-            equity_df = equity_df.rename(columns={"Date": "date", "Equity": "equity"})
-            colname = f"{strat}_equity"
-            equity_df.rename(columns={"equity": colname}, inplace=True)
-
-            records = [
-                {"date": str(row["date"]), "equity": float(row[colname])}
-                for _, row in equity_df.iterrows()
-            ]
-
-            result[strat] = records
-            metrics_all[strat] = {k: float(v) for k, v in metrics.items()}
-
-        if not metrics_all:
-            return {"error": "No valid strategies were processed."}
+    try:
+        logger.debug("📥 compare_strategies called with: %s %s %s %s", symbol, start, end, strategies)
+        df_raw = await aget_prices(symbol, start, end)
+        # backend / max_workers change how the work is scheduled, not the result
+        params = {
+            "symbol": symbol.upper(), "start": start, "end": end, "strategies": strategies,
+            "short_window": short_window, "long_window": long_window, "max_points": max_points, "format": fmt.variant,
+        }
+        key = result_key("/compare-strategies", params, [df_raw])
 
-        best_strategy = max(metrics_all.items(), key=lambda x: x[1]["total_return"])[0]
+        async def produce():
+            payload = await run_cpu(run_comparison, df_raw, strategies, short_window, long_window, backend, max_workers, max_points)
+            if "error" in payload:
+                return payload
+            return await run_cpu(fmt.render, payload)
 
-        return {"equities": result, "metrics": metrics_all, "best": best_strategy}
+        return await cached_response(request, key, produce)
 
     except Exception as e:
-        print("🚨 Top-level Exception in compare_strategies:", e)
-        traceback.print_exc()
+        logger.exception("🚨 Top-level Exception in compare_strategies: %s", e)
         return {"error": f"Server error: {str(e)}"}
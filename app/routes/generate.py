@@ -2,30 +2,19 @@
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from openai import OpenAI
 from dotenv import load_dotenv
-import os
 
-load_dotenv()
-
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise RuntimeError("❌ OPENAI_API_KEY not found.")
+from app.llm import get_client, generate_strategy_code, DETERMINISTIC
 
-client = OpenAI(api_key=api_key)
+load_dotenv()
 
 router = APIRouter()
 
-class StrategyRequest(BaseModel):
-    objective: str  # e.g. "momentum strategy for NASDAQ tech stocks"
-
-@router.post("/generate-strategy")
-def generate_strategy(payload: StrategyRequest):
-    try:
-        prompt = f"""
+# Part of the cache key: editing the prompt invalidates earlier answers
+PROMPT_TEMPLATE = """
 You're a senior quantitative strategist. Generate a robust Python trading strategy for this objective:
 
-Objective: "{payload.objective}"
+Objective: "{objective}"
 
 The output must be valid Python code with:
 - A function named `strategy(df)`
@@ -35,16 +24,31 @@ The output must be valid Python code with:
 - No markdown, no explanations, just clean code.
 """
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
-        )
 
-        code = response.choices[0].message.content.strip()
-        return {"code": code}
+class StrategyRequest(BaseModel):
+    objective: str  # e.g. "momentum strategy for NASDAQ tech stocks"
+    deterministic: bool = DETERMINISTIC  # temperature 0 + fixed seed
+    refresh: bool = False  # ignore a cached answer and ask again
+
+@router.post("/generate-strategy")
+async def generate_strategy(payload: StrategyRequest):
+    try:
+        get_client()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    try:
+        entry, cached = await generate_strategy_code(
+            payload.objective, PROMPT_TEMPLATE, deterministic=payload.deterministic, refresh=payload.refresh
+        )
+        strategy = entry["strategy"]
+        return {
+            "code": entry["code"],
+            "cached": cached,
+            "valid": strategy["valid"],
+            "validation_error": strategy["error"],
+            "strategy_id": strategy.get("id"),  # run it via /strategies/{id}/run
+        }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"❌ OpenAI Error: {str(e)}")
@@ -1,16 +1,23 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
+import logging
 import pandas as pd
-import yfinance as yf
-import traceback
 import numpy as np
 import os
+from app.market_data import aget_prices
+from app.parallel import run_cpu, run_io
+from app.engine import run_backtest
+from app.performance_metrics import equity_metrics, rounded
+from app.sandbox import get_pool, SandboxError
+from app.serialization import Table, ResponseFormat, response_format
+from app.telemetry import stage
 from dotenv import load_dotenv
 load_dotenv()
 
 import openai
 openai.api_key = os.getenv("OPENAI_API_KEY")
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class StrategyRunRequest(BaseModel):
     symbol: str
@@ -18,62 +25,46 @@ class StrategyRunRequest(BaseModel):
     end: str
     code: str  # Python code defining a function `custom_strategy(df)`
 
+def backtest_positions(columns: dict) -> dict:
+    # Position is already the held position, so no extra lag
+    result = run_backtest(columns["Close"].astype(float), columns["Position"].astype(float), initial_cash=100000, lag=0)
+    equity = result.equity
+
+    metrics = rounded(equity_metrics(equity, result.positions), 2)
+
+    records = Table({"date": pd.to_datetime(columns["Date"]).to_numpy(), "equity": equity}, date_style="timestamp")
+
+    return {
+        "equity": records,
+        "metrics": metrics
+    }
+
+
 @router.post("/run-generated-strategy")
-def run_generated_strategy(payload: StrategyRunRequest):
+async def run_generated_strategy(payload: StrategyRunRequest, fmt: ResponseFormat = Depends(response_format)):
     try:
         # 1. Download historical stock data
-        df = yf.download(payload.symbol, start=payload.start, end=payload.end)
+        df = await aget_prices(payload.symbol, payload.start, payload.end)
         if df.empty:
             raise ValueError("Stock data could not be downloaded.")
-        df = df.reset_index()
-
-        # 2. Inject generated strategy code
-        local_scope = {}
-        try:
-            exec(payload.code, {}, local_scope)
-        except Exception as e:
-            raise ValueError(f"❌ Error while executing code: {e}")
 
-        if "custom_strategy" not in local_scope:
-            raise ValueError("The code must define a function named 'custom_strategy(df)'")
-
-        # 3. Call the custom strategy function
+        # 2-3. Run the generated custom_strategy(df) in the sandbox
         try:
-            df = local_scope["custom_strategy"](df)
-        except Exception as e:
-            raise ValueError(f"❌ Error while running custom_strategy(): {e}")
-
-        if "Position" not in df.columns:
-            raise ValueError("Your strategy must return a DataFrame with a 'Position' column.")
+            with stage("signals"):
+                columns = await run_io(get_pool().run, payload.code, df, entry="custom_strategy", output=["Date", "Close", "Position"])
+        except SandboxError as e:
+            if e.stage == "exec":
+                raise ValueError(f"❌ Error while executing code: {e}")
+            if e.stage == "missing":
+                raise ValueError("The code must define a function named 'custom_strategy(df)'")
+            if e.stage == "call":
+                raise ValueError(f"❌ Error while running custom_strategy(): {e}")
+            raise ValueError(str(e))
 
         # 4. Calculate returns & equity curve
-        df["Returns"] = df["Close"].pct_change().fillna(0)
-        df["Strategy"] = df["Returns"] * df["Position"]
-        df["Equity"] = (1 + df["Strategy"]).cumprod() * 100000
-
-        sharpe = 0
-        if df["Strategy"].std() != 0:
-            sharpe = round((df["Strategy"].mean() / df["Strategy"].std()) * np.sqrt(252), 2)
-
-        max_drawdown = round(((df["Equity"].cummax() - df["Equity"]).max()) / df["Equity"].cummax().max() * 100, 2)
-        total_return = round((df["Equity"].iloc[-1] - 100000) / 100000 * 100, 2)
-
-        metrics = {
-            "sharpe_ratio": sharpe,
-            "max_drawdown": max_drawdown,
-            "total_return": total_return,
-        }
-
-        records = [
-            {"date": str(row["Date"]), "equity": float(row["Equity"])}
-            for _, row in df.iterrows()
-        ]
-
-        return {
-            "equity": records,
-            "metrics": metrics
-        }
+        result = await run_cpu(backtest_positions, columns)
+        return await run_cpu(fmt.render, result)
 
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Error in LLM strategy run")
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
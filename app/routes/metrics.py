@@ -1,9 +1,13 @@
 # app/routes/metrics.py
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Optional
+import numpy as np
 import pandas as pd
 from app.performance_metrics import calculate_metrics
+from app.monte_carlo import monte_carlo, summarize, METHODS
+from app.parallel import run_cpu
 
 router = APIRouter()
 
@@ -12,17 +16,53 @@ class PortfolioData(BaseModel):
     values: list[float]    # Corresponding portfolio values: [10000, 10200, 10150, ...]
 
 @router.post("/evaluate-strategy")
-def evaluate_strategy(data: PortfolioData):
+async def evaluate_strategy(data: PortfolioData):
     if len(data.dates) != len(data.values):
         raise HTTPException(status_code=400, detail="Length mismatch: dates and values")
 
     try:
         series = pd.Series(data.values, index=pd.to_datetime(data.dates))
-        metrics = calculate_metrics(series)
+        metrics = await run_cpu(calculate_metrics, series)
         return {"metrics": metrics}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
+
+
+class MonteCarloData(PortfolioData):
+    n_paths: int = Field(5000, ge=1, le=1_000_000)
+    method: str = "block"               # "block" bootstrap or "shuffle" of trades
+    block_size: int = Field(20, ge=1)
+    positions: Optional[list[float]] = None  # position per bar; trades are where it changes (shuffle only)
+    seed: Optional[int] = None
+
+
+def _monte_carlo_summary(data: MonteCarloData) -> dict:
+    values = np.asarray(data.values, dtype=float)
+    returns = values[1:] / values[:-1] - 1.0
+    trades = None
+    if data.positions is not None:
+        # Bar i's return belongs to the position held over it
+        trades = np.flatnonzero(np.diff(np.asarray(data.positions[1:], dtype=float))) + 1
+    result = monte_carlo(returns, data.n_paths, data.method, data.block_size, trades, data.seed)
+    return summarize(result)
+
+
+@router.post("/monte-carlo")
+async def monte_carlo_metrics(data: MonteCarloData):
+    if len(data.dates) != len(data.values):
+        raise HTTPException(status_code=400, detail="Length mismatch: dates and values")
+    if data.positions is not None and len(data.positions) != len(data.values):
+        raise HTTPException(status_code=400, detail="Length mismatch: positions and values")
+    if data.method not in METHODS:
+        raise HTTPException(status_code=400, detail=f"Unknown method '{data.method}'. Choose from {', '.join(METHODS)}.")
+
+    try:
+        return {"n_paths": data.n_paths, "method": data.method, "metrics": await run_cpu(_monte_carlo_summary, data)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 def compare_strategy_vs_benchmark(strategy_df, benchmark_df):
     merged = pd.merge(strategy_df, benchmark_df, left_index=True, right_index=True, how="inner")
     merged["Strategy Returns"] = merged["Portfolio Value"].pct_change()
@@ -0,0 +1,86 @@
+# app/routes/portfolio.py
+
+from typing import Dict, List, Optional, Union
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+
+from app.downsample import downsample_indices
+from app.market_data import aget_many
+from app.parallel import run_cpu
+from app.performance_metrics import equity_metrics, rounded
+from app.portfolio import attribution, backtest_portfolio, equal_weights, signal_weights, static_weights
+from app.routes.scan import resolve_symbols
+from app.scan import align_closes, strategy_signals
+from app.serialization import Table, ResponseFormat, response_format
+from app.strategy_core import array_strategy_map
+from app.telemetry import stage
+
+router = APIRouter()
+
+
+class PortfolioRequest(BaseModel):
+    start: str
+    end: str
+    symbols: List[str] = []
+    universe: Optional[str] = None
+    # Target weights: a fixed allocation, a strategy's signals (equal weight across
+    # the assets it holds), or equal weight across everything when neither is given
+    weights: Optional[Dict[str, float]] = None
+    strategy: Optional[str] = None
+    long_only: bool = True
+    rebalance: Union[int, str] = "monthly"  # daily / weekly / monthly / quarterly / yearly / never, or every N bars
+    threshold: Optional[float] = Field(None, gt=0, description="Also rebalance when a weight drifts this far (0.05 = 5 points)")
+    cost_bps: float = Field(0.0, ge=0)
+    initial_cash: float = Field(100_000, gt=0)
+    max_points: Optional[int] = Field(None, ge=10)
+
+
+def run_portfolio(frames: dict, request: PortfolioRequest) -> dict:
+    dates, symbols, close = align_closes(frames)
+    if not symbols:
+        raise ValueError("No price data for these symbols and range.")
+
+    if request.weights is not None:
+        allocation = {symbol.upper(): weight for symbol, weight in request.weights.items()}
+        targets = static_weights([allocation.get(symbol, 0.0) for symbol in symbols], len(dates))
+    elif request.strategy is not None:
+        with stage("signals"):
+            targets = signal_weights(strategy_signals(close, request.strategy), long_only=request.long_only)
+    else:
+        targets = equal_weights(close)
+
+    result = backtest_portfolio(
+        close, targets, dates, initial_cash=request.initial_cash, rebalance=request.rebalance,
+        threshold=request.threshold, cost_bps=request.cost_bps,
+    )
+
+    metrics = rounded(equity_metrics(result.equity), 4)
+    metrics["rebalances"] = len(result.rebalances)
+    metrics["costs"] = round(float(result.costs.sum()), 2)
+
+    breakdown = attribution(result, symbols, request.initial_cash).sort_values("contribution", ascending=False)
+    per_asset = {row.pop("symbol"): {k: round(float(v), 4) for k, v in row.items()} for row in breakdown.to_dict("records")}
+
+    curve = Table({"date": dates, "equity": result.equity, "cash": result.cash})
+    if request.max_points:
+        curve = curve.take(downsample_indices([result.equity], request.max_points))
+
+    return {"metrics": metrics, "equity_curve": curve, "attribution": per_asset}
+
+
+@router.post("/portfolio")
+async def portfolio(request: PortfolioRequest, fmt: ResponseFormat = Depends(response_format)):
+    symbols = list(request.weights) if request.weights and not (request.symbols or request.universe) else request.symbols
+    tickers = resolve_symbols(symbols, request.universe)
+    if request.strategy is not None and request.strategy not in array_strategy_map:
+        raise HTTPException(status_code=400, detail=f"Unknown strategy '{request.strategy}'. Choose from {', '.join(array_strategy_map)}.")
+    if request.weights is not None and request.strategy is not None:
+        raise HTTPException(status_code=400, detail="Pass either 'weights' or 'strategy', not both.")
+
+    frames = await aget_many(tickers, request.start, request.end)
+    try:
+        payload = await run_cpu(run_portfolio, frames, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await run_cpu(fmt.render, payload)
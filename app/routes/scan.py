@@ -0,0 +1,122 @@
+# app/routes/scan.py
+
+import asyncio
+import json
+import logging
+import math
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.market_data import aget_many
+from app.parallel import run_cpu, run_io, BACKENDS, DEFAULT_BACKEND
+from app.performance_metrics import METRIC_NAMES
+from app.sandbox import SandboxError
+from app.scan import align_closes, align_signals, load_universe, scan, strategy_signals, universes
+from app.strategy_core import array_strategy_map
+from app.telemetry import stage
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+MAX_SYMBOLS = 1000
+ROWS_PER_CHUNK = 100
+
+
+def resolve_symbols(symbols, universe) -> list:
+    """Upper-cased, de-duplicated symbols from a list (entries may be comma-separated) or a universe name."""
+    if universe:
+        try:
+            tickers = load_universe(universe)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"Unknown universe '{universe}'. Choose from {', '.join(universes())}.")
+    elif symbols:
+        tickers = list(dict.fromkeys(s.strip().upper() for entry in symbols for s in entry.split(",") if s.strip()))
+    else:
+        raise HTTPException(status_code=400, detail="Pass 'symbols' or 'universe'.")
+    if len(tickers) > MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SYMBOLS} symbols per request.")
+    return tickers
+
+
+async def _generated_signals(strategy, frames: dict, symbols: list) -> dict:
+    async def run(symbol):
+        try:
+            return symbol, (frames[symbol]["Date"].to_numpy(), await run_io(strategy.run, frames[symbol]))
+        except SandboxError as e:
+            return symbol, e
+
+    return dict(await asyncio.gather(*[run(symbol) for symbol in symbols]))
+
+
+def _ndjson(rows: list):
+    # NaN is not valid JSON
+    for i in range(0, len(rows), ROWS_PER_CHUNK):
+        lines = []
+        for row in rows[i:i + ROWS_PER_CHUNK]:
+            clean = {k: None if isinstance(v, float) and math.isnan(v) else v for k, v in row.items()}
+            lines.append(json.dumps(clean, default=float))
+        yield ("\n".join(lines) + "\n").encode()
+
+
+@router.get("/scan")
+async def scan_universe(
+    start: str,
+    end: str,
+    symbols: List[str] = Query(None, description="Symbols to scan (repeat the parameter or comma-separate)"),
+    universe: str = Query(None, description="Named universe file instead of symbols, e.g. dow30"),
+    strategy: str = Query("sma", description="Built-in strategy from /compare-strategies"),
+    strategy_id: str = Query(None, description="Registered strategy (POST /strategies) instead of a built-in"),
+    rank_by: str = Query("sharpe_ratio"),
+    top: int = Query(None, ge=1, description="Only return the best N symbols"),
+    backend: str = Query(DEFAULT_BACKEND),
+    max_workers: int = Query(None, ge=1),
+):
+    """
+    Backtest one strategy on every symbol and stream the ranked results as
+    NDJSON, one symbol per line, best first. Symbols without data or whose
+    strategy failed come last with an ``error`` field.
+    """
+    tickers = resolve_symbols(symbols, universe)
+    if rank_by not in METRIC_NAMES:
+        raise HTTPException(status_code=400, detail=f"Unknown metric '{rank_by}'. Choose from {', '.join(METRIC_NAMES)}.")
+    if backend not in BACKENDS:
+        raise HTTPException(status_code=400, detail=f"Unknown backend '{backend}'. Choose from {', '.join(BACKENDS)}.")
+
+    if strategy_id:
+        from app.strategy_registry import get_registry
+
+        compiled = get_registry().get(strategy_id)
+        if compiled is None:
+            raise HTTPException(status_code=404, detail=f"Unknown strategy '{strategy_id}'. Register it with POST /strategies.")
+    elif strategy not in array_strategy_map:
+        raise HTTPException(status_code=400, detail=f"Unknown strategy '{strategy}'. Choose from {', '.join(array_strategy_map)}.")
+
+    # One batched load for the whole universe
+    frames = await aget_many(tickers, start, end)
+    dates, aligned, close = await run_cpu(align_closes, frames)
+
+    errors = {symbol: "No price data for this symbol and range." for symbol in tickers if symbol not in aligned}
+    with stage("signals"):
+        if strategy_id:
+            signals = await _generated_signals(compiled, frames, aligned)
+            for symbol, signal in signals.items():
+                if isinstance(signal, Exception):
+                    logger.info("❌ Strategy failed on %s: %s", symbol, signal)
+                    errors[symbol] = str(signal)
+            ranked = [symbol for symbol in aligned if symbol not in errors]
+            signal_matrix = align_signals(dates, ranked, signals)
+        else:
+            # Built-ins run on the aligned closes directly, the whole universe per kernel call
+            ranked = aligned
+            signal_matrix = await run_cpu(strategy_signals, close, strategy, backend, max_workers)
+
+    rows = []
+    if ranked:
+        keep = [aligned.index(symbol) for symbol in ranked]
+        table = await run_cpu(scan, dates, ranked, close[keep], signal_matrix, rank_by)
+        rows = table.head(top).to_dict("records") if top else table.to_dict("records")
+    rows += [{"rank": None, "symbol": symbol, "error": error} for symbol, error in errors.items()]
+
+    return StreamingResponse(_ndjson(rows), media_type="application/x-ndjson")
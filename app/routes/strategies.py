@@ -0,0 +1,116 @@
+# app/routes/strategies.py
+
+import asyncio
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+
+from app.market_data import aget_many
+from app.parallel import run_cpu, run_io
+from app.routes.run_generated import backtest_signals
+from app.sandbox import SandboxError
+from app.serialization import ResponseFormat, response_format
+from app.strategy_registry import get_registry
+from app.telemetry import stage
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_RUNS = 200
+
+
+class StrategyCode(BaseModel):
+    code: str  # Python code defining `strategy(df)` (or a single function) that returns a signal Series
+
+
+class StrategyRun(BaseModel):
+    symbol: str
+    start: str
+    end: str
+
+
+class StrategyBatch(BaseModel):
+    # Either explicit runs, or symbols sharing one start/end (or both)
+    runs: List[StrategyRun] = []
+    symbols: List[str] = []
+    start: Optional[str] = None
+    end: Optional[str] = None
+    include_equity: bool = False
+
+
+def _get_strategy(strategy_id: str):
+    strategy = get_registry().get(strategy_id)
+    if strategy is None:
+        raise HTTPException(status_code=404, detail=f"Unknown strategy '{strategy_id}'. Register it with POST /strategies.")
+    return strategy
+
+
+async def _run_one(strategy, df) -> dict:
+    if df.empty or "Close" not in df.columns:
+        return {"error": "No price data for this symbol and range."}
+    try:
+        with stage("signals"):
+            signals = await run_io(strategy.run, df)
+    except SandboxError as e:
+        return {"error": f"{e.stage}: {e}"}
+    return await run_cpu(backtest_signals, df, signals)
+
+
+@router.post("/strategies")
+async def register_strategy(payload: StrategyCode):
+    try:
+        with stage("validate"):
+            strategy, created = await run_io(get_registry().register, payload.code)
+    except SandboxError as e:
+        raise HTTPException(status_code=400, detail=f"Strategy failed validation ({e.stage}): {e}")
+    return {"id": strategy.id, "entry": strategy.entry, "created": created}
+
+
+@router.get("/strategies/{strategy_id}")
+async def get_strategy(strategy_id: str):
+    strategy = _get_strategy(strategy_id)
+    return {"id": strategy.id, "entry": strategy.entry, "code": strategy.code}
+
+
+@router.post("/strategies/{strategy_id}/run")
+async def run_strategy(strategy_id: str, payload: StrategyRun, fmt: ResponseFormat = Depends(response_format)):
+    strategy = _get_strategy(strategy_id)
+    frames = await aget_many([payload.symbol], payload.start, payload.end)
+    result = await _run_one(strategy, frames[payload.symbol])
+    if "error" in result:
+        return result
+    return await run_cpu(fmt.render, result)
+
+
+@router.post("/strategies/{strategy_id}/batch")
+async def run_strategy_batch(strategy_id: str, payload: StrategyBatch, fmt: ResponseFormat = Depends(response_format)):
+    """Run one registered strategy over many symbols / ranges; results are keyed ``SYMBOL:start:end``."""
+    strategy = _get_strategy(strategy_id)
+
+    runs = list(payload.runs)
+    if payload.symbols:
+        if not (payload.start and payload.end):
+            raise HTTPException(status_code=400, detail="'symbols' needs 'start' and 'end'.")
+        runs += [StrategyRun(symbol=symbol, start=payload.start, end=payload.end) for symbol in payload.symbols]
+    if not runs:
+        raise HTTPException(status_code=400, detail="Nothing to run: pass 'runs' or 'symbols'.")
+    if len(runs) > MAX_BATCH_RUNS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_RUNS} runs per batch.")
+
+    # One batched load per distinct range
+    ranges = {}
+    for run in runs:
+        ranges.setdefault((run.start, run.end), []).append(run.symbol)
+    loaded = await asyncio.gather(*[aget_many(symbols, start, end) for (start, end), symbols in ranges.items()])
+    frames = {key: frames for key, frames in zip(ranges, loaded)}
+
+    outcomes = await asyncio.gather(*[_run_one(strategy, frames[(run.start, run.end)][run.symbol]) for run in runs])
+
+    results = {}
+    for run, outcome in zip(runs, outcomes):
+        if not payload.include_equity:
+            outcome.pop("equity", None)
+        results[f"{run.symbol}:{run.start}:{run.end}"] = outcome
+    return await run_cpu(fmt.render, {"id": strategy.id, "results": results})
@@ -0,0 +1,72 @@
+# app/routes/sweep.py
+
+from fastapi import APIRouter, Query, HTTPException
+import numpy as np
+from app.market_data import aget_prices
+from app.parallel import run_cpu
+from app.sweep import sweep_crossover, SWEEP_STRATEGIES
+
+router = APIRouter()
+
+MAX_PAIRS = 100_000
+
+
+def _matrix(values: np.ndarray):
+    # NaN (invalid short >= long pairs) is not valid JSON, send null instead
+    return [[None if np.isnan(v) else round(float(v), 4) for v in row] for row in values]
+
+
+@router.get("/sweep")
+async def sweep(
+    symbol: str,
+    start: str,
+    end: str,
+    strategy: str = Query("sma"),
+    short_min: int = Query(5, ge=1),
+    short_max: int = Query(50, ge=1),
+    short_step: int = Query(1, ge=1),
+    long_min: int = Query(20, ge=2),
+    long_max: int = Query(200, ge=2),
+    long_step: int = Query(5, ge=1),
+):
+    strategy = strategy.lower()
+    if strategy not in SWEEP_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Strategy '{strategy}' cannot be swept. Choose from {', '.join(SWEEP_STRATEGIES)}.")
+
+    short_windows = np.arange(short_min, short_max + 1, short_step)
+    long_windows = np.arange(long_min, long_max + 1, long_step)
+    if len(short_windows) == 0 or len(long_windows) == 0:
+        raise HTTPException(status_code=400, detail="Window ranges are empty.")
+    if len(short_windows) * len(long_windows) > MAX_PAIRS:
+        raise HTTPException(status_code=400, detail=f"Grid has more than {MAX_PAIRS} window pairs.")
+
+    try:
+        df = await aget_prices(symbol, start, end)
+        if df.empty:
+            raise ValueError("Stock data could not be downloaded.")
+        close = df["Close"].dropna().to_numpy(dtype=float)
+
+        result = await run_cpu(sweep_crossover, close, strategy, short_windows, long_windows)
+
+        sharpe = result["sharpe_ratio"]
+        best = None
+        if not np.all(np.isnan(sharpe)):
+            i, j = np.unravel_index(np.nanargmax(sharpe), sharpe.shape)
+            best = {
+                "short_window": int(short_windows[i]),
+                "long_window": int(long_windows[j]),
+                "sharpe_ratio": round(float(sharpe[i, j]), 4),
+                "total_return": round(float(result["total_return"][i, j]), 4),
+            }
+
+        return {
+            "strategy": strategy,
+            "short_windows": short_windows.tolist(),
+            "long_windows": long_windows.tolist(),
+            "sharpe_ratio": _matrix(sharpe),
+            "total_return": _matrix(result["total_return"]),
+            "best": best,
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Exception occurred in /sweep route: {str(e)}")
@@ -0,0 +1,13 @@
+# app/routes/telemetry.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.telemetry import render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
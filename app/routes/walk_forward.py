@@ -0,0 +1,60 @@
+# app/routes/walk_forward.py
+
+import json
+import os
+
+from fastapi import APIRouter, Query, HTTPException, Depends
+from app.market_data import aget_prices
+from app.parallel import run_cpu, BACKENDS, CPU_WORKERS
+from app.serialization import ResponseFormat, response_format
+from app.walk_forward import walk_forward, validate_grid, OBJECTIVES
+
+router = APIRouter()
+
+# Folds are CPU-bound and independent, so spread them over processes when there is more than one core
+WALK_FORWARD_BACKEND = os.getenv("QTRADER_WALK_FORWARD_BACKEND", "processes" if CPU_WORKERS > 1 else "serial")
+
+
+@router.get("/walk-forward")
+async def walk_forward_route(
+    symbol: str,
+    start: str,
+    end: str,
+    strategy: str = Query("sma"),
+    folds: int = Query(10, ge=1, le=200),
+    train_multiple: int = Query(4, ge=1, le=50, description="Training window length in test windows"),
+    anchored: bool = Query(False, description="Train on all history before each test window"),
+    steps: int = Query(5, ge=1, le=15, description="Values tried per parameter, from half to twice its default"),
+    grid: str = Query(None, description='JSON object of explicit parameter values, e.g. {"period": [10, 14, 20]}'),
+    objective: str = Query("sharpe_ratio"),
+    backend: str = Query(WALK_FORWARD_BACKEND),
+    max_workers: int = Query(None, ge=1),
+    fmt: ResponseFormat = Depends(response_format)
+):
+    if backend not in BACKENDS:
+        raise HTTPException(status_code=400, detail=f"Unknown backend '{backend}'. Choose from {', '.join(BACKENDS)}.")
+    if objective not in OBJECTIVES:
+        raise HTTPException(status_code=400, detail=f"Unknown objective '{objective}'. Choose from {', '.join(OBJECTIVES)}.")
+    try:
+        overrides = json.loads(grid) if grid else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="grid must be a JSON object of parameter lists.")
+    if overrides is not None and not isinstance(overrides, dict):
+        raise HTTPException(status_code=400, detail="grid must be a JSON object of parameter lists.")
+
+    try:
+        if overrides is not None:
+            validate_grid(overrides)
+        df = await aget_prices(symbol, start, end)
+        if df.empty:
+            raise HTTPException(status_code=500, detail="Stock data could not be downloaded.")
+        payload = await run_cpu(walk_forward, df, strategy.lower(), folds, train_multiple, anchored, steps,
+                                overrides, objective, backend, max_workers)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Exception occurred in /walk-forward route: {str(e)}")
+
+    return await run_cpu(fmt.render, payload)
@@ -0,0 +1,356 @@
+# app/sandbox.py
+
+import logging
+import marshal
+import os
+import queue
+import resource
+import signal
+import threading
+import time
+import traceback
+from multiprocessing import shared_memory
+from types import CodeType
+
+import numpy as np
+import pandas as pd
+
+POOL_SIZE = int(os.getenv("QTRADER_SANDBOX_WORKERS", 2))
+CPU_SECONDS = float(os.getenv("QTRADER_SANDBOX_CPU_SECONDS", 10))
+WALL_SECONDS = float(os.getenv("QTRADER_SANDBOX_WALL_SECONDS", 20))
+MAX_RSS_MB = int(os.getenv("QTRADER_SANDBOX_MAX_RSS_MB", 512))
+JOBS_PER_WORKER = int(os.getenv("QTRADER_SANDBOX_JOBS_PER_WORKER", 1))
+
+RSS_POLL_SECONDS = 0.05
+
+logger = logging.getLogger(__name__)
+
+
+class SandboxError(Exception):
+    """
+    User code failed inside the sandbox.
+
+    ``stage`` says where: ``exec`` (defining the code), ``missing`` (no entry
+    function), ``call`` (running it), ``result`` (bad return value) or
+    ``limit`` (killed for CPU, wall-time or memory).
+    """
+
+    def __init__(self, stage: str, message: str):
+        super().__init__(message)
+        self.stage = stage
+
+
+# ---------- shared memory transport ----------
+
+def _frame_to_shm(df: pd.DataFrame):
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            columns.append((name, "datetime64[ns]"))
+        elif pd.api.types.is_numeric_dtype(series):
+            columns.append((name, "float64"))
+
+    n = len(df)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, 8 * n * len(columns)))
+    block = np.ndarray((len(columns), n), dtype="int64", buffer=shm.buf)
+    for row, (name, dtype) in enumerate(columns):
+        values = df[name].to_numpy(dtype=dtype)
+        block[row] = values.view("int64")
+    return shm, {"shm": shm.name, "length": n, "columns": columns}
+
+
+def _frame_from_shm(spec: dict) -> pd.DataFrame:
+    # Workers share the parent's resource tracker, which unlinks the segment once the parent is done
+    shm = shared_memory.SharedMemory(name=spec["shm"])
+    try:
+        block = np.ndarray((len(spec["columns"]), spec["length"]), dtype="int64", buffer=shm.buf)
+        # Copy out so user code can mutate freely and the segment can be released
+        data = {name: block[row].view(dtype).copy() for row, (name, dtype) in enumerate(spec["columns"])}
+    finally:
+        shm.close()
+    return pd.DataFrame(data)
+
+
+# ---------- worker side ----------
+
+def _cpu_seconds_used() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _apply_hard_limits(cpu_seconds: float, jobs_per_worker: int):
+    # Once per worker: a non-root process can lower a hard limit but never raise it again,
+    # so the hard CPU cap covers every job this worker will run. It only matters if user
+    # code ignores SIGXCPU from the per-job soft limit.
+    hard = int(_cpu_seconds_used() + jobs_per_worker * (cpu_seconds + 2)) + 1
+    resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+
+def _apply_limits(cpu_seconds: float, max_rss_mb: int):
+    # Per job only the soft limits move; they may go up or down under the hard ones
+    _, cpu_hard = resource.getrlimit(resource.RLIMIT_CPU)
+    cpu_limit = int(_cpu_seconds_used() + cpu_seconds) + 1
+    if cpu_hard != resource.RLIM_INFINITY:
+        cpu_limit = min(cpu_limit, cpu_hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_hard))
+
+    # Address-space cap as a backstop to the parent's RSS polling: large
+    # allocations fail with MemoryError instead of pushing the host into swap
+    try:
+        with open("/proc/self/statm") as f:
+            virtual = int(f.read().split()[0]) * resource.getpagesize()
+        _, as_hard = resource.getrlimit(resource.RLIMIT_AS)
+        cap = virtual + max_rss_mb * 1024 * 1024
+        if as_hard != resource.RLIM_INFINITY:
+            cap = min(cap, as_hard)
+        resource.setrlimit(resource.RLIMIT_AS, (cap, as_hard))
+    except (OSError, ValueError):
+        pass
+
+
+def _run_job(job: dict):
+    df = _frame_from_shm(job["data"])
+    scope = {"df": df}
+
+    # Registered strategies arrive as marshalled code objects, so there is nothing to parse
+    code = marshal.loads(job["code"]) if isinstance(job["code"], bytes) else job["code"]
+    try:
+        exec(code, scope, scope)
+    except Exception as e:
+        raise SandboxError("exec", str(e))
+
+    entry = job["entry"]
+    if entry in scope and not callable(scope[entry]):
+        raise SandboxError("result", f"Submitted '{entry}' is not callable.")
+    if entry not in scope:
+        fallback = None
+        if job["fallback"]:
+            fallback = next((name for name, value in scope.items() if callable(value) and name != entry), None)
+        if fallback is None:
+            raise SandboxError("missing", entry)
+        entry = fallback
+
+    try:
+        result = scope[entry](df)
+    except Exception as e:
+        raise SandboxError("call", str(e))
+
+    if job["output"] == "series":
+        if result is None or not isinstance(result, pd.Series):
+            raise SandboxError("result", "Returned signal must be a pandas Series.")
+        if len(result) != len(df):
+            raise SandboxError("result", "Signal series length does not match data length.")
+        return pd.to_numeric(result, errors="coerce").to_numpy(dtype=float)
+
+    if not isinstance(result, pd.DataFrame):
+        raise SandboxError("result", "Your strategy must return a DataFrame.")
+    missing = [name for name in job["output"] if name not in result.columns]
+    if missing:
+        raise SandboxError("result", f"Your strategy must return a DataFrame with a '{missing[0]}' column.")
+    return {name: result[name].to_numpy() for name in job["output"]}
+
+
+def _worker_main(conn, jobs_per_worker: int, cpu_seconds: float, max_rss_mb: int):
+    # Runs in a child that already has numpy/pandas imported (forkserver preload)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _apply_hard_limits(cpu_seconds, jobs_per_worker)
+    for _ in range(jobs_per_worker):
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        try:
+            _apply_limits(cpu_seconds, max_rss_mb)
+        except (OSError, ValueError) as e:
+            # Reported as a limit failure, so the parent replaces this worker
+            conn.send(("error", ("limit", f"Could not apply sandbox limits: {e}")))
+            return
+        try:
+            conn.send(("ok", _run_job(job)))
+        except SandboxError as e:
+            conn.send(("error", (e.stage, str(e))))
+        except MemoryError:
+            conn.send(("error", ("limit", f"Strategy exceeded the {max_rss_mb} MB memory limit.")))
+        except Exception as e:
+            conn.send(("error", ("call", f"{e}\n{traceback.format_exc(limit=3)}")))
+
+
+# ---------- parent side ----------
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class _Worker:
+    def __init__(self, ctx, jobs_per_worker, cpu_seconds, max_rss_mb):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, jobs_per_worker, cpu_seconds, max_rss_mb), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs_left = jobs_per_worker
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+class SandboxPool:
+    """
+    Pre-started worker processes for running untrusted strategy code.
+
+    Workers come from a forkserver that has numpy and pandas preloaded, so a
+    fresh worker costs a fork rather than an interpreter start plus imports.
+    Each job runs under a CPU-time rlimit, a wall-clock deadline and an RSS
+    cap enforced from the parent, gets its price data through shared memory,
+    and a worker is replaced after ``jobs_per_worker`` jobs or any failure so
+    one request's code never sees another's state. Replacements start in the
+    background; one that fails is retried when a request next finds no idle
+    worker.
+    """
+
+    def __init__(self, size: int = POOL_SIZE, cpu_seconds: float = CPU_SECONDS, wall_seconds: float = WALL_SECONDS,
+                 max_rss_mb: int = MAX_RSS_MB, jobs_per_worker: int = JOBS_PER_WORKER):
+        from app.parallel import mp_context
+
+        self.size = size
+        self.cpu_seconds = cpu_seconds
+        self.wall_seconds = wall_seconds
+        self.max_rss_mb = max_rss_mb
+        self.jobs_per_worker = jobs_per_worker
+        self._ctx = mp_context()
+        self._idle = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._missing = 0
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.jobs_per_worker, self.cpu_seconds, self.max_rss_mb)
+
+    def _release(self, worker: _Worker, healthy: bool):
+        worker.jobs_left -= 1
+        if healthy and worker.jobs_left > 0 and worker.process.is_alive():
+            self._idle.put(worker)
+            return
+        worker.kill()
+        if not self._closed:
+            # Off the request path, so a failed spawn can't replace the job's own outcome
+            threading.Thread(target=self._replace, daemon=True).start()
+
+    def _replace(self):
+        try:
+            worker = self._spawn()
+        except Exception:
+            logger.exception("🔥 Could not start a replacement sandbox worker")
+            with self._lock:
+                self._missing += 1
+            return
+        if self._closed:
+            worker.kill()
+        else:
+            self._idle.put(worker)
+
+    def _acquire(self) -> _Worker:
+        while True:
+            with self._lock:
+                retry = self._missing > 0 and self._idle.empty()
+                if retry:
+                    self._missing -= 1
+            if retry:
+                try:
+                    return self._spawn()
+                except Exception:
+                    with self._lock:
+                        self._missing += 1
+                    raise
+            try:
+                # Wake up now and then in case a background replacement failed meanwhile
+                return self._idle.get(timeout=1.0)
+            except queue.Empty:
+                pass
+
+    def _wait(self, worker: _Worker):
+        deadline = time.monotonic() + self.wall_seconds
+        max_rss = self.max_rss_mb * 1024 * 1024
+        while True:
+            if worker.conn.poll(RSS_POLL_SECONDS):
+                try:
+                    return worker.conn.recv()
+                except EOFError:
+                    pass
+            if not worker.process.is_alive():
+                worker.process.join(timeout=1)
+                if worker.process.exitcode == -signal.SIGXCPU:
+                    raise SandboxError("limit", f"Strategy exceeded the {self.cpu_seconds:g}s CPU time limit.")
+                raise SandboxError("limit", f"Strategy worker died (exit code {worker.process.exitcode}).")
+            if time.monotonic() > deadline:
+                raise SandboxError("limit", f"Strategy exceeded the {self.wall_seconds:g}s time limit.")
+            if _rss_bytes(worker.process.pid) > max_rss:
+                raise SandboxError("limit", f"Strategy exceeded the {self.max_rss_mb} MB memory limit.")
+
+    def run(self, code, df: pd.DataFrame, entry: str = "strategy", fallback: bool = False, output="series"):
+        """
+        Exec ``code`` (source or a compiled code object) in a worker, call
+        ``entry(df)`` and return its result.
+
+        ``output="series"`` expects a Series as long as ``df`` and returns its
+        values as a float array; a list of column names expects a DataFrame
+        and returns ``{column: array}``. With ``fallback`` the first other
+        callable defined by the code is used when ``entry`` is missing.
+        """
+        if self._closed:
+            raise RuntimeError("Sandbox pool is closed.")
+
+        if isinstance(code, CodeType):
+            code = marshal.dumps(code)
+        shm, spec = _frame_to_shm(df)
+        try:
+            worker = self._acquire()
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+        healthy = False
+        try:
+            worker.conn.send({"code": code, "entry": entry, "fallback": fallback, "output": output, "data": spec})
+            status, payload = self._wait(worker)
+            healthy = True
+            if status == "error":
+                stage, message = payload
+                healthy = stage != "limit"
+                raise SandboxError(stage, message)
+            return payload
+        finally:
+            self._release(worker, healthy)
+            shm.close()
+            shm.unlink()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                break
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> SandboxPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SandboxPool()
+        return _pool
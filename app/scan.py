@@ -0,0 +1,111 @@
+# app/scan.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.engine import run_backtest_batch
+from app.parallel import map_shared, DEFAULT_BACKEND
+from app.performance_metrics import batch_metrics, METRIC_NAMES
+from app.strategy_core import array_signals
+
+UNIVERSE_DIR = os.getenv("QTRADER_UNIVERSE_DIR", os.path.join(os.path.dirname(__file__), "universes"))
+CHUNK_SYMBOLS = int(os.getenv("QTRADER_SCAN_CHUNK_SYMBOLS", 50))
+
+# Smaller is better for these; every other metric ranks descending
+ASCENDING_METRICS = ("max_drawdown", "max_drawdown_duration", "turnover")
+
+
+def universes() -> list:
+    if not os.path.isdir(UNIVERSE_DIR):
+        return []
+    return sorted(name[:-4] for name in os.listdir(UNIVERSE_DIR) if name.endswith(".txt"))
+
+
+def load_universe(name: str) -> list:
+    """Symbols in ``<UNIVERSE_DIR>/<name>.txt``: one per line, ``#`` starts a comment."""
+    if name not in universes():
+        raise KeyError(name)
+    with open(os.path.join(UNIVERSE_DIR, name + ".txt")) as f:
+        lines = (line.split("#")[0].strip().upper() for line in f)
+        return list(dict.fromkeys(line for line in lines if line))
+
+
+def align_closes(frames: dict):
+    """
+    ``(dates, symbols, close)`` with ``close`` a (symbols x dates) array on the
+    union of all dates. Gaps inside a series carry the last close forward;
+    bars before a symbol's first close stay NaN (no return, no position).
+    """
+    symbols = [symbol for symbol, df in frames.items() if not df.empty and "Close" in df.columns]
+    if not symbols:
+        return np.array([], dtype="datetime64[ns]"), [], np.empty((0, 0))
+    dates = np.unique(np.concatenate([frames[symbol]["Date"].to_numpy() for symbol in symbols]))
+
+    close = np.full((len(symbols), len(dates)), np.nan)
+    for row, symbol in enumerate(symbols):
+        df = frames[symbol]
+        close[row, np.searchsorted(dates, df["Date"].to_numpy())] = df["Close"].to_numpy(dtype=float)
+
+    valid = ~np.isnan(close)
+    idx = np.where(valid, np.arange(len(dates)), 0)
+    idx = np.maximum.accumulate(idx, axis=1)  # not out=idx: NumPy 2.3.1 leaks the out array
+    close = np.take_along_axis(close, idx, axis=1)
+    return dates, symbols, close
+
+
+def _signal_chunk(close: np.ndarray, task):
+    strategy, start, stop = task
+    return array_signals(strategy, close[start:stop])
+
+
+def strategy_signals(close: np.ndarray, strategy: str, backend: str = DEFAULT_BACKEND, max_workers: int = None) -> np.ndarray:
+    """
+    (symbols x dates) signals of built-in ``strategy`` on an aligned ``close``
+    matrix, computed by the array kernels ``CHUNK_SYMBOLS`` rows at a time
+    across ``backend`` workers. Bars before a symbol's first close are NaN.
+    """
+    chunks = [(strategy, i, i + CHUNK_SYMBOLS) for i in range(0, len(close), CHUNK_SYMBOLS)]
+    parts = map_shared(_signal_chunk, chunks, close, backend=backend, max_workers=max_workers)
+    return np.concatenate(parts) if parts else np.empty_like(close)
+
+
+def align_signals(dates: np.ndarray, symbols: list, signals: dict) -> np.ndarray:
+    """
+    (symbols x dates) matrix from per-symbol ``{symbol: (dates, signal)}``
+    results; bars a strategy didn't emit (e.g. warm-up rows it dropped) are NaN.
+    """
+    matrix = np.full((len(symbols), len(dates)), np.nan)
+    for row, symbol in enumerate(symbols):
+        signal = signals.get(symbol)
+        if isinstance(signal, tuple):
+            signal_dates, values = signal
+            matrix[row, np.searchsorted(dates, signal_dates)] = values
+    return matrix
+
+
+def scan(dates: np.ndarray, symbols: list, close: np.ndarray, signals: np.ndarray, rank_by: str = "sharpe_ratio",
+         initial_cash: float = 100_000) -> pd.DataFrame:
+    """
+    Backtest every row of ``signals`` against its own row of ``close`` in one
+    vectorized pass and return one row of metrics per symbol, best first by
+    ``rank_by``. NaN metrics (e.g. too few bars) sort last.
+    """
+    if rank_by not in METRIC_NAMES:
+        raise ValueError(f"Unknown metric '{rank_by}'. Choose from {', '.join(METRIC_NAMES)}.")
+
+    result = run_backtest_batch(close, signals, initial_cash=initial_cash)
+    metrics = batch_metrics(result.equity, result.positions)
+
+    table = pd.DataFrame({"symbol": symbols, **metrics})
+    has_data = ~np.isnan(close)
+    first = has_data.argmax(axis=1)
+    table["start"] = pd.DatetimeIndex(dates[first]).strftime("%Y-%m-%d")
+    table["bars"] = has_data.sum(axis=1)
+    table["trades"] = [len(trades) for trades in result.trades]
+    table["final_equity"] = result.equity[:, -1]
+
+    table = table.sort_values(rank_by, ascending=rank_by in ASCENDING_METRICS, na_position="last", kind="stable")
+    table.insert(0, "rank", np.arange(1, len(table) + 1))
+    return table.reset_index(drop=True)
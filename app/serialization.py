@@ -0,0 +1,197 @@
+# app/serialization.py
+
+import gzip
+import json
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException, Query, Request, Response
+from app.telemetry import timed
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+FORMATS = ("records", "columnar", "arrow")
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.qtrader.columnar+json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+
+class Table:
+    """
+    Column-oriented result table (equity curve, markers, trade log).
+
+    Columns are parallel NumPy arrays; ``date`` holds datetime64 values.
+    ``date_style`` keeps the legacy records date strings: ``"date"`` renders
+    like ``Series.astype(str)`` ("2022-01-03") and ``"timestamp"`` like
+    ``str(Timestamp)`` ("2022-01-03 00:00:00").
+    """
+
+    def __init__(self, columns: dict, date_style: str = "date"):
+        self.columns = columns
+        self.date_style = date_style
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    def take(self, indices) -> "Table":
+        """Rows at ``indices`` (e.g. a downsampled selection) as a new table."""
+        return Table({name: np.asarray(column)[indices] for name, column in self.columns.items()}, self.date_style)
+
+    def to_records(self) -> list:
+        values = {}
+        for name, column in self.columns.items():
+            if name == "date":
+                if self.date_style == "timestamp":
+                    values[name] = [str(ts) for ts in pd.DatetimeIndex(column)]
+                else:
+                    values[name] = pd.Series(column).astype(str).tolist()
+            else:
+                values[name] = _to_list(column)
+        names = list(values)
+        return [dict(zip(names, row)) for row in zip(*values.values())]
+
+    def to_columnar(self) -> dict:
+        out = {}
+        for name, column in self.columns.items():
+            if name == "date":
+                out[name] = np.asarray(column, dtype="datetime64[D]").astype("int64").tolist()
+            else:
+                out[name] = _to_list(column)
+        return out
+
+
+def _to_list(column) -> list:
+    column = np.asarray(column)
+    if column.dtype.kind == "f" and not np.isfinite(column).all():
+        # NaN and infinities are not valid JSON
+        return np.where(np.isfinite(column), column, None).tolist()
+    return column.tolist()
+
+
+def _convert(payload, table_fn):
+    if isinstance(payload, Table):
+        return table_fn(payload)
+    if isinstance(payload, dict):
+        return {k: _convert(v, table_fn) for k, v in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        return [_convert(v, table_fn) for v in payload]
+    if isinstance(payload, (float, np.floating)) and not np.isfinite(payload):
+        # Metrics of zero-length curves, warm-up bars, benchmark gaps: null rather than bare NaN
+        return None
+    return payload
+
+
+def _dumps(content) -> bytes:
+    # allow_nan=False: any non-finite value _convert missed fails here instead of emitting invalid JSON
+    return json.dumps(content, default=float, allow_nan=False).encode()
+
+
+def _collect_tables(payload, path=()):
+    if isinstance(payload, Table):
+        yield ".".join(path), payload
+    elif isinstance(payload, dict):
+        for key, value in payload.items():
+            yield from _collect_tables(value, path + (str(key),))
+
+
+def _strip_tables(payload):
+    if isinstance(payload, dict):
+        return {k: _strip_tables(v) for k, v in payload.items() if not isinstance(v, Table)}
+    return payload
+
+
+def to_arrow(payload) -> bytes:
+    """
+    One Arrow IPC stream: every table outer-joined on ``date`` with columns
+    named ``<path>.<column>`` (e.g. ``equities.sma.equity``), and the
+    non-tabular parts (metrics, best strategy, ...) as JSON in the schema
+    metadata under ``qtrader``.
+    """
+    import pyarrow as pa
+
+    frames = []
+    for path, table in _collect_tables(payload):
+        columns = {f"{path}.{name}": column for name, column in table.columns.items() if name != "date"}
+        frames.append(pd.DataFrame(columns, index=pd.DatetimeIndex(table.columns["date"], name="date")))
+
+    joined = pd.concat(frames, axis=1, sort=True) if frames else pd.DataFrame(index=pd.DatetimeIndex([], name="date"))
+    arrow_table = pa.Table.from_pandas(joined.reset_index(), preserve_index=False)
+    arrow_table = arrow_table.replace_schema_metadata(
+        {"qtrader": _dumps(_convert(_strip_tables(payload), None))}
+    )
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, arrow_table.schema) as writer:
+        writer.write_table(arrow_table)
+    return sink.getvalue().to_pybytes()
+
+
+def _pick_encoding(accept_encoding: str):
+    encodings = {token.split(";")[0].strip().lower() for token in accept_encoding.split(",")}
+    if "zstd" in encodings and zstandard is not None:
+        return "zstd"
+    if "gzip" in encodings:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, accept_encoding: str):
+    encoding = _pick_encoding(accept_encoding)
+    if len(body) < MIN_COMPRESS_BYTES or encoding is None:
+        return body, None
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body), "zstd"
+    return gzip.compress(body, compresslevel=5), "gzip"
+
+
+class ResponseFormat:
+    """Negotiated output format and encoding for one request."""
+
+    def __init__(self, format: str = "records", accept_encoding: str = ""):
+        self.format = format
+        self.accept_encoding = accept_encoding
+
+    @property
+    def variant(self) -> str:
+        """Format and negotiated encoding, e.g. ``"columnar+gzip"``; equal variants render identical bytes."""
+        return f"{self.format}+{_pick_encoding(self.accept_encoding) or 'identity'}"
+
+    @timed("serialization")
+    def render(self, payload, status_code: int = 200) -> Response:
+        if self.format == "arrow":
+            body, media_type = to_arrow(payload), ARROW_MEDIA_TYPE
+        elif self.format == "columnar":
+            body, media_type = _dumps(_convert(payload, Table.to_columnar)), COLUMNAR_MEDIA_TYPE
+        else:
+            body, media_type = _dumps(_convert(payload, Table.to_records)), "application/json"
+
+        body, encoding = _compress(body, self.accept_encoding)
+        headers = {"Vary": "Accept, Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+
+
+def response_format(request: Request, format: str = Query(None, description="records (default), columnar or arrow")) -> ResponseFormat:
+    """
+    Route dependency picking the format from the ``format`` query value or
+    the ``Accept`` header, and compression (zstd if available, then gzip)
+    from ``Accept-Encoding``.
+    """
+    if format is None:
+        accept = request.headers.get("accept", "")
+        if ARROW_MEDIA_TYPE in accept:
+            format = "arrow"
+        elif COLUMNAR_MEDIA_TYPE in accept:
+            format = "columnar"
+        else:
+            format = "records"
+    elif format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{format}'. Choose from {', '.join(FORMATS)}.")
+    return ResponseFormat(format, request.headers.get("accept-encoding", ""))
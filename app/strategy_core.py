@@ -1,105 +1,201 @@
 # app/strategy_core.py
 
+import numpy as np
 import pandas as pd
+from app import compact, indicators, kernels
 
-def sma_crossover_strategy(data: pd.DataFrame, short_window: int = 50, long_window: int = 200):
-    df = data.copy()
-    df["SMA_Short"] = df["Close"].rolling(window=short_window).mean()
-    df["SMA_Long"] = df["Close"].rolling(window=long_window).mean()
 
-    df["Signal"] = 0
-    condition = df["SMA_Short"] > df["SMA_Long"]
-    df.loc[condition, "Signal"] = 1
-    df.loc[~condition, "Signal"] = -1
+def _signal(buy, sell) -> np.ndarray:
+    # 1 where buy, -1 where sell (sell wins if both), else 0
+    return np.where(sell, -1, np.where(buy, 1, 0))
+
+
+def _latch(buy, sell) -> np.ndarray:
+    # 1 after a buy until the next sell, 0 otherwise (and before the first of either)
+    state = kernels.ffill(np.where(buy, 1.0, np.where(sell, 0.0, np.nan)))
+    return np.nan_to_num(state, nan=0.0)
+
 
+# Each strategy computes from float64 indicators and stores its columns
+# through ``app.compact``, so compact mode changes storage, not signals.
+# Indicators are compared through ``kernels.above`` / ``below``, which the
+# streaming strategies share, so ties resolve the same way on both paths.
+
+def sma_crossover_strategy(data: pd.DataFrame, short_window: int = 50, long_window: int = 200):
+    df = compact.frame(data)
+    close = df["Close"].to_numpy()
+    short = indicators.sma(df["Close"], short_window).to_numpy()
+    long = indicators.sma(df["Close"], long_window).to_numpy()
+    df["SMA_Short"] = compact.column(short)
+    df["SMA_Long"] = compact.column(long)
+    df["Signal"] = compact.signal(np.where(kernels.above(short, long, close), 1, -1))
     return df
 
 def macd_strategy(df, short=12, long=26, signal=9):
-    df = df.copy()
-    df['EMA_short'] = df['Close'].ewm(span=short, adjust=False).mean()
-    df['EMA_long'] = df['Close'].ewm(span=long, adjust=False).mean()
-    df['MACD'] = df['EMA_short'] - df['EMA_long']
-    df['Signal_Line'] = df['MACD'].ewm(span=signal, adjust=False).mean()
-    df['Signal'] = 0
-    df.loc[df['MACD'] > df['Signal_Line'], 'Signal'] = 1
-    df.loc[df['MACD'] < df['Signal_Line'], 'Signal'] = -1
+    df = compact.frame(df)
+    ema_short = indicators.ema(df['Close'], short).to_numpy()
+    ema_long = indicators.ema(df['Close'], long).to_numpy()
+    macd = ema_short - ema_long
+    signal_line = kernels.ema(macd, signal)
+    df['EMA_short'] = compact.column(ema_short)
+    df['EMA_long'] = compact.column(ema_long)
+    df['MACD'] = compact.column(macd)
+    df['Signal_Line'] = compact.column(signal_line)
+    close = df['Close'].to_numpy()
+    df['Signal'] = compact.signal(_signal(kernels.above(macd, signal_line, close), kernels.below(macd, signal_line, close)))
     return df
 
 
 def bollinger_strategy(df, window=20, num_std=2):
-    df = df.copy()
-    df['SMA'] = df['Close'].rolling(window).mean()
-    df['STD'] = df['Close'].rolling(window).std()
-    df['Upper'] = df['SMA'] + num_std * df['STD']
-    df['Lower'] = df['SMA'] - num_std * df['STD']
-    df['Signal'] = 0
-    df.loc[df['Close'] < df['Lower'], 'Signal'] = 1
-    df.loc[df['Close'] > df['Upper'], 'Signal'] = -1
+    df = compact.frame(df)
+    sma = indicators.sma(df['Close'], window).to_numpy()
+    std = indicators.rolling_std(df['Close'], window).to_numpy()
+    upper, lower = sma + num_std * std, sma - num_std * std
+    close = df['Close'].to_numpy()
+    df['SMA'] = compact.column(sma)
+    df['STD'] = compact.column(std)
+    df['Upper'] = compact.column(upper)
+    df['Lower'] = compact.column(lower)
+    df['Signal'] = compact.signal(_signal(kernels.below(close, lower, close), kernels.above(close, upper, close)))
     return df
 
 
 def momentum_roc_strategy(df, period=10, upper_thresh=2, lower_thresh=-2):
-    df = df.copy()
-    df['ROC'] = df['Close'].pct_change(periods=period) * 100
-    df['Signal'] = 0
-    df.loc[df['ROC'] > upper_thresh, 'Signal'] = 1
-    df.loc[df['ROC'] < lower_thresh, 'Signal'] = -1
+    df = compact.frame(df)
+    roc = indicators.roc(df['Close'], period).to_numpy()
+    df['ROC'] = compact.column(roc)
+    df['Signal'] = compact.signal(_signal(kernels.above(roc, upper_thresh, 100), kernels.below(roc, lower_thresh, 100)))
     return df
 
 
 def dual_sma_strategy(df, short_window=50, long_window=200):
-    df = df.copy()
-    df['SMA_Short'] = df['Close'].rolling(window=short_window).mean()
-    df['SMA_Long'] = df['Close'].rolling(window=long_window).mean()
-    df['Signal'] = 0
-    df.loc[df['SMA_Short'] > df['SMA_Long'], 'Signal'] = 1
-    df.loc[df['SMA_Short'] < df['SMA_Long'], 'Signal'] = -1
+    df = compact.frame(df)
+    close = df['Close'].to_numpy()
+    short = indicators.sma(df['Close'], short_window).to_numpy()
+    long = indicators.sma(df['Close'], long_window).to_numpy()
+    df['SMA_Short'] = compact.column(short)
+    df['SMA_Long'] = compact.column(long)
+    df['Signal'] = compact.signal(_signal(kernels.above(short, long, close), kernels.below(short, long, close)))
     return df
 
 
 def rsi_threshold_strategy(df, period=14, lower=30, upper=70):
-    df = df.copy()
-    delta = df['Close'].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-    rs = avg_gain / avg_loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    df['Signal'] = 0
-    df.loc[df['RSI'] < lower, 'Signal'] = 1
-    df.loc[df['RSI'] > upper, 'Signal'] = -1
+    df = compact.frame(df)
+    rsi = indicators.rsi(df['Close'], period).to_numpy()
+    df['RSI'] = compact.column(rsi)
+    df['Signal'] = compact.signal(_signal(kernels.below(rsi, lower, 100), kernels.above(rsi, upper, 100)))
     return df
 
 def ema_crossover_strategy(df: pd.DataFrame, short_window=20, long_window=50) -> pd.DataFrame:
-    df["EMA_short"] = df["Close"].ewm(span=short_window, adjust=False).mean()
-    df["EMA_long"] = df["Close"].ewm(span=long_window, adjust=False).mean()
-    df = df.dropna(subset=["EMA_short", "EMA_long"]).copy()
-    df["Signal"] = (df["EMA_short"] > df["EMA_long"]).astype(int)
+    df = compact.frame(df, copy=False)
+    ema_short = indicators.ema(df["Close"], short_window).to_numpy()
+    ema_long = indicators.ema(df["Close"], long_window).to_numpy()
+    df["EMA_short"] = compact.column(ema_short)
+    df["EMA_long"] = compact.column(ema_long)
+
+    keep = ~(np.isnan(ema_short) | np.isnan(ema_long))
+    df = df.loc[keep].copy()
+    close = df["Close"].to_numpy()
+    df["Signal"] = compact.signal(kernels.above(ema_short[keep], ema_long[keep], close).astype(int))
     return df
 
 def rsi_sma_strategy(df: pd.DataFrame, short_window=20, long_window=50) -> pd.DataFrame:
+    df = compact.frame(df, copy=False)
+
     # Calculate RSI
-    delta = df["Close"].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-    avg_gain = gain.rolling(window=14).mean()
-    avg_loss = loss.rolling(window=14).mean()
-    rs = avg_gain / avg_loss
-    df["RSI"] = 100 - (100 / (1 + rs))
+    rsi = indicators.rsi(df["Close"], 14).to_numpy()
+    df["RSI"] = compact.column(rsi)
 
     # Calculate SMA
-    df["MA_short"] = df["Close"].rolling(window=short_window).mean()
-    df["MA_long"] = df["Close"].rolling(window=long_window).mean()
-
-    df = df.dropna(subset=["RSI", "MA_short"]).copy()
+    ma_short = indicators.sma(df["Close"], short_window).to_numpy()
+    df["MA_short"] = compact.column(ma_short)
+    df["MA_long"] = compact.column(indicators.sma(df["Close"], long_window).to_numpy())
 
-    buy_signal = (df["RSI"] < 40) & (df["Close"] > df["MA_short"])
-    sell_signal = (df["RSI"] > 70) & (df["Close"] < df["MA_short"])
+    keep = ~(np.isnan(rsi) | np.isnan(ma_short))
+    df = df.loc[keep].copy()
 
-    df["Signal"] = np.nan
-    df.loc[buy_signal, "Signal"] = 1
-    df.loc[sell_signal, "Signal"] = 0
-    df["Signal"] = df["Signal"].ffill().fillna(0)
+    close, rsi, ma_short = df["Close"].to_numpy(), rsi[keep], ma_short[keep]
+    buy_signal = kernels.below(rsi, 40, 100) & kernels.above(close, ma_short, close)
+    sell_signal = kernels.above(rsi, 70, 100) & kernels.below(close, ma_short, close)
+    df["Signal"] = compact.signal(_latch(buy_signal, sell_signal))
 
     return df
+
+
+strategy_map = {
+    "sma": sma_crossover_strategy,
+    "macd": macd_strategy,
+    "ema": ema_crossover_strategy,
+    "rsi_sma": rsi_sma_strategy,
+    "bollinger": bollinger_strategy,
+    "roc": momentum_roc_strategy,
+    "dual_sma": dual_sma_strategy,
+    "rsi_threshold": rsi_threshold_strategy,
+}
+
+
+# ---------- array forms ----------
+# The same rules on a bare close array, one series or (symbols x time), computed
+# straight from the kernels so a whole universe goes through in one call. Bars
+# the frame versions drop (and bars without a close) come back as NaN.
+
+def sma_crossover_signals(close, short_window=50, long_window=200):
+    return np.where(kernels.above(kernels.sma(close, short_window), kernels.sma(close, long_window), close), 1.0, -1.0)
+
+
+def macd_signals(close, short=12, long=26, signal=9):
+    macd, signal_line = kernels.macd(close, short, long, signal)
+    return _signal(kernels.above(macd, signal_line, close), kernels.below(macd, signal_line, close)).astype(float)
+
+
+def bollinger_signals(close, window=20, num_std=2):
+    _, upper, lower = kernels.bollinger(close, window, num_std)
+    return _signal(kernels.below(close, lower, close), kernels.above(close, upper, close)).astype(float)
+
+
+def momentum_roc_signals(close, period=10, upper_thresh=2, lower_thresh=-2):
+    roc = kernels.roc(close, period)
+    return _signal(kernels.above(roc, upper_thresh, 100), kernels.below(roc, lower_thresh, 100)).astype(float)
+
+
+def dual_sma_signals(close, short_window=50, long_window=200):
+    short, long = kernels.sma(close, short_window), kernels.sma(close, long_window)
+    return _signal(kernels.above(short, long, close), kernels.below(short, long, close)).astype(float)
+
+
+def rsi_threshold_signals(close, period=14, lower=30, upper=70):
+    rsi = kernels.rsi(close, period)
+    return _signal(kernels.below(rsi, lower, 100), kernels.above(rsi, upper, 100)).astype(float)
+
+
+def ema_crossover_signals(close, short_window=20, long_window=50):
+    return kernels.above(kernels.ema(close, short_window), kernels.ema(close, long_window), close).astype(float)
+
+
+def rsi_sma_signals(close, short_window=20, long_window=50):
+    rsi, ma_short = kernels.rsi(close, 14), kernels.sma(close, short_window)
+    buy = kernels.below(rsi, 40, 100) & kernels.above(close, ma_short, close)
+    sell = kernels.above(rsi, 70, 100) & kernels.below(close, ma_short, close)
+    signals = _latch(buy, sell)
+    signals[np.isnan(rsi) | np.isnan(ma_short)] = np.nan
+    return signals
+
+
+array_strategy_map = {
+    "sma": sma_crossover_signals,
+    "macd": macd_signals,
+    "ema": ema_crossover_signals,
+    "rsi_sma": rsi_sma_signals,
+    "bollinger": bollinger_signals,
+    "roc": momentum_roc_signals,
+    "dual_sma": dual_sma_signals,
+    "rsi_threshold": rsi_threshold_signals,
+}
+
+
+def array_signals(strategy: str, close) -> np.ndarray:
+    """Signals of built-in ``strategy`` for every row of ``close``; NaN on bars without a close."""
+    close = np.asarray(close, dtype=float)
+    signals = array_strategy_map[strategy](close)
+    signals[np.isnan(close)] = np.nan
+    return signals
@@ -0,0 +1,155 @@
+# app/strategy_registry.py
+
+import ast
+import base64
+import hashlib
+import json
+import marshal
+import os
+import re
+import sys
+import threading
+from types import CodeType
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from app.sandbox import get_pool, SandboxError
+
+DEFAULT_DIR = os.getenv("QTRADER_STRATEGY_DIR", "app/data_cache/strategies")
+VALIDATION_BARS = 300
+
+_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+def extract_code(text: str) -> str:
+    # Same cleanup the frontend applies: drop markdown fences around the code
+    code = re.sub(r"```(?:python)?\s*", "", text)
+    return re.sub(r"\s*```$", "", code).strip()
+
+
+def strategy_id(text: str) -> str:
+    return hashlib.blake2b(extract_code(text).encode(), digest_size=16).hexdigest()
+
+
+def validation_frame(rows: int = VALIDATION_BARS, seed: int = 0) -> pd.DataFrame:
+    """Small seeded random-walk price frame with the columns ``aget_prices`` returns."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, rows)))
+    return pd.DataFrame({
+        "Date": pd.bdate_range("2020-01-01", periods=rows),
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close, "Volume": 1e6,
+    })
+
+
+def entry_point(tree: ast.Module):
+    """``strategy`` if the code defines it at top level, else its first top-level function (the old fallback)."""
+    functions = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions.append(node.name)
+        elif isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "strategy" for t in node.targets):
+            functions.append("strategy")
+    if "strategy" in functions:
+        return "strategy"
+    return functions[0] if functions else None
+
+
+class CompiledStrategy(NamedTuple):
+    id: str
+    code: str
+    entry: str
+    code_object: CodeType
+
+    def run(self, df: pd.DataFrame):
+        """Signals for ``df`` from a sandbox worker; the code is shipped precompiled."""
+        return get_pool().run(self.code_object, df, entry=self.entry, output="series")
+
+
+class StrategyRegistry:
+    """
+    Validated strategies by content hash.
+
+    ``register`` compiles the code once, resolves its entry function, runs it
+    on ``validation_frame`` in the sandbox and keeps the code object in memory
+    and, marshalled, under ``root`` (recompiled from source if it was written
+    by another interpreter version). Registering the same code again is free.
+    """
+
+    def __init__(self, root: str = DEFAULT_DIR):
+        self.root = root
+        self._compiled = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, sid: str) -> str:
+        return os.path.join(self.root, sid + ".json")
+
+    def get(self, sid: str):
+        if not _ID_PATTERN.fullmatch(sid):
+            return None
+        with self._lock:
+            strategy = self._compiled.get(sid)
+        if strategy is not None:
+            return strategy
+
+        try:
+            with open(self._path(sid)) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get("python") == sys.implementation.cache_tag:
+            code_object = marshal.loads(base64.b64decode(stored["bytecode"]))
+        else:
+            code_object = compile(stored["code"], f"<strategy {sid}>", "exec")
+        strategy = CompiledStrategy(sid, stored["code"], stored["entry"], code_object)
+        with self._lock:
+            self._compiled[sid] = strategy
+        return strategy
+
+    def register(self, text: str):
+        """``(strategy, created)``; raises ``SandboxError`` if the code doesn't compile or run."""
+        sid = strategy_id(text)
+        strategy = self.get(sid)
+        if strategy is not None:
+            return strategy, False
+
+        code = extract_code(text)
+        try:
+            tree = ast.parse(code)
+            code_object = compile(tree, f"<strategy {sid}>", "exec")
+        except SyntaxError as e:
+            raise SandboxError("exec", f"Syntax error: {e}")
+        entry = entry_point(tree)
+        if entry is None:
+            raise SandboxError("missing", "strategy")
+
+        strategy = CompiledStrategy(sid, code, entry, code_object)
+        strategy.run(validation_frame())
+
+        stored = {
+            "id": sid, "code": code, "entry": entry, "python": sys.implementation.cache_tag,
+            "bytecode": base64.b64encode(marshal.dumps(code_object)).decode(),
+        }
+        path = self._path(sid)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(stored, f)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._compiled[sid] = strategy
+        return strategy, True
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> StrategyRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = StrategyRegistry()
+        return _registry
@@ -0,0 +1,476 @@
+# app/streaming.py
+
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import NamedTuple, Optional
+
+from app.kernels import above, below
+
+NAN = float("nan")
+# The NaN the FPU produces for invalid operations (negative on x86), which is what numpy's 0/0 returns
+_INVALID = math.inf - math.inf
+
+
+def _div(a: float, b: float) -> float:
+    # IEEE division like numpy (x/0 -> +-inf, 0/0 -> nan) instead of raising
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a != a:
+            return a
+        if a == 0:
+            return _INVALID
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+# ---------- streaming indicators ----------
+# Each ``update`` is O(1) and follows the definitions used by
+# ``app.indicators``, repeating pandas' per-bar float operations. The batch
+# side runs on ``app.kernels``, which sum in blocks, so values agree with it
+# to rounding rather than bit for bit. Strategies compare through the same
+# ``kernels.above`` / ``below`` as ``app.strategy_core``, whose tolerance
+# sits far above that rounding, so exact ties (flat or tick-rounded prices)
+# give the same signal on both paths; ``benchmarks/bench_streaming.py``
+# checks this on tick prices.
+
+class RollingMean:
+    """``Series.rolling(window).mean()`` one value at a time (Kahan-compensated add/remove)."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values = deque()
+        self._reset()
+        self.value = NAN
+
+    def _reset(self):
+        self._nobs = 0
+        self._neg = 0
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same = 0
+        self._prev = None
+
+    def _add(self, x: float):
+        if x != x:
+            return
+        self._nobs += 1
+        y = x - self._comp_add
+        t = self._sum + y
+        self._comp_add = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, x) < 0:
+            self._neg += 1
+        # Runs of identical values return that value exactly instead of sum / n
+        self._same = self._same + 1 if x == self._prev else 1
+        self._prev = x
+
+    def _remove(self, x: float):
+        if x != x:
+            return
+        self._nobs -= 1
+        y = -x - self._comp_remove
+        t = self._sum + y
+        self._comp_remove = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, x) < 0:
+            self._neg -= 1
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if self.window == 1 or self._prev is None:
+            # pandas restarts the sums when consecutive windows don't overlap
+            self._reset()
+            self._values.clear()
+            self._prev = x
+        if len(self._values) == self.window:
+            self._remove(self._values.popleft())
+        self._values.append(x)
+        self._add(x)
+
+        if self._nobs >= self.window and self._nobs > 0:
+            result = self._sum / self._nobs
+            if self._same >= self._nobs:
+                result = self._prev
+            elif self._neg == 0 and result < 0:
+                result = 0.0
+            elif self._neg == self._nobs and result > 0:
+                result = 0.0
+        else:
+            result = NAN
+        self.value = result
+        return result
+
+
+class RollingStd:
+    """``Series.rolling(window).std()`` one value at a time (Welford with Kahan compensation)."""
+
+    def __init__(self, window: int, ddof: int = 1):
+        self.window = window
+        self.ddof = ddof
+        self._values = deque()
+        self._reset()
+        self.value = NAN
+
+    def _reset(self):
+        self._nobs = 0.0
+        self._mean = 0.0
+        self._ssqdm = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same = 0
+        self._prev = None
+
+    def _add(self, x: float):
+        if x != x:
+            return
+        self._nobs += 1
+        self._same = self._same + 1 if x == self._prev else 1
+        self._prev = x
+        prev_mean = self._mean - self._comp_add
+        y = x - self._comp_add
+        t = y - self._mean
+        self._comp_add = t + self._mean - y
+        self._mean = self._mean + t / self._nobs if self._nobs else 0.0
+        self._ssqdm = self._ssqdm + (x - prev_mean) * (x - self._mean)
+
+    def _remove(self, x: float):
+        if x != x:
+            return
+        self._nobs -= 1
+        if self._nobs:
+            prev_mean = self._mean - self._comp_remove
+            y = x - self._comp_remove
+            t = y - self._mean
+            self._comp_remove = t + self._mean - y
+            self._mean = self._mean - t / self._nobs
+            self._ssqdm = self._ssqdm - (x - prev_mean) * (x - self._mean)
+        else:
+            self._mean = 0.0
+            self._ssqdm = 0.0
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if self.window == 1 or self._prev is None:
+            self._reset()
+            self._values.clear()
+            self._prev = x
+        if len(self._values) == self.window:
+            self._remove(self._values.popleft())
+        self._values.append(x)
+        self._add(x)
+
+        if self._nobs >= max(self.window, 1) and self._nobs > self.ddof:
+            if self._nobs == 1 or self._same >= self._nobs:
+                variance = 0.0
+            else:
+                variance = self._ssqdm / (self._nobs - self.ddof)
+        else:
+            variance = NAN
+        # Rounding can leave a tiny negative variance; pandas clips it to 0
+        result = 0.0 if variance < 0 else math.sqrt(variance) if variance == variance else NAN
+        self.value = result
+        return result
+
+
+class EMA:
+    """``Series.ewm(span=span, adjust=False).mean()`` one value at a time."""
+
+    def __init__(self, span: int):
+        self.span = span
+        com = (span - 1) / 2
+        self._alpha = 1.0 / (1.0 + com)
+        self._old_factor = 1.0 - self._alpha
+        self._old_wt = 1.0
+        self._started = False
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if not self._started:
+            self._started = True
+            self.value = x
+            return x
+
+        weighted = self.value
+        if weighted == weighted:
+            self._old_wt *= self._old_factor
+            if x == x:
+                if weighted != x:
+                    weighted = (self._old_wt * weighted + self._alpha * x) / (self._old_wt + self._alpha)
+                self._old_wt = 1.0
+        elif x == x:
+            weighted = x
+        self.value = weighted
+        return weighted
+
+
+class MACD:
+    """MACD line ``ema(short) - ema(long)`` and its signal line ``ema(macd, signal)``."""
+
+    def __init__(self, short: int = 12, long: int = 26, signal: int = 9):
+        self.ema_short = EMA(short)
+        self.ema_long = EMA(long)
+        self.signal_line = EMA(signal)
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        self.value = self.ema_short.update(x) - self.ema_long.update(x)
+        self.signal_line.update(self.value)
+        return self.value
+
+
+class ROC:
+    """``Series.pct_change(periods=period) * 100``; missing closes are padded like pandas does."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self._closes = deque(maxlen=period + 1)
+        self._last = NAN
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if x == x:
+            self._last = x
+        self._closes.append(self._last)
+        if len(self._closes) <= self.period:
+            self.value = NAN
+        else:
+            self.value = (_div(self._closes[-1], self._closes[0]) - 1) * 100
+        return self.value
+
+
+class RSI:
+    """Wilder's RSI as in ``kernels.rsi``: seeded with the mean of the first ``period`` changes, then smoothed."""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._alpha = 1.0 / period
+        self._prev = None
+        self._changes = 0
+        self._gain = 0.0
+        self._loss = 0.0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if x != x:
+            # Missing closes repeat the last one (no change); before the first close there is nothing yet
+            if self._prev is None:
+                return self.value
+            x = self._prev
+        if self._prev is None:
+            self._prev = x
+            return self.value
+        delta = x - self._prev
+        self._prev = x
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        self._changes += 1
+        if self._changes <= self.period:
+            self._gain += gain
+            self._loss += loss
+            if self._changes < self.period:
+                return self.value
+            self._gain /= self.period
+            self._loss /= self.period
+        else:
+            self._gain = (1.0 - self._alpha) * self._gain + self._alpha * gain
+            self._loss = (1.0 - self._alpha) * self._loss + self._alpha * loss
+        self.value = 100 - _div(100, 1 + _div(self._gain, self._loss))
+        return self.value
+
+
+# ---------- incremental strategies ----------
+# Counterparts of ``app.strategy_core`` with the same defaults. ``update``
+# takes the bar's close and returns that bar's signal, or None for bars the
+# batch version drops (e.g. before its indicators are defined).
+
+class StreamingStrategy(ABC):
+    @abstractmethod
+    def update(self, close: float):
+        ...
+
+
+class SMACrossover(StreamingStrategy):
+    def __init__(self, short_window: int = 50, long_window: int = 200):
+        self.sma_short = RollingMean(short_window)
+        self.sma_long = RollingMean(long_window)
+
+    def update(self, close):
+        return 1 if above(self.sma_short.update(close), self.sma_long.update(close), close) else -1
+
+
+class DualSMA(StreamingStrategy):
+    def __init__(self, short_window: int = 50, long_window: int = 200):
+        self.sma_short = RollingMean(short_window)
+        self.sma_long = RollingMean(long_window)
+
+    def update(self, close):
+        short, long = self.sma_short.update(close), self.sma_long.update(close)
+        return 1 if above(short, long, close) else -1 if below(short, long, close) else 0
+
+
+class MACDStrategy(StreamingStrategy):
+    def __init__(self, short: int = 12, long: int = 26, signal: int = 9):
+        self.macd = MACD(short, long, signal)
+
+    def update(self, close):
+        macd = self.macd.update(close)
+        signal_line = self.macd.signal_line.value
+        return 1 if above(macd, signal_line, close) else -1 if below(macd, signal_line, close) else 0
+
+
+class Bollinger(StreamingStrategy):
+    def __init__(self, window: int = 20, num_std: float = 2):
+        self.num_std = num_std
+        self.sma = RollingMean(window)
+        self.std = RollingStd(window)
+
+    def update(self, close):
+        mid, std = self.sma.update(close), self.std.update(close)
+        if below(close, mid - self.num_std * std, close):
+            return 1
+        if above(close, mid + self.num_std * std, close):
+            return -1
+        return 0
+
+
+class MomentumROC(StreamingStrategy):
+    def __init__(self, period: int = 10, upper_thresh: float = 2, lower_thresh: float = -2):
+        self.upper_thresh = upper_thresh
+        self.lower_thresh = lower_thresh
+        self.roc = ROC(period)
+
+    def update(self, close):
+        roc = self.roc.update(close)
+        return 1 if above(roc, self.upper_thresh, 100) else -1 if below(roc, self.lower_thresh, 100) else 0
+
+
+class RSIThreshold(StreamingStrategy):
+    def __init__(self, period: int = 14, lower: float = 30, upper: float = 70):
+        self.lower = lower
+        self.upper = upper
+        self.rsi = RSI(period)
+
+    def update(self, close):
+        rsi = self.rsi.update(close)
+        return 1 if below(rsi, self.lower, 100) else -1 if above(rsi, self.upper, 100) else 0
+
+
+class EMACrossover(StreamingStrategy):
+    def __init__(self, short_window: int = 20, long_window: int = 50):
+        self.ema_short = EMA(short_window)
+        self.ema_long = EMA(long_window)
+
+    def update(self, close):
+        short, long = self.ema_short.update(close), self.ema_long.update(close)
+        if short != short or long != long:
+            return None
+        return int(above(short, long, close))
+
+
+class RSISMA(StreamingStrategy):
+    def __init__(self, short_window: int = 20, long_window: int = 50):
+        self.rsi = RSI(14)
+        self.ma_short = RollingMean(short_window)
+        self.ma_long = RollingMean(long_window)
+        self.signal = 0.0
+
+    def update(self, close):
+        rsi = self.rsi.update(close)
+        ma_short = self.ma_short.update(close)
+        self.ma_long.update(close)
+        if rsi != rsi or ma_short != ma_short:
+            return None
+        # Buy/sell conditions latch until the other one fires, like the batch ffill
+        if below(rsi, 40, 100) and above(close, ma_short, close):
+            self.signal = 1.0
+        elif above(rsi, 70, 100) and below(close, ma_short, close):
+            self.signal = 0.0
+        return self.signal
+
+
+streaming_strategy_map = {
+    "sma": SMACrossover,
+    "macd": MACDStrategy,
+    "ema": EMACrossover,
+    "rsi_sma": RSISMA,
+    "bollinger": Bollinger,
+    "roc": MomentumROC,
+    "dual_sma": DualSMA,
+    "rsi_threshold": RSIThreshold,
+}
+
+
+# ---------- event-driven backtest ----------
+
+class BarResult(NamedTuple):
+    date: object
+    close: float
+    target: float           # signal after NaN / hold handling
+    position: float         # position held over this bar
+    strategy_return: float
+    equity: float
+    trade: float            # change in target on this bar (0 if none)
+
+
+class StreamingBacktest:
+    """
+    Bar-by-bar counterpart of ``engine.run_backtest`` driven by a streaming strategy.
+
+    ``on_bar`` costs O(1) per bar regardless of history length and, over a
+    full replay, yields the same equity, positions and trades as running
+    the batch strategy and ``run_backtest`` on the whole frame. Bars the
+    strategy drops produce no result, as they are absent from the batch frame.
+    """
+
+    def __init__(self, strategy: StreamingStrategy, initial_cash: float = 100_000, lag: int = 1,
+                 hold_on_zero: bool = False):
+        self.strategy = strategy
+        self.initial_cash = initial_cash
+        self.lag = lag
+        self.hold_on_zero = hold_on_zero
+        self._pending = deque(maxlen=lag + 1)
+        self._prev_close = None
+        self._prev_target = None
+        self._growth = 1.0
+        self.equity = float(initial_cash)
+
+    def on_bar(self, date, close: float) -> Optional[BarResult]:
+        signal = self.strategy.update(close)
+        if signal is None:
+            return None
+
+        target = float(signal)
+        if target != target or (self.hold_on_zero and target == 0):
+            target = self._prev_target if self.hold_on_zero and self._prev_target is not None else 0.0
+
+        self._pending.append(target)
+        position = self._pending[0] if len(self._pending) > self.lag else 0.0
+
+        close = float(close)
+        market_return = 0.0
+        if self._prev_close is not None:
+            market_return = _div(close, self._prev_close) - 1.0
+            if market_return != market_return or math.isinf(market_return):
+                market_return = 0.0
+        self._prev_close = close
+
+        strategy_return = position * market_return
+        self._growth *= strategy_return + 1.0
+        self.equity = self._growth * self.initial_cash
+
+        trade = 0.0 if self._prev_target is None else target - self._prev_target
+        self._prev_target = target
+        return BarResult(date, close, target, position, strategy_return, self.equity, trade)
+
+    def run(self, bars):
+        """Feed ``(date, close)`` pairs and yield a result for every bar that is kept."""
+        for date, close in bars:
+            result = self.on_bar(date, close)
+            if result is not None:
+                yield result
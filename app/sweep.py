@@ -0,0 +1,107 @@
+# app/sweep.py
+
+import numpy as np
+
+from app import kernels
+from app.performance_metrics import moment_sharpe_ratio
+
+SWEEP_STRATEGIES = ("sma", "ema", "dual_sma")
+
+# Bytes of float64 mask materialised per chunk of short windows
+CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def rolling_means(close: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """Simple moving averages for every window at once from one cumulative sum, NaN during warm-up."""
+    n = len(close)
+    csum = np.concatenate(([0.0], np.cumsum(close)))
+    out = np.full((len(windows), n), np.nan)
+    for row, w in enumerate(windows):
+        if w <= n:
+            out[row, w - 1:] = (csum[w:] - csum[:-w]) / w
+    return out
+
+
+def exponential_means(close: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """``ewm(span=w, adjust=False).mean()`` for every window at once, one kernel row per window."""
+    return kernels.ema(np.broadcast_to(close, (len(windows), len(close))), windows)
+
+
+def sweep_crossover(close: np.ndarray, strategy: str, short_windows, long_windows, periods_per_year: int = 252) -> dict:
+    """
+    Evaluate every ``(short, long)`` window pair of a crossover strategy in one pass.
+
+    Follows the same conventions as ``compare.run_strategy``: the position is
+    the previous bar's signal and Sharpe is ``performance_metrics``' on the
+    strategy's daily returns. Each pair's signal is a boolean mask over time,
+    so sum, sum of squares and log-growth of its returns all reduce to dot
+    products of the masks with a few precomputed return vectors, done as one
+    matrix product per chunk of short windows. Pairs with ``short >= long`` come back as NaN.
+    """
+    if strategy not in SWEEP_STRATEGIES:
+        raise ValueError(f"Unsupported sweep strategy '{strategy}'. Choose from {', '.join(SWEEP_STRATEGIES)}.")
+
+    close = np.asarray(close, dtype=float)
+    short_windows = np.asarray(short_windows, dtype=int)
+    long_windows = np.asarray(long_windows, dtype=int)
+    n = len(close)
+
+    if strategy == "ema":
+        means = exponential_means(close, np.concatenate((short_windows, long_windows)))
+    else:
+        means = rolling_means(close, np.concatenate((short_windows, long_windows)))
+    short_ma, long_ma = means[: len(short_windows)], means[len(short_windows):]
+
+    # The position on bar t is the signal from bar t-1, so masks drop the last bar
+    returns = close[1:] / close[:-1] - 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        basis = np.stack((returns, returns ** 2, np.log1p(returns), np.log1p(-returns)), axis=1)
+    short_ma, long_ma = short_ma[:, :-1], long_ma[:, :-1]
+
+    n_short, n_long = len(short_windows), len(long_windows)
+    ret_sum = np.empty((n_short, n_long))
+    ret_sq = np.empty((n_short, n_long))
+    log_growth = np.empty((n_short, n_long))
+
+    chunk = max(1, CHUNK_BYTES // max(1, n_long * (n - 1) * 8))
+    for lo in range(0, n_short, chunk):
+        hi = min(lo + chunk, n_short)
+        s = short_ma[lo:hi, None, :]
+        above = (s > long_ma[None, :, :]).reshape(-1, n - 1).astype(float)
+        up = above @ basis
+
+        if strategy == "sma":
+            # Signal is +1 above and -1 otherwise (including warm-up)
+            total = basis.sum(axis=0)
+            block_sum = 2.0 * up[:, 0] - total[0]
+            block_sq = np.full(len(up), total[1])
+            block_log = up[:, 2] + (total[3] - up[:, 3])
+        elif strategy == "dual_sma":
+            below = (s < long_ma[None, :, :]).reshape(-1, n - 1).astype(float)
+            down = below @ basis
+            block_sum = up[:, 0] - down[:, 0]
+            block_sq = up[:, 1] + down[:, 1]
+            block_log = up[:, 2] + down[:, 3]
+        else:
+            block_sum = up[:, 0]
+            block_sq = up[:, 1]
+            block_log = up[:, 2]
+
+        ret_sum[lo:hi] = block_sum.reshape(hi - lo, n_long)
+        ret_sq[lo:hi] = block_sq.reshape(hi - lo, n_long)
+        log_growth[lo:hi] = block_log.reshape(hi - lo, n_long)
+
+    # One return per bar after the first, as batch_metrics takes them from the equity curve
+    sharpe = moment_sharpe_ratio(ret_sum, ret_sq, n - 1, periods_per_year)
+    total_return = np.expm1(log_growth) * 100
+
+    invalid = short_windows[:, None] >= long_windows[None, :]
+    sharpe[invalid] = np.nan
+    total_return[invalid] = np.nan
+
+    return {
+        "short_windows": short_windows,
+        "long_windows": long_windows,
+        "sharpe_ratio": sharpe,
+        "total_return": total_return,
+    }
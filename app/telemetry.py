@@ -0,0 +1,195 @@
+# app/telemetry.py
+
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+LOG_LEVEL = os.getenv("QTRADER_LOG_LEVEL", "WARNING").upper()
+
+# Seconds; covers cache hits (sub-millisecond) up to cold downloads and sandbox runs
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+INF_BOUND = 'le="+Inf"'
+
+
+def configure_logging(level: str = LOG_LEVEL):
+    """Send ``app.*`` loggers to stderr at ``level`` (``QTRADER_LOG_LEVEL``, default WARNING)."""
+    logger = logging.getLogger("app")
+    logger.setLevel(level)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        logger.addHandler(handler)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+        for label_values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels, label_values, f'le="{bound:g}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, INF_BOUND)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{_format_labels(self.labels, key)} {value:g}" for key, value in items)
+        return lines
+
+
+REQUEST_SECONDS = Histogram("qtrader_request_duration_seconds", "Request latency.", ("route", "method", "status"))
+STAGE_SECONDS = Histogram("qtrader_stage_duration_seconds", "Time spent per request stage.", ("route", "stage"))
+CACHE_LOOKUPS = Counter("qtrader_cache_lookups_total", "Cache lookups by cache and result.", ("cache", "result"))
+
+METRICS = [REQUEST_SECONDS, STAGE_SECONDS, CACHE_LOOKUPS]
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------- per-request stage timing ----------
+
+# (stage, seconds) pairs of the current request; worker threads started with
+# run_cpu / run_io / map_shared(threads) inherit the same list through the context
+_stages = ContextVar("request_stages", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    """Time the block as request stage ``name``; a no-op outside a request."""
+    stages = _stages.get()
+    if stages is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages.append((name, time.perf_counter() - started))
+
+
+def timed(name: str):
+    """Decorator form of ``stage``."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_cache(cache: str, hits: int = 0, misses: int = 0):
+    if hits:
+        CACHE_LOOKUPS.inc(cache, "hit", amount=hits)
+    if misses:
+        CACHE_LOOKUPS.inc(cache, "miss", amount=misses)
+
+
+def _server_timing(stages: list) -> bytes:
+    totals = {}
+    for name, seconds in stages:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in totals.items()).encode()
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware recording each request's latency and stage durations
+    into the histograms above (labelled with the route template, not the
+    raw path), and echoing the stages in a ``Server-Timing`` header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stages = []
+        token = _stages.set(stages)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if stages:
+                    message = {**message, "headers": list(message.get("headers", [])) + [(b"server-timing", _server_timing(stages))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _stages.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - started, path, scope["method"], status)
+            for name, seconds in stages:
+                STAGE_SECONDS.observe(seconds, path, name)
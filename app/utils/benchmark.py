@@ -1,8 +1,8 @@
-import yfinance as yf
 import pandas as pd
+from app.market_data import get_prices
 
 def fetch_benchmark(symbol="SPY", start="2020-01-01", end="2024-01-01"):
-    df = yf.download(symbol, start=start, end=end)
+    df = get_prices(symbol, start, end).set_index("Date")
     df = df[['Close']].copy()
     df.rename(columns={"Close": "Benchmark"}, inplace=True)
     df.dropna(inplace=True)
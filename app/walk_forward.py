@@ -0,0 +1,202 @@
+# app/walk_forward.py
+
+import inspect
+import itertools
+import numbers
+
+import numpy as np
+import pandas as pd
+
+from app import compact
+from app.engine import run_backtest_batch
+from app.indicators import indicator_scope, activate_worker_cache
+from app.parallel import map_shared, DEFAULT_BACKEND, CPU_WORKERS
+from app.performance_metrics import return_metrics
+from app.serialization import Table
+from app.strategy_core import strategy_map
+
+OBJECTIVES = ("sharpe_ratio", "total_return")
+MAX_COMBOS = 5000
+
+# Parameter pairs that only make sense as (smaller, larger)
+ORDERED_PARAMS = (
+    ("short_window", "long_window"),
+    ("short", "long"),
+    ("lower", "upper"),
+    ("lower_thresh", "upper_thresh"),
+)
+
+# Lookback lengths; the rest (thresholds, band widths) may be any real number
+WINDOW_PARAMS = ("short_window", "long_window", "short", "long", "signal", "window", "period")
+
+
+def strategy_params(fn) -> dict:
+    """Tunable numeric keyword parameters of a ``strategy_core`` function and their defaults."""
+    params = list(inspect.signature(fn).parameters.values())[1:]
+    return {
+        p.name: p.default for p in params
+        if isinstance(p.default, numbers.Real) and not isinstance(p.default, bool)
+    }
+
+
+def _candidates(default, steps: int) -> list:
+    if steps <= 1 or default == 0:
+        return [default]
+    values = default * np.geomspace(0.5, 2.0, steps)
+    if isinstance(default, int):
+        floor = 1 if default > 0 else None
+        values = [int(round(v)) for v in values]
+        values = [max(v, floor) if floor else v for v in values]
+    else:
+        values = [round(float(v), 4) for v in values]
+    return sorted(set(values))
+
+
+def validate_grid(overrides: dict):
+    """Raise ``ValueError`` unless every override is a non-empty list of numbers, with windows positive integers."""
+    for name, values in overrides.items():
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"Grid values for '{name}' must be a non-empty list.")
+        for value in values:
+            if not isinstance(value, numbers.Real) or isinstance(value, bool):
+                raise ValueError(f"Grid value {value!r} for '{name}' is not a number.")
+            if name in WINDOW_PARAMS and not (isinstance(value, numbers.Integral) and value > 0):
+                raise ValueError(f"Grid value {value!r} for '{name}' must be a positive integer.")
+
+
+def param_grid(fn, steps: int = 5, overrides: dict = None) -> list:
+    """
+    Every combination of the strategy's parameters, each swept geometrically
+    from half to twice its default (``steps`` values), minus combinations
+    that break a (short, long) / (lower, upper) ordering. ``overrides`` gives
+    explicit value lists for some parameters.
+    """
+    defaults = strategy_params(fn)
+    overrides = overrides or {}
+    unknown = set(overrides) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) {', '.join(sorted(unknown))}; strategy takes {', '.join(defaults) or 'none'}.")
+    validate_grid(overrides)
+
+    axes = {name: list(overrides.get(name) or _candidates(default, steps)) for name, default in defaults.items()}
+    combos = []
+    for values in itertools.product(*axes.values()):
+        params = dict(zip(axes, values))
+        if all(params[a] < params[b] for a, b in ORDERED_PARAMS if a in params and b in params):
+            combos.append(params)
+    return combos
+
+
+def make_folds(n: int, folds: int, train_multiple: int = 4, anchored: bool = False) -> list:
+    """
+    Rolling train/test splits as ``(train_start, train_end, test_start, test_end)`` bar ranges.
+
+    The range is cut into ``folds + train_multiple`` equal segments; each fold
+    tests on one segment after training on the ``train_multiple`` before it
+    (or on everything before it when ``anchored``).
+    """
+    segment = n // (folds + train_multiple)
+    if segment < 2:
+        raise ValueError(f"{n} bars are too few for {folds} folds with {train_multiple}x training windows.")
+    out = []
+    for i in range(folds):
+        test_start = (i + train_multiple) * segment
+        train_start = 0 if anchored else i * segment
+        test_end = n if i == folds - 1 else test_start + segment
+        out.append((train_start, test_start, test_start, test_end))
+    return out
+
+
+def _strategy_returns(df: pd.DataFrame, strategy: str, combos: list) -> np.ndarray:
+    # Strategies only look backwards, so one full-range run per combo serves every fold
+    compact_memory = compact.enabled()
+    signals = np.zeros((len(combos), len(df)), dtype=np.float32 if compact_memory else float)
+    for row, params in enumerate(combos):
+        # Compact strategies copy only the columns they use
+        out = strategy_map[strategy](df if compact_memory else df.copy(), **params)
+        # Warm-up rows some strategies drop are held flat
+        signals[row] = out["Signal"].reindex(df.index).to_numpy(dtype=float)
+    return run_backtest_batch(df["Close"].to_numpy(dtype=float), signals, initial_cash=1.0).strategy_returns
+
+
+def _score(returns: np.ndarray, objective: str) -> np.ndarray:
+    return return_metrics(returns, names=(objective,))[objective]
+
+
+def _evaluate_chunk(df, task):
+    strategy, combos, folds, objective, compact_memory = task
+    with compact.compact_mode(compact_memory):
+        returns = _strategy_returns(df, strategy, combos)
+    train = np.column_stack([_score(returns[:, a:b], objective) for a, b, _, _ in folds])
+    test = np.column_stack([_score(returns[:, c:d], objective) for _, _, c, d in folds])
+    return train, test
+
+
+def walk_forward(df: pd.DataFrame, strategy: str, folds: int = 10, train_multiple: int = 4, anchored: bool = False,
+                 steps: int = 5, overrides: dict = None, objective: str = "sharpe_ratio",
+                 backend: str = DEFAULT_BACKEND, max_workers: int = None) -> dict:
+    """
+    Optimize ``strategy``'s parameters on each fold's training window and
+    score the winner on the following test window.
+
+    The grid is split into chunks that run in parallel via ``map_shared``,
+    so the price frame is shipped to each worker once; every chunk scores
+    its parameter sets on all folds from a single full-range backtest.
+    """
+    if strategy not in strategy_map:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose from {', '.join(strategy_map)}.")
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective '{objective}'. Choose from {', '.join(OBJECTIVES)}.")
+
+    df = compact.frame(df.reset_index(drop=True), copy=False)
+    splits = make_folds(len(df), folds, train_multiple, anchored)
+    combos = param_grid(strategy_map[strategy], steps, overrides)
+    if not combos:
+        raise ValueError("Parameter grid is empty.")
+    if len(combos) > MAX_COMBOS:
+        raise ValueError(f"Parameter grid has more than {MAX_COMBOS} combinations.")
+
+    chunks = max(1, min(len(combos), 4 * (max_workers or CPU_WORKERS)))
+    tasks = [(strategy, list(chunk), splits, objective, compact.enabled()) for chunk in np.array_split(np.array(combos, dtype=object), chunks)]
+    with indicator_scope():
+        results = map_shared(_evaluate_chunk, tasks, df, backend=backend, max_workers=max_workers,
+                             worker_setup=activate_worker_cache)
+    train = np.vstack([r[0] for r in results])
+    test = np.vstack([r[1] for r in results])
+
+    chosen = np.nanargmax(np.where(np.isnan(train), -np.inf, train), axis=0)
+
+    # Out-of-sample equity: each test window traded with the parameters picked just before it
+    unique = sorted(set(chosen.tolist()))
+    with indicator_scope():
+        returns = _strategy_returns(df, strategy, [combos[i] for i in unique])
+    row_of = {combo: row for row, combo in enumerate(unique)}
+    oos = np.concatenate([returns[row_of[chosen[f]], c:d] for f, (_, _, c, d) in enumerate(splits)])
+    oos_dates = np.concatenate([df["Date"].to_numpy()[c:d] for _, _, c, d in splits])
+    equity = np.cumprod(1.0 + oos) * 100000
+
+    dates = df["Date"]
+    fold_rows = []
+    for f, (a, b, c, d) in enumerate(splits):
+        fold_rows.append({
+            "fold": f + 1,
+            "train_start": str(dates.iloc[a].date()),
+            "train_end": str(dates.iloc[b - 1].date()),
+            "test_start": str(dates.iloc[c].date()),
+            "test_end": str(dates.iloc[d - 1].date()),
+            "params": combos[chosen[f]],
+            "train_score": round(float(train[chosen[f], f]), 4),
+            "test_score": round(float(test[chosen[f], f]), 4),
+        })
+
+    train_scores = np.array([row["train_score"] for row in fold_rows])
+    test_scores = np.array([row["test_score"] for row in fold_rows])
+    summary = {
+        "objective": objective,
+        "combinations": len(combos),
+        "mean_train_score": round(float(train_scores.mean()), 4),
+        "mean_test_score": round(float(test_scores.mean()), 4),
+        "oos_total_return": round(float((equity[-1] - 100000) / 100000 * 100), 4),
+        "distinct_params": len(unique),
+    }
+    return {"folds": fold_rows, "summary": summary, "oos_equity": Table({"date": oos_dates, "equity": equity})}
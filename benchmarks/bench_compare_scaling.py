@@ -0,0 +1,69 @@
+# benchmarks/bench_compare_scaling.py
+"""
+Wall-clock time of the /compare-strategies strategy loop against the number of
+strategies, for each execution backend.
+
+    python -m benchmarks.bench_compare_scaling --bars 200000 --repeat 3 --json out.json
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.indicators import indicator_scope, activate_worker_cache
+from app.parallel import map_shared, BACKENDS
+from app.routes.compare import strategy_map, _strategy_task
+
+
+def synthetic_frame(bars: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, bars)))
+    return pd.DataFrame({
+        "Date": pd.date_range("1990-01-01", periods=bars, freq="min"),
+        "Close": close,
+        "Open": close,
+        "High": close * 1.001,
+        "Low": close * 0.999,
+        "Volume": 1e6,
+    })
+
+
+def time_loop(df, strategies, backend, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with indicator_scope():
+            map_shared(_strategy_task, [(s, 20, 50) for s in strategies], df,
+                       backend=backend, worker_setup=activate_worker_cache)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.bars)
+    names = list(strategy_map)
+    rows = []
+
+    print(f"{'strategies':>10} " + " ".join(f"{b:>11}" for b in args.backends))
+    for count in range(1, len(names) + 1):
+        timings = {backend: time_loop(df, names[:count], backend, args.repeat) for backend in args.backends}
+        rows.append({"strategies": count, **timings})
+        print(f"{count:>10} " + " ".join(f"{timings[b]:>10.3f}s" for b in args.backends))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"bars": args.bars, "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/bench_indicators.py
+"""
+Indicator kernels (``app.kernels``) against the pandas code they replaced,
+on one long series and on a (symbols x time) universe, where pandas runs
+column-wise on a DataFrame and the kernel takes the whole array at once.
+
+    python -m benchmarks.bench_indicators --sizes 10000 1000000 --universe 500 5000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from app import kernels
+
+
+# ---------- pandas references ----------
+# What ``app.indicators`` computed before the kernels; RSI is Wilder's, as pandas ewm
+
+def pandas_rsi(close, period=14):
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / period, adjust=False).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / period, adjust=False).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+
+def pandas_macd(close, short=12, long=26, signal=9):
+    line = close.ewm(span=short, adjust=False).mean() - close.ewm(span=long, adjust=False).mean()
+    return line, line.ewm(span=signal, adjust=False).mean()
+
+
+def pandas_bollinger(close, window=20, num_std=2):
+    mid, std = close.rolling(window).mean(), close.rolling(window).std()
+    return mid, mid + num_std * std, mid - num_std * std
+
+
+def pandas_atr(high, low, close, period=14):
+    prev = close.shift()
+    true_range = pd.concat([high - low, (high - prev).abs(), (low - prev).abs()], axis=1).max(axis=1)
+    return true_range.ewm(alpha=1 / period, adjust=False).mean()
+
+
+CASES = {
+    "sma": (lambda s: s.rolling(20).mean(), lambda x, out: kernels.sma(x, 20, out=out)),
+    "ema": (lambda s: s.ewm(span=26, adjust=False).mean(), lambda x, out: kernels.ema(x, 26, out=out)),
+    "rolling_std": (lambda s: s.rolling(20).std(), lambda x, out: kernels.rolling_std(x, 20, out=out)),
+    "roc": (lambda s: s.pct_change(periods=10) * 100, lambda x, out: kernels.roc(x, 10, out=out)),
+    "rsi": (pandas_rsi, lambda x, out: kernels.rsi(x, 14, out=out)),
+    "macd": (pandas_macd, lambda x, out: kernels.macd(x)),
+    "bollinger": (pandas_bollinger, lambda x, out: kernels.bollinger(x)),
+    "atr": (lambda s: pandas_atr(s * 1.01, s * 0.99, s), lambda x, out: kernels.atr(x * 1.01, x * 0.99, x, out=out)),
+}
+
+
+def prices(shape, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, shape), axis=-1))
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(name: str, close: np.ndarray, repeat: int) -> dict:
+    reference, kernel = CASES[name]
+    # pandas works down the columns of a (time x symbols) frame
+    data = pd.Series(close) if close.ndim == 1 else pd.DataFrame(close.T)
+    out = np.empty(close.shape)
+    pandas_seconds = best_of(lambda: reference(data), repeat)
+    kernel_seconds = best_of(lambda: kernel(close, out), repeat)
+    return {"indicator": name, "shape": list(close.shape), "pandas": pandas_seconds, "kernel": kernel_seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000], help="bars in the single-series runs")
+    parser.add_argument("--universe", type=int, nargs=2, default=[500, 5_000], metavar=("SYMBOLS", "BARS"))
+    parser.add_argument("--indicators", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    inputs = [prices(n) for n in args.sizes] + [prices(tuple(args.universe))]
+    rows = []
+    print(f"{'indicator':>12} {'shape':>14} {'pandas':>10} {'kernel':>10} {'speedup':>8}")
+    for close in inputs:
+        for name in args.indicators:
+            row = run(name, close, args.repeat)
+            rows.append(row)
+            shape = "x".join(map(str, close.shape))
+            print(f"{name:>12} {shape:>14} {row['pandas'] * 1000:>8.2f}ms {row['kernel'] * 1000:>8.2f}ms "
+                  f"{row['pandas'] / row['kernel']:>7.1f}x", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
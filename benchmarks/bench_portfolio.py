@@ -0,0 +1,63 @@
+# benchmarks/bench_portfolio.py
+"""
+Multi-asset portfolio simulation on seeded random walks, per rebalancing mode.
+
+    python -m benchmarks.bench_portfolio --assets 500 --years 20
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.portfolio import attribution, backtest_portfolio, equal_weights
+
+MODES = (
+    ("monthly", None),
+    ("weekly", None),
+    ("daily", None),
+    ("never", 0.02),
+    ("monthly", 0.01),
+)
+
+
+def universe(assets: int, bars: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, (assets, bars)), axis=1))
+    dates = np.busday_offset(np.datetime64("2000-01-03"), np.arange(bars), roll="forward")
+    return dates, close
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=500)
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--cost-bps", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    dates, close = universe(args.assets, args.years * 252)
+    weights = equal_weights(close)
+
+    results = []
+    for rebalance, threshold in MODES:
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = backtest_portfolio(close, weights, dates, rebalance=rebalance, threshold=threshold, cost_bps=args.cost_bps)
+            attribution(result, list(range(args.assets)))
+            best = min(best, time.perf_counter() - started)
+        row = {"rebalance": rebalance, "threshold": threshold, "rebalances": len(result.rebalances), "seconds": best}
+        results.append(row)
+        label = f"{rebalance}" + (f" + {threshold:g} drift" if threshold else "")
+        print(f"{label:>20} {len(result.rebalances):>6} rebalances {best * 1000:>10.1f} ms", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"assets": args.assets, "bars": close.shape[1], "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
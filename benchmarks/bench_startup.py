@@ -0,0 +1,109 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start profile of the API: import time per module and time to first request.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --top 40 --path /metrics
+    python -m benchmarks.bench_startup --budget 1.5 --repeat 5
+
+Both measurements run in fresh interpreters. The import profile comes from
+``python -X importtime``; time to first request spans interpreter start,
+``import main``, app startup and one ``GET --path`` through the ASGI stack.
+With ``--budget`` the run exits with status 1 when the best time to first
+request is over that many seconds.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_REQUEST = """
+import sys, time
+from fastapi.testclient import TestClient
+import main
+with TestClient(main.app) as client:
+    response = client.get(sys.argv[1])
+    elapsed = time.perf_counter() - float(sys.argv[2])
+print(response.status_code, elapsed)
+"""
+
+
+def _run(args: list) -> subprocess.CompletedProcess:
+    # No prewarmed sandbox workers: they start in the background and would only add noise
+    env = {**os.environ, "QTRADER_PREWARM_SANDBOX": "0"}
+    return subprocess.run([sys.executable, *args], cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+
+
+def import_profile(target: str = "main") -> list:
+    """``(module, self_seconds, cumulative_seconds, depth)`` for every module ``import target`` loads."""
+    proc = _run(["-X", "importtime", "-c", f"import {target}"])
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6, depth))
+    return rows
+
+
+def by_package(rows: list) -> list:
+    """Self time summed per top-level package (``app.*`` modules are kept separate)."""
+    totals = {}
+    for name, self_seconds, _, _ in rows:
+        package = name if name.startswith("app.") else name.split(".")[0]
+        totals[package] = totals.get(package, 0.0) + self_seconds
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def time_to_first_request(path: str) -> float:
+    started = time.perf_counter()
+    proc = _run(["-c", FIRST_REQUEST, path, repr(started)])
+    if proc.returncode != 0:
+        raise RuntimeError(f"first request failed:\n{proc.stderr}")
+    status, elapsed = proc.stdout.split()[-2:]
+    if not status.startswith("2"):
+        raise RuntimeError(f"GET {path} returned {status}")
+    return float(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="main", help="module to profile the import of")
+    parser.add_argument("--top", type=int, default=25, help="rows per table")
+    parser.add_argument("--path", default="/metrics", help="GET path used for the first request")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget", type=float, help="fail if time to first request exceeds this many seconds")
+    args = parser.parse_args()
+
+    rows = import_profile(args.target)
+    total = sum(self_seconds for _, self_seconds, _, _ in rows)
+    print(f"import {args.target}: {len(rows)} modules, {total * 1000:.1f} ms\n")
+
+    print(f"{'package':>40} {'self':>10}")
+    for package, seconds in by_package(rows)[:args.top]:
+        print(f"{package:>40} {seconds * 1000:>8.1f}ms")
+
+    print(f"\n{'module':>40} {'cumulative':>12} {'self':>10}")
+    for name, self_seconds, cumulative, _ in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f"{name:>40} {cumulative * 1000:>10.1f}ms {self_seconds * 1000:>8.1f}ms")
+
+    timings = [time_to_first_request(args.path) for _ in range(args.repeat)]
+    best = min(timings)
+    print(f"\ntime to first request (GET {args.path}): best {best * 1000:.1f} ms of {args.repeat}")
+
+    if args.budget is not None:
+        if best > args.budget:
+            print(f"Over budget: {best:.3f}s > {args.budget:.3f}s")
+            sys.exit(1)
+        print(f"Within budget ({args.budget:.3f}s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/bench_streaming.py
+"""
+Bar-by-bar replay cost: re-running the batch strategy on the growing history
+at every bar (O(N^2)) against feeding the streaming strategy one bar (O(N)).
+Also checks that both produce identical signals, over several seeded price
+series, and exits non-zero on any mismatch. Besides smooth GBM prices the
+check runs on penny-tick prices with flat stretches, where indicators tie
+exactly and any difference in rounding between the two paths shows up.
+
+    python -m benchmarks.bench_streaming --bars 2000 --strategies sma macd
+    python -m benchmarks.bench_streaming --bars 3000 --seeds $(seq 0 19) --skip-timing
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.strategy_core import strategy_map
+from app.streaming import streaming_strategy_map
+from benchmarks.bench_compare_scaling import synthetic_frame
+
+
+def tick_frame(bars: int, seed: int = 7) -> pd.DataFrame:
+    # A low-priced stock quoted in cents that often doesn't trade, plus a fully flat stretch
+    rng = np.random.default_rng(seed)
+    moves = rng.choice([-0.01, 0.0, 0.0, 0.0, 0.01], size=bars)
+    moves[bars // 3: bars // 3 + min(300, bars // 4)] = 0.0
+    close = np.round(np.maximum(2.0 + np.cumsum(moves), 0.01), 2)
+    df = synthetic_frame(bars, seed)
+    df["Close"] = df["Open"] = close
+    df["High"], df["Low"] = close + 0.01, close - 0.01
+    return df
+
+
+PRICES = {"gbm": synthetic_frame, "tick": tick_frame}
+
+
+def batch_replay(df, strategy):
+    signals = []
+    for end in range(1, len(df) + 1):
+        out = strategy_map[strategy](df.iloc[:end].copy())
+        signals.append(out["Signal"].iloc[-1] if len(out) and out.index[-1] == df.index[end - 1] else None)
+    return signals
+
+
+def streaming_replay(df, strategy):
+    model = streaming_strategy_map[strategy]()
+    return [model.update(close) for close in df["Close"].to_numpy()]
+
+
+def full_signals(df, strategy):
+    # The batch signal of every bar from one run; strategies only look backwards,
+    # so this equals replaying the growing history bar by bar
+    out = strategy_map[strategy](df.copy())["Signal"]
+    return [None if pd.isna(v) else v for v in out.reindex(df.index).to_numpy(dtype=float)]
+
+
+def mismatches(expected, got) -> list:
+    """Bars where the streaming signal differs from the batch one (or only one side drops the bar)."""
+    return [
+        bar for bar, (a, b) in enumerate(zip(expected, got))
+        if (a is None) != (b is None) or (a is not None and np.float64(a) != np.float64(b))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", type=int, default=2000)
+    parser.add_argument("--strategies", nargs="+", default=list(strategy_map), choices=list(strategy_map))
+    parser.add_argument("--seeds", type=int, nargs="+", default=[7], help="price series to check signals on")
+    parser.add_argument("--prices", nargs="+", default=list(PRICES), choices=list(PRICES))
+    parser.add_argument("--skip-timing", action="store_true", help="only check signals (skips the O(N^2) batch replay)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows = []
+    failed = []
+    print(f"{'strategy':>14} {'prices':>6} {'seed':>6} {'batch':>10} {'streaming':>10} {'speedup':>8}  mismatches")
+    for prices in args.prices:
+        for seed in args.seeds:
+            df = PRICES[prices](args.bars, seed=seed)
+            for strategy in args.strategies:
+                started = time.perf_counter()
+                expected = full_signals(df, strategy) if args.skip_timing else batch_replay(df, strategy)
+                batch_seconds = time.perf_counter() - started
+
+                started = time.perf_counter()
+                got = streaming_replay(df, strategy)
+                streaming_seconds = time.perf_counter() - started
+
+                bad = mismatches(expected, got)
+                if bad:
+                    failed.append(f"{strategy} ({prices}, seed {seed}) at bar(s) {', '.join(map(str, bad[:5]))}")
+                rows.append({"strategy": strategy, "prices": prices, "seed": seed, "batch": batch_seconds,
+                             "streaming": streaming_seconds, "mismatches": len(bad)})
+                timing = "" if args.skip_timing else f"{batch_seconds:>9.3f}s {streaming_seconds:>9.4f}s {batch_seconds / streaming_seconds:>7.0f}x"
+                print(f"{strategy:>14} {prices:>6} {seed:>6} {timing:>30}  {len(bad)}", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"bars": args.bars, "results": rows}, f, indent=2)
+
+    if failed:
+        print("\nStreaming signals differ from batch: " + "; ".join(failed), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
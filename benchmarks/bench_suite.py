@@ -0,0 +1,191 @@
+# benchmarks/bench_suite.py
+"""
+Microbenchmarks for every strategy in ``strategy_map``, ``backtest_strategy``,
+a full ``/compare-strategies`` run and ``calculate_metrics`` on seeded
+synthetic prices. Each case reports its best time and, on Linux, its peak
+RSS: the most resident memory it added over what the process held before.
+Worker processes are not counted, and memory the allocator kept from an
+earlier case is reused without showing up, so isolate a case with ``--only``
+for a clean figure.
+
+    python -m benchmarks.bench_suite --json results.json
+    python -m benchmarks.bench_suite --preset full --generators gbm regime --freqs daily minute
+    python -m benchmarks.bench_suite --compare baseline.json --tolerance 0.25
+    python -m benchmarks.bench_suite --sizes 2000000 --freqs minute --compact
+
+With ``--compare`` each timing is checked against the stored baseline and
+the run exits with status 1 if any case is slower by more than the
+tolerance (and by more than ``--min-delta`` seconds, to ignore noise).
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from app.backtester import backtest_strategy
+from app.compact import compact_mode
+from app.performance_metrics import calculate_metrics
+from app.routes.compare import run_comparison, strategy_map
+from benchmarks.synthetic import price_frame, GENERATORS, FREQUENCIES
+
+PRESETS = {
+    "quick": (1_000, 10_000, 100_000),
+    "full": (1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+}
+
+
+def _status_kb(field: str):
+    # A memory figure from /proc/self/status (Linux), in kB
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    # Restart the kernel's high-water mark so the next VmHWM covers only what follows
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def best_of(fn, make_args, repeat: int):
+    """Best time in seconds and the largest peak RSS added over the runs, in MB (None where unsupported)."""
+    # Arguments are rebuilt outside the timed region (strategies may mutate their input)
+    best = float("inf")
+    peak = None
+    for _ in range(repeat):
+        args = make_args()
+        gc.collect()
+        before = _status_kb("VmRSS")
+        tracked = _reset_peak_rss() and before is not None
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+        if tracked:
+            peak = max(peak or 0.0, (_status_kb("VmHWM") - before) / 1024)
+        del args
+    return best, peak
+
+
+def cases(df: pd.DataFrame):
+    """``(name, fn, make_args)`` for every benchmarked function on one frame."""
+    for name, fn in strategy_map.items():
+        yield f"strategy.{name}", fn, lambda: (df.copy(),)
+
+    signals = strategy_map["sma"](df.copy())
+    yield "backtest_strategy", backtest_strategy, lambda: (signals,)
+
+    yield "compare_strategies", run_comparison, lambda: (df, list(strategy_map), 20, 50)
+
+    values = backtest_strategy(signals)["Portfolio Value"]
+    portfolio = pd.Series(values.to_numpy(), index=pd.DatetimeIndex(df["Date"]))
+    yield "calculate_metrics", calculate_metrics, lambda: (portfolio,)
+
+
+def run_suite(sizes, generators, freqs, repeat: int, only=None, compact: bool = False) -> list:
+    results = []
+    print(f"{'case':>24} {'gen':>7} {'freq':>7} {'rows':>10} {'time':>14} {'peak RSS':>11}")
+    with compact_mode(compact):
+        for generator in generators:
+            for freq in freqs:
+                for rows in sizes:
+                    results += _run_frame(price_frame(rows, generator, freq), generator, freq, rows, repeat, only)
+    return results
+
+
+def _run_frame(df, generator, freq, rows, repeat, only) -> list:
+    results = []
+    for name, fn, make_args in cases(df):
+        if only and not any(pattern in name for pattern in only):
+            continue
+        seconds, peak = best_of(fn, make_args, repeat)
+        row = {"name": name, "generator": generator, "freq": freq, "rows": rows, "seconds": seconds, "peak_rss_mb": peak}
+        results.append(row)
+        memory = f"{peak:>8.1f} MB" if peak is not None else f"{'n/a':>11}"
+        print(f"{name:>24} {generator:>7} {freq:>7} {rows:>10} {seconds * 1000:>11.3f} ms {memory}", flush=True)
+    return results
+
+
+def case_key(row: dict) -> str:
+    return f"{row['name']}/{row['generator']}/{row['freq']}/{row['rows']}"
+
+
+def compare(results: list, baseline: dict, tolerance: float, min_delta: float) -> list:
+    """Rows slower than the baseline by more than ``tolerance`` (relative) and ``min_delta`` seconds."""
+    previous = {case_key(row): row["seconds"] for row in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':>52} {'baseline':>11} {'now':>11} {'ratio':>7}")
+    for row in results:
+        key = case_key(row)
+        if key not in previous:
+            continue
+        ratio = row["seconds"] / previous[key] if previous[key] > 0 else float("inf")
+        regressed = ratio > 1 + tolerance and row["seconds"] - previous[key] > min_delta
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:>52} {previous[key] * 1000:>9.3f}ms {row['seconds'] * 1000:>9.3f}ms {ratio:>6.2f}x{flag}")
+        if regressed:
+            regressions.append({**row, "baseline": previous[key], "ratio": ratio})
+    return regressions
+
+
+def environment() -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=PRESETS, default="quick")
+    parser.add_argument("--sizes", type=int, nargs="+", help="row counts (overrides --preset)")
+    parser.add_argument("--generators", nargs="+", default=["gbm"], choices=GENERATORS)
+    parser.add_argument("--freqs", nargs="+", default=["daily"], choices=FREQUENCIES)
+    parser.add_argument("--only", nargs="+", help="only run cases whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--compact", action="store_true", help="run in compact memory mode (see app.compact)")
+    parser.add_argument("--json", help="write results to this file (e.g. to store a baseline)")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --json run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--min-delta", type=float, default=0.001, help="ignore slowdowns under this many seconds")
+    args = parser.parse_args()
+
+    sizes = args.sizes or PRESETS[args.preset]
+    results = run_suite(sizes, args.generators, args.freqs, args.repeat, args.only, args.compact)
+    report = {"environment": environment(), "repeat": args.repeat, "compact": args.compact, "results": results}
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
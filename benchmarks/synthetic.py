@@ -0,0 +1,68 @@
+# benchmarks/synthetic.py
+"""
+Seeded synthetic OHLCV frames shaped like ``market_data.normalize_prices``
+output, so benchmarks run offline and reproducibly.
+"""
+
+import numpy as np
+import pandas as pd
+
+GENERATORS = ("gbm", "regime")
+FREQUENCIES = ("daily", "minute")
+
+# Annualised drift / volatility per regime: calm bull, volatile bear
+REGIMES = ((0.12, 0.15), (-0.20, 0.40))
+MEAN_REGIME_BARS = 120
+
+
+def _periods_per_year(freq: str) -> int:
+    return 252 if freq == "daily" else 252 * 390
+
+
+def gbm_returns(rows: int, freq: str, rng, drift: float = 0.08, vol: float = 0.2) -> np.ndarray:
+    """Log returns of geometric Brownian motion."""
+    dt = 1.0 / _periods_per_year(freq)
+    return rng.normal((drift - 0.5 * vol ** 2) * dt, vol * np.sqrt(dt), rows)
+
+
+def regime_returns(rows: int, freq: str, rng, regimes=REGIMES, mean_bars: int = MEAN_REGIME_BARS) -> np.ndarray:
+    """
+    Log returns that switch between GBM regimes. Regime lengths are
+    geometric with mean ``mean_bars``, so trends and volatility clusters
+    give the strategies something to trade.
+    """
+    dt = 1.0 / _periods_per_year(freq)
+    lengths = rng.geometric(1.0 / mean_bars, size=rows // mean_bars * 2 + 2)
+    while lengths.sum() < rows:
+        lengths = np.concatenate([lengths, rng.geometric(1.0 / mean_bars, size=len(lengths))])
+    labels = np.repeat(np.arange(len(lengths)) % len(regimes), lengths)[:rows]
+
+    drift = np.array([d for d, _ in regimes])[labels]
+    vol = np.array([v for _, v in regimes])[labels]
+    return (drift - 0.5 * vol ** 2) * dt + vol * np.sqrt(dt) * rng.standard_normal(rows)
+
+
+def price_frame(rows: int, generator: str = "gbm", freq: str = "daily", seed: int = 7) -> pd.DataFrame:
+    """``rows`` bars of Date/Open/High/Low/Close/Volume from the named generator."""
+    if generator not in GENERATORS:
+        raise ValueError(f"Unknown generator '{generator}'. Choose from {', '.join(GENERATORS)}.")
+    rng = np.random.default_rng(seed)
+    log_returns = gbm_returns(rows, freq, rng) if generator == "gbm" else regime_returns(rows, freq, rng)
+    close = 100 * np.exp(np.cumsum(log_returns))
+
+    if freq == "daily":
+        # Business days from numpy; second resolution so millions of bars don't overflow datetime64[ns]
+        dates = np.busday_offset("1990-01-01", np.arange(rows), roll="forward").astype("datetime64[s]")
+    else:
+        dates = np.datetime64("1990-01-01T00:00", "s") + np.arange(rows) * np.timedelta64(60, "s")
+
+    spread = np.abs(rng.normal(0, 0.002, rows))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    return pd.DataFrame({
+        "Date": dates,
+        "Open": open_,
+        "High": np.maximum(open_, close) * (1 + spread),
+        "Low": np.minimum(open_, close) * (1 - spread),
+        "Close": close,
+        "Volume": rng.integers(100_000, 5_000_000, rows).astype(float),
+    })
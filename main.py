@@ -1,9 +1,59 @@
 # main.py
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import metrics, backtest, generate, compare, run_generated
+from dotenv import load_dotenv
 
-app = FastAPI()
+# Before any app module reads its QTRADER_* settings
+load_dotenv()
+
+from app.routes import telemetry
+from app.lazy_routes import LazyRouters, include_all
+from app.telemetry import TimingMiddleware, configure_logging
+
+configure_logging()
+
+# Route modules and the paths they serve. They are imported on first use so a
+# cold start doesn't pay for pandas, OpenAI, etc.; QTRADER_LAZY_ROUTES=0 loads them at startup.
+ROUTES = {
+    "app.routes.metrics": ("/evaluate-strategy", "/monte-carlo"),
+    "app.routes.backtest": ("/backtest",),
+    "app.routes.generate": ("/generate-strategy",),
+    "app.routes.compare": ("/compare-strategies",),
+    "app.routes.run_generated": ("/run-generated-strategy",),
+    "app.routes.sweep": ("/sweep",),
+    "app.routes.walk_forward": ("/walk-forward",),
+    "app.routes.strategies": ("/strategies",),
+    "app.routes.scan": ("/scan",),
+    "app.routes.portfolio": ("/portfolio",),
+}
+LAZY_ROUTES = os.getenv("QTRADER_LAZY_ROUTES", "1") == "1"
+PREWARM_SANDBOX = os.getenv("QTRADER_PREWARM_SANDBOX", "1") == "1"
+
+
+def _start_sandbox():
+    from app.sandbox import get_pool
+    return get_pool()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pre-start sandbox workers in the background so the first generated strategy
+    # doesn't pay for them, without holding up the first request
+    warmup = asyncio.create_task(asyncio.to_thread(_start_sandbox)) if PREWARM_SANDBOX else None
+    yield
+    if warmup is not None:
+        try:
+            (await warmup).close()
+        except Exception:
+            # Prewarming failed; there is no pool to close
+            logging.getLogger(__name__).exception("🔥 Sandbox prewarm failed")
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow frontend to access this API
 app.add_middleware(
@@ -14,8 +64,9 @@ app.add_middleware(
 )
 
 # Register API routes
-app.include_router(metrics.router)
-app.include_router(backtest.router)
-app.include_router(generate.router)
-app.include_router(compare.router)
-app.include_router(run_generated.router)
+app.include_router(telemetry.router)
+if LAZY_ROUTES:
+    app.add_middleware(LazyRouters, routes=ROUTES)
+else:
+    include_all(app, ROUTES)
+app.add_middleware(TimingMiddleware)
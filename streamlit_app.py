@@ -11,6 +11,9 @@ import textwrap
 
 API_URL = "https://q-trader.onrender.com"
 
+# Equity curves are downsampled server-side (LTTB) to about one point per screen pixel
+MAX_CHART_POINTS = 2000
+
 st.set_page_config(layout="wide")
 st.title("💼 Q-Trader++: Quant Strategy Backtester")
 strategy_options = {
@@ -27,7 +30,7 @@ strategy_options = {
 # Sidebar navigation
 st.sidebar.title("🧭 Navigation")
 section = st.sidebar.radio(
-    "Go to", ["Backtest Strategy", "Compare Strategies", "Generate Strategy"]
+    "Go to", ["Backtest Strategy", "Compare Strategies", "Sweep Windows", "Generate Strategy"]
 )
 
 # -------------- COMPARE MULTIPLE STRATEGIES ------------------
@@ -69,6 +72,7 @@ if section == "Compare Strategies":
                     "strategies": strategies,
                     "short_window": short_window,
                     "long_window": long_window,
+                    "max_points": MAX_CHART_POINTS,
                 }
                 st.write("🛠️ Strategies being sent:", strategies)
 
@@ -162,6 +166,7 @@ if section == "Backtest Strategy":
                     "short_window": short_window,
                     "long_window": long_window,
                     "strategy": strategy,
+                    "max_points": MAX_CHART_POINTS,
                 }
                 response = requests.get(f"{API_URL}/backtest", params=params)
                 try:
@@ -256,6 +261,74 @@ if section == "Backtest Strategy":
             except Exception as e:
                 st.error(f"❌ Exception: {e}")
 
+# ---------- SWEEP WINDOWS ----------
+if section == "Sweep Windows":
+    st.header("🔥 Sweep Moving Average Windows")
+
+    sweep_options = {k: strategy_options[k] for k in ("sma", "ema", "dual_sma")}
+
+    with st.form("sweep_form"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            symbol = st.text_input("Ticker Symbol", value="AAPL")
+        with col2:
+            start = st.date_input("Start Date", value=pd.to_datetime("2015-01-01"))
+        with col3:
+            end = st.date_input("End Date", value=pd.to_datetime("2025-01-01"))
+
+        selected_label = st.selectbox("Strategy Type", options=list(sweep_options.values()))
+        strategy = [k for k, v in sweep_options.items() if v == selected_label][0]
+        short_range = st.slider("Short Window Range", 2, 100, (5, 50))
+        long_range = st.slider("Long Window Range", 10, 300, (20, 200))
+        metric = st.radio("Heatmap Metric", ["sharpe_ratio", "total_return"], horizontal=True)
+
+        submit_sweep = st.form_submit_button("Run Sweep")
+
+    if submit_sweep:
+        with st.spinner("Sweeping window pairs..."):
+            try:
+                params = {
+                    "symbol": symbol,
+                    "start": start.strftime("%Y-%m-%d"),
+                    "end": end.strftime("%Y-%m-%d"),
+                    "strategy": strategy,
+                    "short_min": short_range[0],
+                    "short_max": short_range[1],
+                    "long_min": long_range[0],
+                    "long_max": long_range[1],
+                    "long_step": 1,
+                }
+                response = requests.get(f"{API_URL}/sweep", params=params)
+                data = response.json()
+
+                if response.status_code != 200:
+                    st.error(f"❌ Error: {data['detail']}")
+                else:
+                    best = data["best"]
+                    if best:
+                        st.success(
+                            f"✅ Best pair: short={best['short_window']}, long={best['long_window']} "
+                            f"(Sharpe {best['sharpe_ratio']}, Return {best['total_return']}%)"
+                        )
+
+                    fig = go.Figure(
+                        go.Heatmap(
+                            z=data[metric],
+                            x=data["long_windows"],
+                            y=data["short_windows"],
+                            colorscale="RdYlGn",
+                        )
+                    )
+                    fig.update_layout(
+                        xaxis_title="Long Window",
+                        yaxis_title="Short Window",
+                        template="plotly_white",
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+
+            except Exception as e:
+                st.error(f"❌ Exception: {e}")
+
 # ---------- GENERATE STRATEGY ----------
 elif section == "Generate Strategy":
     st.header("🤖 Generate Trading Strategy with AI")
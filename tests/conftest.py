@@ -0,0 +1,40 @@
+# tests/conftest.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import data_loader, market_data
+from app.price_store import PriceStore
+from app.providers import PRICE_COLUMNS, PriceProvider
+
+
+class UpperCaseProvider(PriceProvider):
+    """Answers like yfinance: only for upper-case tickers, empty otherwise."""
+
+    def __init__(self):
+        self.requested = []
+
+    def fetch(self, symbols, start, end):
+        self.requested.append(list(symbols))
+        dates = pd.date_range(start, end, freq="B", inclusive="left", name="Date")
+        close = 100 + 10 * np.sin(np.arange(len(dates)) / 15)
+        frames = {}
+        for symbol in symbols:
+            if symbol != symbol.upper():
+                frames[symbol] = pd.DataFrame(columns=PRICE_COLUMNS)
+                continue
+            frames[symbol] = pd.DataFrame(
+                {"Adj Close": close, "Close": close, "High": close, "Low": close, "Open": close, "Volume": 1.0},
+                index=dates,
+            )
+        return frames
+
+
+@pytest.fixture
+def provider(tmp_path, monkeypatch):
+    provider = UpperCaseProvider()
+    monkeypatch.setattr(data_loader, "_store", PriceStore(str(tmp_path / "prices")))
+    monkeypatch.setattr(data_loader, "_provider", provider)
+    monkeypatch.setattr(market_data, "market_data", market_data.MarketDataService())
+    return provider
@@ -0,0 +1,25 @@
+# tests/test_data_loader.py
+
+from app import data_loader
+from app.market_data import MarketDataService
+
+
+def test_lowercase_symbol_is_fetched_upper_case(provider):
+    frames = data_loader.fetch_many(["aapl"], start="2024-01-01", end="2024-02-01")
+
+    assert provider.requested == [["AAPL"]]
+    assert list(frames) == ["AAPL"]
+    assert len(frames["AAPL"]) == 23
+
+
+def test_lowercase_symbol_through_market_data(provider):
+    service = MarketDataService()
+
+    frames = service.get_many(["aapl", "AAPL"], start="2024-01-01", end="2024-02-01")
+
+    assert provider.requested == [["AAPL"]]
+    assert not frames["aapl"].empty
+    assert frames["aapl"]["Close"].equals(frames["AAPL"]["Close"])
+    # The second spelling is served from the store, not fetched again
+    assert not service.get_prices("Aapl", "2024-01-01", "2024-02-01").empty
+    assert provider.requested == [["AAPL"]]
@@ -0,0 +1,89 @@
+# tests/test_llm.py
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import llm, strategy_registry
+from app.llm import LLMCache, StubClient, generate_strategy_code
+from app.routes import generate, strategies
+from app.strategy_registry import StrategyRegistry
+
+TEMPLATE = "Write a strategy for: {objective}"
+
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    stub = StubClient(delay=0.05)
+    monkeypatch.setattr(llm, "_client", stub)
+    monkeypatch.setattr(llm, "_cache", LLMCache(str(tmp_path / "llm")))
+    monkeypatch.setattr(llm, "_inflight", {})
+    monkeypatch.setattr(strategy_registry, "_registry", StrategyRegistry(str(tmp_path / "strategies")))
+    return stub
+
+
+def generate_code(objective, **kwargs):
+    return asyncio.run(generate_strategy_code(objective, TEMPLATE, **kwargs))
+
+
+def test_reworded_objective_hits_the_cache(stub):
+    first, cached_first = generate_code("Momentum  for tech")
+    second, cached_second = generate_code("momentum for TECH")
+
+    assert (cached_first, cached_second) == (False, True)
+    assert second["code"] == first["code"]
+    assert len(stub.calls) == 1
+
+
+def test_concurrent_identical_requests_share_one_call(stub):
+    stub.delay = 0.3
+
+    async def burst():
+        return await asyncio.gather(*(generate_strategy_code("mean reversion", TEMPLATE) for _ in range(8)))
+
+    results = asyncio.run(burst())
+
+    assert len(stub.calls) == 1
+    assert sorted(cached for _, cached in results) == [False] + [True] * 7
+
+
+def test_refresh_bypasses_the_cache(stub):
+    generate_code("breakout")
+    entry, cached = generate_code("breakout", refresh=True)
+
+    assert cached is False
+    assert len(stub.calls) == 2
+    # The refreshed answer replaces the stored one
+    assert generate_code("breakout")[1] is True
+    assert len(stub.calls) == 2
+
+
+def test_deterministic_requests_send_temperature_zero_and_seed(stub):
+    generate_code("pairs trading", deterministic=True)
+    generate_code("pairs trading", deterministic=False)
+
+    deterministic, sampled = stub.calls
+    assert deterministic["temperature"] == 0
+    assert deterministic["seed"] == llm.SEED
+    assert sampled["temperature"] == llm.TEMPERATURE
+    assert "seed" not in sampled
+
+
+def test_cached_strategy_id_runs(stub, provider):
+    app = FastAPI()
+    app.include_router(generate.router)
+    app.include_router(strategies.router)
+    client = TestClient(app)
+
+    client.post("/generate-strategy", json={"objective": "Trend following"})
+    hit = client.post("/generate-strategy", json={"objective": "trend   FOLLOWING"}).json()
+
+    assert hit["cached"] is True and hit["valid"] is True
+    run = client.post(
+        f"/strategies/{hit['strategy_id']}/run", json={"symbol": "aapl", "start": "2023-01-01", "end": "2024-01-01"}
+    )
+    assert run.status_code == 200
+    assert "metrics" in run.json()
+    assert len(stub.calls) == 1
@@ -0,0 +1,73 @@
+# tests/test_memory.py
+# NumPy 2.3.1 leaks a reference to the out= array of ufunc.accumulate, so these repeat a
+# call and check that traced memory settles instead of growing by the size of the inputs.
+
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from app import kernels
+from app.engine import run_backtest_batch
+from app.portfolio import backtest_portfolio, equal_weights
+from app.scan import align_closes
+
+
+def retained_growth(fn, repeats: int = 4) -> int:
+    fn()
+    tracemalloc.start()
+    try:
+        fn()
+        settled = tracemalloc.get_traced_memory()[0]
+        for _ in range(repeats):
+            fn()
+        return tracemalloc.get_traced_memory()[0] - settled
+    finally:
+        tracemalloc.stop()
+
+
+def test_kernels_release_their_buffers():
+    close = np.random.default_rng(0).normal(100, 1, (5, 5000))
+    close[:, 100:110] = np.nan
+
+    def run():
+        kernels.ema(close, 20)
+        kernels.sma(close, 20)
+        kernels.rolling_std(close, 20)
+        kernels.rsi(close, 14)
+
+    assert retained_growth(run) < close.nbytes // 10
+
+
+def test_backtest_releases_its_equity():
+    rng = np.random.default_rng(1)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, (20, 5000)), axis=1)
+    signals = rng.choice([-1.0, 0.0, 1.0], size=close.shape)
+
+    def run():
+        run_backtest_batch(close, signals, hold_on_zero=True)
+
+    assert retained_growth(run) < close.nbytes // 10
+
+
+def test_portfolio_releases_its_growth():
+    close = 100 * np.cumprod(1 + np.random.default_rng(2).normal(0, 0.01, (10, 5000)), axis=1)
+    weights = equal_weights(close)
+
+    def run():
+        backtest_portfolio(close, weights, rebalance="never")
+
+    assert retained_growth(run) < close.nbytes // 10
+
+
+def test_align_closes_releases_its_index():
+    dates = pd.bdate_range("2000-01-03", periods=5000)
+    frames = {
+        f"S{i}": pd.DataFrame({"Date": dates[i::2], "Close": np.linspace(100, 200, len(dates[i::2]))})
+        for i in range(2)
+    }
+
+    def run():
+        align_closes(frames)
+
+    assert retained_growth(run) < len(frames) * len(dates) * 8 // 10
@@ -0,0 +1,33 @@
+# tests/test_monte_carlo.py
+
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from app import monte_carlo
+
+CHUNK_BYTES = 4 * 1024 * 1024
+
+
+@pytest.mark.parametrize("method, kwargs", [
+    ("block", {"block_size": 1}),
+    ("block", {"block_size": 20}),
+    ("shuffle", {}),
+    ("shuffle", {"trades": np.arange(0, 1000, 25)}),
+])
+def test_chunk_stays_under_chunk_bytes(monkeypatch, method, kwargs):
+    monkeypatch.setattr(monte_carlo, "CHUNK_BYTES", CHUNK_BYTES)
+    returns = np.random.default_rng(0).normal(0.0005, 0.01, 1000)
+
+    tracemalloc.start()
+    try:
+        result = monte_carlo.monte_carlo(returns, n_paths=2000, method=method, seed=1, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Beyond the chunks: the returns, and the per-path metrics collected and then concatenated
+    outside = 2 * returns.nbytes + 2 * 3 * 2000 * 8
+    assert len(result["paths"]["sharpe_ratio"]) == 2000
+    assert peak <= CHUNK_BYTES + outside
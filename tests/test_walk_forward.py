@@ -0,0 +1,61 @@
+# tests/test_walk_forward.py
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import data_loader
+from app.routes import walk_forward
+
+PARAMS = {"symbol": "AAPL", "start": "2020-01-01", "end": "2024-01-01", "strategy": "sma", "folds": 3, "backend": "serial"}
+
+
+@pytest.fixture
+def client(provider):
+    app = FastAPI()
+    app.include_router(walk_forward.router)
+    return TestClient(app)
+
+
+def run(client, grid=None):
+    params = dict(PARAMS) if grid is None else {**PARAMS, "grid": grid}
+    return client.get("/walk-forward", params=params)
+
+
+def test_explicit_grid_runs(client):
+    response = run(client, json.dumps({"short_window": [10, 20], "long_window": [50, 100]}))
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("grid", [
+    "{not json",
+    json.dumps([10, 20]),
+    json.dumps({"short_window": []}),
+    json.dumps({"short_window": ["ten"]}),
+    json.dumps({"short_window": [True]}),
+    json.dumps({"short_window": [0, 10]}),
+    json.dumps({"long_window": [-50]}),
+    json.dumps({"long_window": [50.5]}),
+])
+def test_bad_grid_is_rejected(client, provider, grid):
+    response = run(client, grid)
+    assert response.status_code == 400
+    assert provider.requested == []
+
+
+def test_unknown_parameter_is_rejected(client):
+    response = run(client, json.dumps({"lookback": [10]}))
+    assert response.status_code == 400
+    assert "lookback" in response.json()["detail"]
+
+
+def test_provider_error_is_handled(client, monkeypatch):
+    def fail(symbols, start, end):
+        raise ConnectionError("provider unreachable")
+
+    monkeypatch.setattr(data_loader._provider, "fetch", fail)
+    response = run(client)
+    assert response.status_code == 500
+    assert "provider unreachable" in response.json()["detail"]